@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+CACHE_FILE = "analytics_cache.json"
+CACHE_VERSION = 1
+CHUNK_SIZE = 50000
+DENSITY_BINS = 120
+SCATTER_SAMPLE = 5000  # Sessions drawn as raw points before switching to density plots
+SERIES_POINTS = 2000  # Per-session line points before sessions are bucketed
+METRICS = [
+    "DistanceTraveled", "SurvivalTime", "EnemiesDefeated", "Score",
+    "MagicBoltDamage", "ElectricBurstDamage", "ExplosionDamage",
+    "ItemCollectionCount", "WaveNumber", "BossesDefeated", "PlayerLevel", "TotalDamage"
+]
+DAMAGE_COLUMNS = ["MagicBoltDamage", "ElectricBurstDamage", "ExplosionDamage"]
+CSV_DTYPES = {
+    "SessionID": "string",
+    "DistanceTraveled": "float64",
+    "SurvivalTime": "float64",
+    "EnemiesDefeated": "float64",
+    "Score": "float64",
+    "MagicBoltDamage": "float64",
+    "ElectricBurstDamage": "float64",
+    "ExplosionDamage": "float64",
+    "ItemCollectionCount": "float64",
+    "WaveNumber": "float64",
+    "BossesDefeated": "float64",
+    "PlayerLevel": "float64"
+}
+
+class RunningStats:
+    def __init__(self, count=0, mean=0.0, m2=0.0, minimum=None, maximum=None):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.merge(RunningStats(
+            len(values), float(values.mean()), float(((values - values.mean()) ** 2).sum()),
+            float(values.min()), float(values.max())
+        ))
+
+    def merge(self, other):
+        # Chan et al. pairwise combination of Welford accumulators.
+        if not other.count:
+            return
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.minimum, self.maximum = other.minimum, other.maximum
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def std(self):
+        return (self.m2 / (self.count - 1)) ** 0.5 if self.count > 1 else float("nan")
+
+    def to_dict(self):
+        return {"count": self.count, "mean": self.mean, "m2": self.m2, "minimum": self.minimum, "maximum": self.maximum}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+class SessionAggregates:
+    def __init__(self):
+        self.last_id = 0
+        self.metrics = {name: RunningStats() for name in METRICS}
+        self.wave_counts = {}
+        self.wave_kill_sums = {}
+
+    def fold(self, chunk):
+        chunk = {name: np.asarray(values, dtype=float) for name, values in chunk.items()}
+        chunk["TotalDamage"] = sum(chunk[name] for name in DAMAGE_COLUMNS)
+        for name in METRICS:
+            self.metrics[name].update(chunk[name])
+        valid = ~np.isnan(chunk["WaveNumber"]) & ~np.isnan(chunk["EnemiesDefeated"])
+        waves, inverse = np.unique(chunk["WaveNumber"][valid].astype(int), return_inverse=True)
+        counts = np.bincount(inverse.ravel(), minlength=len(waves))
+        kill_sums = np.bincount(inverse.ravel(), weights=chunk["EnemiesDefeated"][valid], minlength=len(waves))
+        for wave, count, kill_sum in zip(waves, counts, kill_sums):
+            key = str(int(wave))
+            self.wave_counts[key] = self.wave_counts.get(key, 0) + int(count)
+            self.wave_kill_sums[key] = self.wave_kill_sums.get(key, 0.0) + float(kill_sum)
+
+    def damage_stats(self):
+        names = {"MagicBoltDamage": "Magic Bolt", "ElectricBurstDamage": "Electric Burst", "ExplosionDamage": "Explosion"}
+        return [{"perk": names[name], "mean": self.metrics[name].mean, "std": self.metrics[name].std} for name in DAMAGE_COLUMNS]
+
+    def wave_means(self):
+        waves = sorted(self.wave_counts, key=int)
+        return [{"WaveNumber": int(wave), "EnemiesDefeated": self.wave_kill_sums[wave] / self.wave_counts[wave]} for wave in waves]
+
+    def to_dict(self):
+        return {
+            "version": CACHE_VERSION,
+            "last_id": self.last_id,
+            "metrics": {name: stats.to_dict() for name, stats in self.metrics.items()},
+            "wave_counts": self.wave_counts,
+            "wave_kill_sums": self.wave_kill_sums
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        aggregates = cls()
+        if data.get("version") != CACHE_VERSION:
+            return aggregates
+        aggregates.last_id = data["last_id"]
+        for name, stats in data["metrics"].items():
+            if name in aggregates.metrics:
+                aggregates.metrics[name] = RunningStats.from_dict(stats)
+        aggregates.wave_counts = data["wave_counts"]
+        aggregates.wave_kill_sums = data["wave_kill_sums"]
+        return aggregates
+
+def input_hash(*parts):
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+def load_aggregates(path=CACHE_FILE):
+    if not os.path.exists(path):
+        return SessionAggregates()
+    try:
+        with open(path) as f:
+            return SessionAggregates.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError, TypeError):
+        return SessionAggregates()
+
+def save_aggregates(aggregates, path=CACHE_FILE):
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump(aggregates.to_dict(), f)
+    os.replace(temp_path, path)
+
+def iter_store_chunks(conn, columns, after_id=0, chunk_size=CHUNK_SIZE):
+    selected = ", ".join(f'"{name}"' for name in columns)
+    cursor = conn.execute(f"SELECT id, {selected} FROM sessions WHERE id > ? ORDER BY id", (after_id,))
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        data = np.array(rows, dtype=np.float64)
+        yield int(data[-1, 0]), {name: data[:, i + 1] for i, name in enumerate(columns)}
+
+def iter_csv_chunks(path, columns, chunk_size=CHUNK_SIZE):
+    import pandas as pd
+    dtypes = {name: CSV_DTYPES.get(name, "float64") for name in columns}
+    for frame in pd.read_csv(path, usecols=columns, dtype=dtypes, chunksize=chunk_size):
+        yield {name: frame[name].to_numpy(dtype=np.float64, na_value=np.nan) for name in columns}
+
+def aggregate_columns():
+    return [name for name in METRICS if name != "TotalDamage"]
+
+def update_aggregates(conn, aggregates, chunk_size=CHUNK_SIZE):
+    # Only sessions inserted since the last run are read and folded in. A
+    # store that shrank below the cached position was replaced, so rebuild.
+    max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM sessions").fetchone()[0]
+    if max_id < aggregates.last_id:
+        aggregates = SessionAggregates()
+    added = 0
+    for last_id, chunk in iter_store_chunks(conn, aggregate_columns(), aggregates.last_id, chunk_size):
+        aggregates.fold(chunk)
+        aggregates.last_id = last_id
+        added += len(chunk["WaveNumber"])
+    return aggregates, added
+
+class DensityGrid:
+    def __init__(self, x_range, y_range, bins=DENSITY_BINS):
+        self.x_edges = np.linspace(x_range[0], x_range[1], bins + 1)
+        self.y_edges = np.linspace(y_range[0], y_range[1], bins + 1)
+        self.counts = np.zeros((bins, bins), dtype=np.int64)
+
+    def fold(self, x, y):
+        valid = ~np.isnan(x) & ~np.isnan(y)
+        counts, _, _ = np.histogram2d(x[valid], y[valid], bins=(self.x_edges, self.y_edges))
+        self.counts += counts.astype(np.int64)
+
+class PointSample:
+    # Keeps the points with the smallest random keys seen so far, which is a
+    # uniform sample without replacement regardless of how chunks are split.
+    def __init__(self, size=SCATTER_SAMPLE, seed=0):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.keys = np.empty(0)
+        self.points = np.empty((0, 2))
+
+    def fold(self, x, y):
+        keys = np.concatenate([self.keys, self.rng.random(len(x))])
+        points = np.concatenate([self.points, np.column_stack([x, y])])
+        if len(keys) > self.size:
+            keep = np.argpartition(keys, self.size)[:self.size]
+            keys, points = keys[keep], points[keep]
+        self.keys, self.points = keys, points
+
+class SeriesDownsampler:
+    def __init__(self, total, points=SERIES_POINTS):
+        self.bucket_size = max(1, -(-total // points))
+        buckets = -(-total // self.bucket_size) if total else 0
+        self.sums = np.zeros(buckets)
+        self.counts = np.zeros(buckets, dtype=np.int64)
+        self.seen = 0
+
+    def fold(self, values):
+        index = (self.seen + np.arange(len(values))) // self.bucket_size
+        valid = ~np.isnan(values)
+        self.sums += np.bincount(index[valid], weights=values[valid], minlength=len(self.sums))[:len(self.sums)]
+        self.counts += np.bincount(index[valid], minlength=len(self.counts))[:len(self.counts)]
+        self.seen += len(values)
+
+    def series(self):
+        sessions = np.arange(len(self.sums)) * self.bucket_size + (self.bucket_size + 1) / 2
+        filled = self.counts > 0
+        return sessions[filled], self.sums[filled] / self.counts[filled]
@@ -0,0 +1,103 @@
+import numpy as np
+
+IDLE, RUNNING, ATTACKED, ATTACKING, DEAD = range(5)
+STATE_FRAMES = ("idle", "running", "attacked", "attack", "death")  # Frame set key played in each state
+# States that play out before an enemy moves again, indexed by state.
+BUSY = np.array([False, False, True, True, True])
+# State each timed animation hands over to once it has played for its duration.
+# A finished death animation stays dead and simply stops animating.
+NEXT_STATE = np.array([IDLE, RUNNING, IDLE, IDLE, DEAD], dtype=np.uint8)
+# Per-type frame timing; states without a duration loop until something else
+# changes them.
+ANIMATIONS = {
+    "Enemy": {"frame_duration": 0.1, "durations": {"attacked": 0.6, "attack": 0.8, "death": 1.7}},
+    "Boss": {"frame_duration": 0.1, "durations": {"attacked": 0.6, "attack": 0.8, "death": 1.7}}
+}
+ANIMATION_DTYPE = np.dtype([
+    ("kind", "u1"),
+    ("state", "u1"),
+    ("animating", "?"),
+    ("frame", "i4"),
+    ("frame_timer", "f8"),
+    ("animation_timer", "f8")
+])
+
+class AnimationClock:
+    # Animation rows for every enemy in one structured array. Entities keep a
+    # slot into it; advance() ticks frames and finishes timed states for a
+    # whole group at once. Slots of removed entities are reused.
+    def __init__(self, animations=ANIMATIONS, capacity=256):
+        self.kind_names = list(animations)
+        self.frame_durations = np.array([animations[name]["frame_duration"] for name in self.kind_names])
+        self.durations = np.full((len(self.kind_names), len(STATE_FRAMES)), np.inf)
+        for kind, name in enumerate(self.kind_names):
+            for state, duration in animations[name]["durations"].items():
+                self.durations[kind, STATE_FRAMES.index(state)] = duration
+        self.frame_counts = np.zeros((len(self.kind_names), len(STATE_FRAMES)), dtype=np.int64)
+        self.data = np.zeros(capacity, dtype=ANIMATION_DTYPE)
+        self.free = list(range(capacity - 1, -1, -1))
+
+    def register(self, entity):
+        # Gives the entity a slot, starting idle on its first frame.
+        if not self.free:
+            capacity = len(self.data)
+            self.data = np.concatenate([self.data, np.zeros(capacity, dtype=ANIMATION_DTYPE)])
+            self.free = list(range(2 * capacity - 1, capacity - 1, -1))
+        slot = self.free.pop()
+        kind = self.kind_names.index(type(entity).__name__)
+        self.frame_counts[kind] = [len(getattr(entity, f"{state}_frames")) for state in STATE_FRAMES]
+        self.data[slot] = (kind, IDLE, False, 0, 0, 0)
+        entity.animations = self
+        entity.slot = slot
+        return slot
+
+    def release(self, slot):
+        self.free.append(slot)
+
+    def clear(self):
+        self.free = list(range(len(self.data) - 1, -1, -1))
+
+    def copy(self):
+        clone = AnimationClock.__new__(AnimationClock)
+        clone.__dict__.update(self.__dict__)
+        clone.data = self.data.copy()
+        clone.free = []
+        return clone
+
+    def start(self, slot, state):
+        self.data[slot] = (self.data["kind"][slot], state, True, 0, 0, 0)
+
+    def advance(self, dt, slots):
+        # Ticks every slot in one pass and applies NEXT_STATE to timed
+        # animations that have finished. Returns, per slot, whether an attack
+        # animation completed this tick.
+        rows = self.data[slots]
+        kinds, states = rows["kind"], rows["state"].copy()
+        ticking = ~((states == DEAD) & ~rows["animating"])
+        frame_counts = self.frame_counts[kinds, states]
+        frame_timer = rows["frame_timer"] + dt * ticking
+        advance = ticking & (frame_timer >= self.frame_durations[kinds]) & (frame_counts > 0)
+        frame = np.where(advance, (rows["frame"] + 1) % np.maximum(frame_counts, 1), rows["frame"])
+        frame_timer[advance] = 0
+        animating = rows["animating"] & ticking
+        animation_timer = rows["animation_timer"] + dt * animating
+        finished = animating & (animation_timer >= self.durations[kinds, states])
+        leaving = finished & (states != DEAD)
+        frame[leaving] = 0
+        rows["state"] = np.where(finished, NEXT_STATE[states], states)
+        rows["animating"] = animating & ~finished
+        rows["frame"] = frame
+        rows["frame_timer"] = frame_timer
+        rows["animation_timer"] = animation_timer
+        self.data[slots] = rows
+        return finished & (states == ATTACKING)
+
+    def settle(self, slots, moved):
+        # Free enemies run while they move and stand on their first idle
+        # frame otherwise.
+        moved = np.asarray(moved, dtype=bool)
+        self.data["state"][slots] = np.where(moved, RUNNING, IDLE)
+        self.data["frame"][slots[~moved]] = 0
+
+    def busy(self, slots):
+        return BUSY[self.data["state"][slots]]
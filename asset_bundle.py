@@ -0,0 +1,148 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import pygame
+
+BUNDLE_FILE = "assets.bundle"
+ASSET_DIRS = [
+    "Player", "Enemies", "Boss", "Magicbolt", "Electricburst", "Explosion",
+    "BossProjectile", "EnemiesProjectile", "Items", "Icons", "Background"
+]
+IMAGE_EXTENSIONS = (".gif", ".png", ".jpg")
+MAGIC = b"ACAB"
+VERSION = 2
+ALIGN = 64
+
+def asset_key(path):
+    # Lookups are case-insensitive, matching how the game resolves paths on Windows.
+    return path.replace("\\", "/").lower()
+
+def find_assets(root="."):
+    paths = []
+    for directory in ASSET_DIRS:
+        for dirpath, _, filenames in os.walk(os.path.join(root, directory)):
+            for filename in sorted(filenames):
+                if filename.lower().endswith(IMAGE_EXTENSIONS):
+                    paths.append(os.path.relpath(os.path.join(dirpath, filename), root))
+    return sorted(paths)
+
+def decode_rgba(path):
+    # Blitting onto a transparent surface turns GIF colour keys into alpha.
+    image = pygame.image.load(path)
+    surface = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+    surface.fill((0, 0, 0, 0))
+    surface.blit(image, (0, 0))
+    return surface.get_size(), pygame.image.tobytes(surface, "RGBA")
+
+def source_stamp(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+def build_bundle(path=BUNDLE_FILE, root="."):
+    # Each frame's index entry keeps its source file's size and mtime, so a
+    # sprite edited after packing is noticed and loaded from disk instead.
+    frames = []
+    for asset in find_assets(root):
+        source = os.path.join(root, asset)
+        size, pixels = decode_rgba(source)
+        frames.append((asset_key(asset), size, pixels, source_stamp(source)))
+    index = {}
+    offset = 0
+    for key, (width, height), pixels, stamp in frames:
+        index[key] = [offset, width, height, *stamp]
+        offset += len(pixels) + (-len(pixels) % ALIGN)
+    meta = json.dumps({"version": VERSION, "frames": index}).encode("utf-8")
+    header_size = len(MAGIC) + 4 + len(meta)
+    meta += b" " * (-header_size % ALIGN)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(meta)) + meta)
+        for _, _, pixels, _ in frames:
+            f.write(pixels + b"\0" * (-len(pixels) % ALIGN))
+    os.replace(temp_path, path)
+    return len(frames)
+
+class AssetBundle:
+    def __init__(self, path=BUNDLE_FILE):
+        self.file = open(path, "rb")
+        # Copy-on-write keeps surfaces writable without touching the file.
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_COPY)
+        if self.data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not an asset bundle")
+        (meta_length,) = struct.unpack_from("<I", self.data, len(MAGIC))
+        start = len(MAGIC) + 4
+        meta = json.loads(bytes(self.data[start:start + meta_length]).decode("utf-8"))
+        if meta["version"] != VERSION:
+            raise ValueError(f"{path} was built by an incompatible version")
+        self.base = start + meta_length
+        self.index = meta["frames"]
+        self.view = memoryview(self.data)
+
+    def __contains__(self, path):
+        return asset_key(path) in self.index
+
+    def stale(self, path):
+        # True when the source file no longer matches the packed frame. A
+        # bundle shipped without its sources is never stale.
+        try:
+            return source_stamp(path) != self.index[asset_key(path)][3:]
+        except OSError:
+            return False
+
+    def load(self, path):
+        offset, width, height = self.index[asset_key(path)][:3]
+        start = self.base + offset
+        return pygame.image.frombuffer(self.view[start:start + width * height * 4], (width, height), "RGBA")
+
+bundle = None
+surfaces = {}
+
+def open_bundle(path=BUNDLE_FILE):
+    global bundle
+    if bundle is None and os.path.exists(path):
+        try:
+            bundle = AssetBundle(path)
+        except (OSError, ValueError) as e:
+            print(f"Error opening asset bundle: {e}")
+    return bundle
+
+def load_image(path):
+    # Loaded surfaces are shared between entities, so callers must not draw onto them.
+    surface = surfaces.get(path)
+    if surface is None:
+        if bundle is not None and path in bundle and not bundle.stale(path):
+            surface = bundle.load(path)
+        else:
+            if bundle is not None and path in bundle:
+                print(f"{path} changed since the asset bundle was built; loading it from disk")
+            surface = pygame.image.load(path)
+        surfaces[path] = surface
+    return surface
+
+class AssetLoader:
+    def __init__(self, tasks):
+        self.tasks = tasks
+        self.completed = 0
+        self.thread = threading.Thread(target=self.run, name="asset loader", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def run(self):
+        # A failed load is left for the call site, which has its own fallback.
+        for task in self.tasks:
+            try:
+                task()
+            except (pygame.error, FileNotFoundError, ValueError):
+                pass
+            self.completed += 1
+
+    def done(self, count=None):
+        return self.completed >= (len(self.tasks) if count is None else count)
+
+if __name__ == "__main__":
+    output = sys.argv[1] if len(sys.argv) > 1 else BUNDLE_FILE
+    print(f"Packed {build_bundle(output)} frames into {output}")
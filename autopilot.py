@@ -0,0 +1,62 @@
+import numpy as np
+from bullets import MOVING
+
+MOVES = {None: (0, 0), "left": (-1, 0), "right": (1, 0), "up": (0, -1), "down": (0, 1)}
+LOOKAHEAD = 1.5  # Tiles probed in each direction
+BULLET_HORIZON = 0.6  # Seconds of bullet flight considered
+DANGER_RADIUS = 10  # Enemies and bosses closer than this push the player away
+MISS_DISTANCE = 2.5  # Bullets passing closer than this push the player away
+BULLET_WEIGHT = 2
+EDGE_MARGIN = 12  # Tiles from the map edge where the edge starts pushing back
+ORB_PULL = 0.05  # Danger traded for each tile closer to the nearest pickup
+
+def threat(points, x, y, radius):
+    # Sum of inverse square distances to the points within radius.
+    if not len(points):
+        return 0.0
+    squared = (points[:, 0] - x) ** 2 + (points[:, 1] - y) ** 2
+    near = squared < radius * radius
+    return float(np.sum(1 / np.maximum(squared[near], 0.25)))
+
+def bullet_threat(bullets, x, y):
+    # Bullets that will pass close to (x, y) within the horizon, weighted by
+    # how close and how soon.
+    if not len(bullets):
+        return 0.0
+    rx, ry = bullets["x"] - x, bullets["y"] - y
+    vx, vy = bullets["vx"], bullets["vy"]
+    speed = np.maximum(vx * vx + vy * vy, 1e-9)
+    when = np.clip(-(rx * vx + ry * vy) / speed, 0, BULLET_HORIZON)
+    miss = np.hypot(rx + vx * when, ry + vy * when)
+    near = miss < MISS_DISTANCE
+    return float(np.sum((MISS_DISTANCE - miss[near]) / (when[near] + 0.1)))
+
+def choose_move(game_manager):
+    # A headless player that survives long enough to level up: each tick it
+    # probes a short step in every direction and takes the one with the least
+    # danger from nearby enemies, bosses and bullets, pulled towards the
+    # nearest exp orb or item and pushed back from the map edges.
+    player = game_manager.player
+    world_map = game_manager.tcod_map
+    x, y = player.position
+    bodies = np.array([entity.position for entity in game_manager.enemies + game_manager.bosses],
+                      dtype=float).reshape(-1, 2)
+    bullets = game_manager.enemy_projectiles.data[:len(game_manager.enemy_projectiles)]
+    bullets = bullets[bullets["state"] == MOVING]
+    pickups = np.array([item.position for item in game_manager.items], dtype=float).reshape(-1, 2)
+    if len(pickups):
+        target = pickups[np.argmin((pickups[:, 0] - x) ** 2 + (pickups[:, 1] - y) ** 2)]
+    best, best_cost = None, float("inf")
+    for direction, (dx, dy) in MOVES.items():
+        probe_x, probe_y = x + dx * LOOKAHEAD, y + dy * LOOKAHEAD
+        if direction is not None and not world_map.walkable_at([probe_x], [probe_y])[0]:
+            continue
+        cost = threat(bodies, probe_x, probe_y, DANGER_RADIUS) + BULLET_WEIGHT * bullet_threat(bullets, probe_x, probe_y)
+        edge = min(probe_x, probe_y, world_map.width - probe_x, world_map.height - probe_y)
+        if edge < EDGE_MARGIN:
+            cost += (EDGE_MARGIN - edge) / EDGE_MARGIN
+        if len(pickups):
+            cost += ORB_PULL * float(np.hypot(target[0] - probe_x, target[1] - probe_y))
+        if cost < best_cost:
+            best, best_cost = direction, cost
+    return best
@@ -0,0 +1,209 @@
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import autopilot
+from recording import SessionRecorder
+from stats import BASE_STATS, StatBlock
+
+SAMPLES = 4  # Sessions per configuration in the first round
+CONFIDENCE_Z = 1.96  # 95% intervals
+ETA = 2  # Each round keeps 1/ETA of the configurations and gives them ETA times the sessions
+
+def perk_policies(perks):
+    # One policy per level-up perk that always takes it when offered and
+    # otherwise falls back to the perk order, plus a uniform random pick.
+    order = [perk_id for perk_id, perk in perks.items() if perk.get("level_up")]
+    policies = {f"prefer_{perk_id}": [perk_id] + [other for other in order if other != perk_id] for perk_id in order}
+    policies["random"] = None
+    return policies
+
+def pick_perk(priorities, choices, rng):
+    if priorities is None:
+        return rng.choice(choices)
+    return min(choices, key=lambda choice: priorities.index(choice) if choice in priorities else len(priorities))
+
+def wilson_interval(successes, n, z=CONFIDENCE_Z):
+    if not n:
+        return 0.0, 1.0
+    p = successes / n
+    center = (p + z * z / (2 * n)) / (1 + z * z / n)
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return center - margin, center + margin
+
+def mean_interval(values, z=CONFIDENCE_Z):
+    n = len(values)
+    if n < 2:
+        return -math.inf, math.inf
+    mean = sum(values) / n
+    sd = math.sqrt(sum((value - mean) ** 2 for value in values) / (n - 1))
+    return mean - z * sd / math.sqrt(n), mean + z * sd / math.sqrt(n)
+
+class Arm:
+    # One configuration under test: a perk-pick policy and a parameter set of
+    # BASE_STATS overrides or Player attributes.
+    def __init__(self, policy, priorities, params):
+        self.policy = policy
+        self.priorities = priorities
+        self.params = params
+        self.survived = []
+        self.scores = []
+
+    @property
+    def name(self):
+        params = ", ".join(f"{key}={value}" for key, value in self.params.items())
+        return f"{self.policy} [{params}]" if params else self.policy
+
+    @property
+    def sessions(self):
+        return len(self.scores)
+
+    @property
+    def survival_rate(self):
+        return sum(self.survived) / self.sessions if self.sessions else 0.0
+
+    @property
+    def mean_score(self):
+        return sum(self.scores) / self.sessions if self.sessions else 0.0
+
+    def intervals(self):
+        return {"survival": wilson_interval(sum(self.survived), self.sessions), "score": mean_interval(self.scores)}
+
+    def rank(self):
+        return self.survival_rate, self.mean_score
+
+    def beats(self, other):
+        # True when this arm's interval lies wholly above the other's on
+        # survival rate or on score.
+        mine, theirs = self.intervals(), other.intervals()
+        return any(mine[metric][0] > theirs[metric][1] for metric in mine)
+
+class BalanceRunner:
+    # Plays headless sessions on one GameManager, reset in place between
+    # sessions, with the player steered by the autopilot. Every arm plays the
+    # same seeds, so differences between arms come from the configurations
+    # rather than from luck. With a recorder every session's inputs are saved
+    # for replay.
+    def __init__(self, ticks=None, recorder=None):
+        import main
+        self.main = main
+        self.ticks = ticks or main.GAME_DURATION * main.FPS
+        self.game_manager = main.GameManager()
+        self.game_manager.recorder = recorder
+        self.defaults = {}  # Original values of Player attributes any arm has overridden
+        self.simulations = 0
+
+    def play(self, arm, seed):
+        gm = self.game_manager
+        gm.reset(seed)
+        player = gm.player
+        for name, value in self.defaults.items():
+            setattr(player, name, value)
+        base = dict(BASE_STATS)
+        for name, value in arm.params.items():
+            if name in base:
+                base[name] = value
+            else:
+                self.defaults.setdefault(name, getattr(player, name))
+                setattr(player, name, value)
+        player.stats = StatBlock(player.stats.perks, base)
+        player.health = player.max_health
+        gm.start_game()
+        picks = random.Random(~seed)
+        dt = 1 / self.main.FPS
+        for _ in range(self.ticks):
+            if gm.game_over or gm.game_won:
+                break
+            if gm.level_up_pending:
+                gm.choose_upgrade(pick_perk(arm.priorities, gm.level_up_choices, picks))
+            gm.move_player(autopilot.choose_move(gm), dt)
+            gm.update(dt)
+        if gm.recorder:
+            gm.recorder.save()
+        self.simulations += 1
+        arm.survived.append(not gm.game_over)
+        arm.scores.append(gm.score)
+
+def successive_halving(runner, arms, samples=SAMPLES, budget=None, seed=0, eta=ETA, log=print):
+    # Plays every surviving arm up to the round's session count, then keeps
+    # the best 1/eta by survival rate and score. Arms already beaten by the
+    # leader's confidence interval are dropped as well. Stops when one arm
+    # is left, the leader's intervals separate from every rival, or the
+    # session budget is spent. Returns the arms ranked best first, with arms
+    # that lasted more rounds ahead of those dropped earlier.
+    from checksum import unlogged
+    alive = list(arms)
+    target = samples
+    round_number = 0
+    with unlogged():
+        while True:
+            for arm in alive:
+                while arm.sessions < target:
+                    if budget is not None and runner.simulations >= budget:
+                        break
+                    runner.play(arm, seed + arm.sessions)
+            alive.sort(key=Arm.rank, reverse=True)
+            leader = alive[0]
+            rivals = [arm for arm in alive[1:] if not leader.beats(arm)]
+            log(f"Round {round_number}: {len(alive)} configurations, {target} sessions each, "
+                f"{runner.simulations} simulations, leader {leader.name}")
+            if not rivals or (budget is not None and runner.simulations >= budget):
+                break
+            keep = max(1, math.ceil(len(alive) / eta))
+            alive = [leader] + rivals[:keep - 1]
+            if len(alive) == 1:
+                break
+            target *= eta
+            round_number += 1
+    return sorted(arms, key=lambda arm: (arm in alive, arm.sessions, arm.rank()), reverse=True)
+
+def load_parameter_sets(path):
+    # A JSON list of parameter sets, e.g. [{}, {"max_health": 120}, {"speed": 12}].
+    if not path:
+        return [{}]
+    with open(path) as f:
+        return json.load(f)
+
+def format_report(ranked, simulations, full_sweep):
+    lines = [f"{'configuration':<48} {'sessions':>8} {'survival':>17} {'score':>21}"]
+    for arm in ranked:
+        intervals = arm.intervals()
+        low, high = intervals["survival"]
+        score_low, score_high = intervals["score"]
+        lines.append(f"{arm.name:<48} {arm.sessions:>8} {arm.survival_rate:>6.0%} [{low:.0%}-{high:.0%}]"
+                     f" {arm.mean_score:>8.0f} [{score_low:.0f}-{score_high:.0f}]")
+    lines.append(f"{simulations} simulations spent; sampling every configuration as often as the best needs {full_sweep}")
+    return "\n".join(lines)
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Rank perk policies and player parameters with adaptive sampling.")
+    parser.add_argument("-p", "--params", help="JSON list of parameter sets (BASE_STATS names or Player attributes)")
+    parser.add_argument("--policies", nargs="+", help="perk policies to compare (default: all)")
+    parser.add_argument("-n", "--samples", type=int, default=SAMPLES, help="sessions per configuration in the first round")
+    parser.add_argument("-b", "--budget", type=int, help="maximum simulations")
+    parser.add_argument("-t", "--ticks", type=int, help="session length in ticks (default: full session)")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="first session seed")
+    parser.add_argument("--top", type=int, default=5, help="configurations reported")
+    parser.add_argument("--record", metavar="DIR", help="save every session's inputs here for export.py")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    pygame.init()
+    runner = BalanceRunner(args.ticks, SessionRecorder(args.record) if args.record else None)
+    policies = perk_policies(runner.main.PERKS)
+    if args.policies:
+        policies = {name: policies[name] for name in args.policies}
+    arms = [Arm(policy, priorities, params)
+            for params in load_parameter_sets(args.params) for policy, priorities in policies.items()]
+    ranked = successive_halving(runner, arms, max(2, args.samples), args.budget, args.seed)
+    print(format_report(ranked[:args.top], runner.simulations, ranked[0].sessions * len(ranked)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+import json
+import math
+import numpy as np
+
+BULLETS_FILE = "bullets.json"  # Optional overrides and additions, merged per section by key
+MOVING, VANISHING = 0, 1
+HIT_RANGE = 1  # Bullets closer than this on both axes hit the player
+BULLET_DTYPE = np.dtype([
+    ("x", "f8"),
+    ("y", "f8"),
+    ("vx", "f8"),
+    ("vy", "f8"),
+    ("angle", "f8"),  # Degrees, picks the rotation atlas step
+    ("damage", "f8"),
+    ("kind", "u1"),
+    ("state", "u1"),
+    ("timer", "f8"),  # Time spent vanishing
+    ("frame", "u4"),  # Animation step, wrapped to the atlas length when drawn
+    ("frame_timer", "f8")
+])
+DEFAULT_BULLETS = {
+    # Bullet looks and timing. "atlas" names a rotation atlas; kinds with a
+    # "vanish_atlas" play it for "vanish_duration" seconds after a hit.
+    "kinds": {
+        "slash": {"atlas": "slash", "vanish_atlas": "slash_vanish", "vanish_duration": 0.3,
+                  "frame_duration": 0.1, "scale": 3.0},
+        "boss_bolt": {"atlas": "boss_bolt", "frame_duration": 0.1, "scale": 3.0}
+    },
+    # Emission patterns. A volley is "count" bullets spread over "spread"
+    # degrees (360 makes a ring), centred on the target when "aim" is set or
+    # on "angle" otherwise. "volleys" repeat every "interval" seconds, each
+    # turned a further "spin" degrees.
+    "patterns": {
+        "aimed": {"bullet": "slash", "count": 1, "speed": 40, "damage": 5, "aim": True},
+        "boss_fan": {"bullet": "boss_bolt", "count": 2, "spread": 10, "speed": 40, "damage": 10, "aim": True},
+        "boss_ring": {"bullet": "boss_bolt", "count": 24, "spread": 360, "speed": 20, "damage": 10},
+        "boss_spiral": {"bullet": "boss_bolt", "count": 4, "spread": 360, "speed": 25, "damage": 10,
+                        "volleys": 16, "interval": 0.08, "spin": 11},
+        "boss_burst": {"bullet": "boss_bolt", "count": 5, "spread": 40, "speed": 35, "damage": 10, "aim": True,
+                       "volleys": 3, "interval": 0.2}
+    },
+    # Patterns each enemy class cycles through, one per attack.
+    "shooters": {
+        "Enemy": ["aimed"],
+        "Boss": ["boss_fan"]
+    }
+}
+
+def load_bullets(path=BULLETS_FILE):
+    bullets = {section: dict(entries) for section, entries in DEFAULT_BULLETS.items()}
+    try:
+        with open(path) as f:
+            for section, entries in json.load(f).items():
+                bullets.setdefault(section, {}).update(entries)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"Error loading bullets: {e}")
+    return bullets
+
+def volley_angles(pattern, volley):
+    count = pattern["count"]
+    spread = pattern.get("spread", 0)
+    if count == 1:
+        offsets = np.zeros(1)
+    elif spread >= 360:
+        offsets = np.arange(count) * (360 / count)
+    else:
+        offsets = np.linspace(-spread / 2, spread / 2, count)
+    return offsets + pattern.get("angle", 0) + pattern.get("spin", 0) * volley
+
+class BulletField:
+    # Every enemy bullet lives in one structured array, so a tick advances,
+    # collides and retires all of them in a handful of array operations.
+    # Dead bullets are compacted away at the end of each update.
+    def __init__(self, config, width, height, capacity=1024):
+        self.config = config
+        self.width = width
+        self.height = height
+        self.kind_names = list(config["kinds"])
+        kinds = [config["kinds"][name] for name in self.kind_names]
+        self.vanish_durations = np.array([kind.get("vanish_duration", 0) for kind in kinds], dtype=float)
+        self.frame_durations = np.array([kind.get("frame_duration", 0.1) for kind in kinds], dtype=float)
+        self.data = np.zeros(capacity, dtype=BULLET_DTYPE)
+        self.count = 0
+        self.emitters = []  # [next volley time, pattern, volley, shooter, target]
+
+    def __len__(self):
+        return self.count
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["data"] = self.data[:self.count].copy()
+        return state
+
+    def clear(self):
+        self.count = 0
+        self.emitters.clear()
+
+    def copy(self):
+        # Bullets only, for drawing from another thread.
+        clone = BulletField.__new__(BulletField)
+        clone.__dict__.update(self.__dict__)
+        clone.data = self.data[:self.count].copy()
+        clone.emitters = []
+        return clone
+
+    def reserve(self, extra):
+        if self.count + extra > len(self.data):
+            data = np.zeros(max(2 * len(self.data), self.count + extra), dtype=BULLET_DTYPE)
+            data[:self.count] = self.data[:self.count]
+            self.data = data
+
+    def emit(self, kind, x, y, angles, speed, damage):
+        angles = np.asarray(angles, dtype=float)
+        self.reserve(len(angles))
+        bullets = self.data[self.count:self.count + len(angles)]
+        radians = np.radians(angles)
+        bullets["x"] = x
+        bullets["y"] = y
+        bullets["vx"] = np.cos(radians) * speed
+        bullets["vy"] = np.sin(radians) * speed
+        bullets["angle"] = angles
+        bullets["damage"] = damage
+        bullets["kind"] = self.kind_names.index(kind)
+        bullets["state"] = MOVING
+        bullets["timer"] = 0
+        bullets["frame"] = 0
+        bullets["frame_timer"] = 0
+        self.count += len(angles)
+
+    def fire(self, pattern_name, shooter, target, time):
+        pattern = self.config["patterns"][pattern_name]
+        self.fire_volley(pattern, 0, shooter, target)
+        if pattern.get("volleys", 1) > 1:
+            self.emitters.append([time + pattern["interval"], pattern_name, 1, shooter, target])
+
+    def fire_volley(self, pattern, volley, shooter, target):
+        x, y = shooter.position[0], shooter.position[1]
+        angles = volley_angles(pattern, volley)
+        if pattern.get("aim"):
+            dx, dy = target.position[0] - x, target.position[1] - y
+            if dx == 0 and dy == 0:
+                return
+            angles = angles + math.degrees(math.atan2(dy, dx))
+        self.emit(pattern["bullet"], x, y, angles, pattern["speed"], pattern["damage"])
+
+    def fire_due(self, time):
+        # Later volleys of timed patterns; a dead shooter stops its pattern.
+        for emitter in self.emitters[:]:
+            next_time, pattern_name, volley, shooter, target = emitter
+            pattern = self.config["patterns"][pattern_name]
+            while volley < pattern["volleys"] and next_time <= time and not shooter.is_dead:
+                self.fire_volley(pattern, volley, shooter, target)
+                volley += 1
+                next_time += pattern["interval"]
+            if volley >= pattern["volleys"] or shooter.is_dead:
+                self.emitters.remove(emitter)
+            else:
+                emitter[0], emitter[2] = next_time, volley
+
+    def update(self, dt, player, time):
+        self.fire_due(time)
+        if not self.count:
+            return
+        bullets = self.data[:self.count]
+        x, y = bullets["x"], bullets["y"]
+        moving = bullets["state"] == MOVING
+        vanishing = ~moving
+        # Vanishing bullets have zero velocity, so one pass moves everything.
+        x += bullets["vx"] * dt
+        y += bullets["vy"] * dt
+        hit = moving & (np.abs(x - player.position[0]) < HIT_RANGE) & (np.abs(y - player.position[1]) < HIT_RANGE)
+        if hit.any():
+            player.health -= float(bullets["damage"][hit].sum())
+        vanish_durations = self.vanish_durations[bullets["kind"]]
+        fading = hit & (vanish_durations > 0)
+        bullets["state"][fading] = VANISHING
+        for field in ("vx", "vy", "frame", "frame_timer"):
+            bullets[field][fading] = 0
+        outside = moving & ((x < 0) | (x >= self.width) | (y < 0) | (y >= self.height))
+        bullets["timer"][vanishing] += dt
+        expired = vanishing & (bullets["timer"] >= vanish_durations)
+        bullets["frame_timer"] += dt
+        advance = bullets["frame_timer"] >= self.frame_durations[bullets["kind"]]
+        bullets["frame"][advance] += 1
+        bullets["frame_timer"][advance] = 0
+        keep = ~((hit & ~fading) | outside | expired)
+        if not keep.all():
+            kept = bullets[keep]
+            self.data[:len(kept)] = kept
+            self.count = len(kept)
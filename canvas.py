@@ -0,0 +1,175 @@
+import numpy as np
+import pygame
+
+# "surface" blits software surfaces onto the display; "texture" draws
+# textures through SDL's renderer, using the GPU when one is available;
+# "software" is the texture backend on SDL's software renderer.
+RENDER_BACKENDS = ("surface", "texture", "software")
+
+def rgba(color):
+    return (*color, 255) if len(color) == 3 else tuple(color)
+
+class SurfaceCanvas:
+    # Every sprite is scaled, flipped and rotated on the CPU and blitted onto
+    # the display surface.
+    rotates = False
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.shades = {}
+        self.tiles = {}
+
+    def fill(self, color):
+        self.screen.fill(color)
+
+    def blit(self, surface, position):
+        self.screen.blit(surface, position)
+
+    def sprite(self, image, rect, flip_x=False, angle=0):
+        # Draws image stretched to rect (x, y, width, height). Rotation is
+        # left to pre-rotated atlases on this backend.
+        x, y, width, height = rect
+        if image.get_size() != (width, height):
+            image = pygame.transform.scale(image, (width, height))
+        if flip_x:
+            image = pygame.transform.flip(image, True, False)
+        self.screen.blit(image, (x, y))
+
+    def rotated_sprite(self, frames, rotated_frames, index, angle, center, scale):
+        # rotated_frames are the atlas rotation matching angle.
+        frame = rotated_frames[index]
+        size = (int(frame.get_width() * scale), int(frame.get_height() * scale))
+        frame = pygame.transform.scale(frame, size)
+        self.screen.blit(frame, frame.get_rect(center=center))
+
+    def rect(self, color, rect, width=0):
+        pygame.draw.rect(self.screen, color, rect, width)
+
+    def circle(self, color, center, radius):
+        pygame.draw.circle(self.screen, color, center, radius)
+
+    def shade(self, color, rect=None):
+        # Alpha-blended fill, over the whole screen by default.
+        rect = pygame.Rect(rect or self.screen.get_rect())
+        key = (tuple(color), rect.size)
+        overlay = self.shades.get(key)
+        if overlay is None:
+            overlay = pygame.Surface(rect.size, pygame.SRCALPHA)
+            overlay.fill(color)
+            self.shades[key] = overlay
+        self.screen.blit(overlay, rect.topleft)
+
+    def tile_layer(self, colors, origin, tile_size):
+        # colors is a (height, width, 4) RGBA array with one entry per tile;
+        # tiles with zero alpha are skipped.
+        left, top = origin
+        lit = colors[..., 3] > 0
+        for y, x in zip(*np.nonzero(lit)):
+            color = tuple(colors[y, x].tolist())
+            tile = self.tiles.get((color, tile_size))
+            if tile is None:
+                tile = pygame.Surface((tile_size, tile_size), pygame.SRCALPHA)
+                tile.fill(color)
+                self.tiles[(color, tile_size)] = tile
+            self.screen.blit(tile, (left + x * tile_size, top + y * tile_size))
+
+    def present(self):
+        pygame.display.flip()
+
+class OffscreenCanvas(SurfaceCanvas):
+    # Draws into a plain surface that is never shown, e.g. for exporting
+    # frames without a display.
+    def present(self):
+        pass
+
+class TextureCanvas:
+    # Sprites are uploaded once as textures and the renderer scales, flips
+    # and rotates them while drawing. Transient surfaces such as rendered
+    # text are uploaded per draw.
+    rotates = True
+
+    def __init__(self, renderer):
+        from pygame._sdl2 import video
+        self.video = video
+        self.renderer = renderer
+        self.textures = {}  # id(surface) -> (surface, texture); holding the surface keeps its id unique
+
+    def texture(self, surface):
+        cached = self.textures.get(id(surface))
+        if cached is None:
+            cached = (surface, self.video.Texture.from_surface(self.renderer, surface))
+            self.textures[id(surface)] = cached
+        return cached[1]
+
+    def fill(self, color):
+        self.renderer.draw_color = rgba(color)
+        self.renderer.clear()
+
+    def blit(self, surface, position):
+        texture = self.video.Texture.from_surface(self.renderer, surface)
+        texture.draw(dstrect=(position[0], position[1], surface.get_width(), surface.get_height()))
+
+    def sprite(self, image, rect, flip_x=False, angle=0):
+        self.texture(image).draw(dstrect=rect, angle=angle, flip_x=flip_x)
+
+    def rotated_sprite(self, frames, rotated_frames, index, angle, center, scale):
+        frame = frames[index]
+        width, height = int(frame.get_width() * scale), int(frame.get_height() * scale)
+        rect = (center[0] - width // 2, center[1] - height // 2, width, height)
+        self.texture(frame).draw(dstrect=rect, angle=angle)
+
+    def rect(self, color, rect, width=0):
+        self.renderer.draw_blend_mode = 0
+        self.renderer.draw_color = rgba(color)
+        rect = pygame.Rect(rect)
+        if not width:
+            self.renderer.fill_rect(rect)
+            return
+        # SDL outlines are one pixel wide; thicker borders are four fills.
+        for side in (rect.x, rect.y, rect.width, width), (rect.x, rect.bottom - width, rect.width, width), \
+                    (rect.x, rect.y, width, rect.height), (rect.right - width, rect.y, width, rect.height):
+            self.renderer.fill_rect(side)
+
+    def circle(self, color, center, radius):
+        # Circles are drawn once onto a surface and reused as textures.
+        key = ("circle", tuple(color), radius)
+        cached = self.textures.get(key)
+        if cached is None:
+            surface = pygame.Surface((radius * 2 + 1, radius * 2 + 1), pygame.SRCALPHA)
+            pygame.draw.circle(surface, color, (radius, radius), radius)
+            cached = (surface, self.video.Texture.from_surface(self.renderer, surface))
+            self.textures[key] = cached
+        cached[1].draw(dstrect=(center[0] - radius, center[1] - radius, radius * 2 + 1, radius * 2 + 1))
+
+    def shade(self, color, rect=None):
+        self.renderer.draw_blend_mode = 1  # SDL_BLENDMODE_BLEND
+        self.renderer.draw_color = rgba(color)
+        self.renderer.fill_rect(rect or self.renderer.get_viewport())
+        self.renderer.draw_blend_mode = 0
+
+    def tile_layer(self, colors, origin, tile_size):
+        # One pixel per tile, stretched with nearest sampling: the whole map
+        # layer is a single draw.
+        height, width = colors.shape[:2]
+        surface = pygame.image.frombuffer(np.ascontiguousarray(colors).tobytes(), (width, height), "RGBA")
+        texture = self.video.Texture.from_surface(self.renderer, surface)
+        texture.blend_mode = 1
+        texture.draw(dstrect=(origin[0], origin[1], width * tile_size, height * tile_size))
+
+    def present(self):
+        self.renderer.present()
+
+def create_canvas(backend, size, title):
+    # Opens the game window for the chosen backend. A texture backend that
+    # cannot create its renderer falls back to the surface path.
+    if backend in ("texture", "software"):
+        try:
+            from pygame._sdl2 import video
+            window = video.Window(title, size=size)
+            renderer = video.Renderer(window, accelerated=0 if backend == "software" else -1)
+            return TextureCanvas(renderer)
+        except (ImportError, pygame.error) as e:
+            print(f"Error creating {backend} renderer, using surfaces: {e}")
+    screen = pygame.display.set_mode(size)
+    pygame.display.set_caption(title)
+    return SurfaceCanvas(screen)
@@ -0,0 +1,214 @@
+import argparse
+import contextlib
+import hashlib
+import importlib
+import os
+import random
+import sys
+import numpy as np
+import autopilot
+
+CHECK_EVERY = 60  # Ticks between state hashes
+QUANTUM = 1e-6  # Floats are hashed on this grid so rounding noise in the last bits is ignored
+TICK = 1 / 60
+# Hashed fields per entity group, in order.
+FIELDS = {
+    "session": ["time_elapsed", "score", "current_wave", "enemies_killed", "bosses_defeated", "damage_dealt"],
+    "player": ["x", "y", "health", "mana", "level", "exp"],
+    "enemies": ["x", "y", "health", "is_dead", "state"],
+    "bosses": ["x", "y", "health", "is_dead", "state"],
+    "items": ["x", "y"],
+    "projectiles": ["x", "y", "damage"],
+    "explosions": ["x", "y"],
+    "bullets": ["x", "y", "vx", "vy", "damage", "state"]
+}
+
+def entity_rows(entities, fields):
+    rows = [[entity.position[0], entity.position[1]] + [getattr(entity, field) for field in fields[2:]]
+            for entity in entities]
+    return np.array(rows, dtype=float).reshape(len(rows), len(fields))
+
+def state_tables(game_manager):
+    # One float table per group, rows in list order. Any backend exposing the
+    # GameManager attributes below can be compared with another.
+    gm = game_manager
+    bullets = gm.enemy_projectiles.data[:len(gm.enemy_projectiles)]
+    return {
+        "session": np.array([[getattr(gm, field) for field in FIELDS["session"]]], dtype=float),
+        "player": entity_rows([gm.player], FIELDS["player"]),
+        "enemies": entity_rows(gm.enemies, FIELDS["enemies"]),
+        "bosses": entity_rows(gm.bosses, FIELDS["bosses"]),
+        "items": entity_rows(gm.items, FIELDS["items"]),
+        "projectiles": entity_rows(gm.projectiles, FIELDS["projectiles"]),
+        "explosions": entity_rows(gm.explosions, FIELDS["explosions"]),
+        "bullets": np.column_stack([bullets[field].astype(float) for field in FIELDS["bullets"]])
+    }
+
+def quantize(table):
+    return np.round(table / QUANTUM).astype(np.int64)
+
+def state_hash(game_manager, random_state=None):
+    # Canonical 64-bit hash of entity tables, session counters and both RNGs.
+    # random_state defaults to the global random module's current state.
+    digest = hashlib.blake2b(digest_size=8)
+    for name, table in state_tables(game_manager).items():
+        digest.update(name.encode())
+        digest.update(np.int64(len(table)).tobytes())
+        digest.update(quantize(table).tobytes())
+    version, internal, gauss = random_state or random.getstate()
+    digest.update(np.array(internal, dtype=np.uint32).tobytes())
+    digest.update(repr(game_manager.spawner.rng.bit_generator.state).encode())
+    return digest.hexdigest()
+
+def first_difference(reference, candidate):
+    # (group, index, fields, reference row, candidate row) for the first
+    # entity that differs, or None. A count mismatch reports the first
+    # missing or extra row.
+    a, b = state_tables(reference), state_tables(candidate)
+    for name, fields in FIELDS.items():
+        rows_a, rows_b = quantize(a[name]), quantize(b[name])
+        shared = min(len(rows_a), len(rows_b))
+        differs = np.flatnonzero((rows_a[:shared] != rows_b[:shared]).any(axis=1))
+        if len(differs):
+            index = differs[0]
+            changed = [fields[column] for column in np.flatnonzero(rows_a[index] != rows_b[index])]
+            return name, int(index), changed, a[name][index].tolist(), b[name][index].tolist()
+        if len(rows_a) != len(rows_b):
+            row_a = a[name][shared].tolist() if len(rows_a) > shared else None
+            row_b = b[name][shared].tolist() if len(rows_b) > shared else None
+            return name, shared, ["count"], row_a, row_b
+    return None
+
+class LockstepRun:
+    # One backend stepped tick by tick with the given inputs. Each run keeps its
+    # own copy of the global random state, so two runs can be interleaved.
+    def __init__(self, factory, seed):
+        random.seed(seed)
+        self.game_manager = factory()
+        self.game_manager.reset(seed)
+        self.game_manager.start_game()
+        self.random_state = random.getstate()
+        self.tick = 0
+
+    def step(self, direction, dt=TICK):
+        gm = self.game_manager
+        random.setstate(self.random_state)
+        if gm.level_up_pending:
+            gm.choose_upgrade(gm.level_up_choices[0])
+        gm.move_player(direction, dt)
+        gm.update(dt)
+        self.random_state = random.getstate()
+        self.tick += 1
+
+    def drive(self):
+        # One tick with the autopilot choosing the move.
+        self.step(autopilot.choose_move(self.game_manager))
+
+    @property
+    def finished(self):
+        return self.game_manager.game_over or self.game_manager.game_won
+
+    def hash(self):
+        return state_hash(self.game_manager, self.random_state)
+
+    def checkpoint(self):
+        random.setstate(self.random_state)
+        return self.game_manager.save_state(), self.tick
+
+    def restore(self, checkpoint):
+        data, self.tick = checkpoint
+        self.game_manager = type(self.game_manager).load_state(data)
+        self.game_manager.player.game_manager = self.game_manager
+        self.random_state = random.getstate()
+
+@contextlib.contextmanager
+def unlogged():
+    # Scripted runs are not logged as played sessions.
+    import main
+    log_stats = main.log_stats
+    main.log_stats = lambda **kwargs: None
+    try:
+        yield
+    finally:
+        main.log_stats = log_stats
+
+def rewind(runs, checkpoints, hashes, factories, seed):
+    # Restores each run to its checkpoint. A run whose restored state does
+    # not hash as it did when saved cannot be trusted to replay, so it is
+    # rebuilt and driven from the first tick instead.
+    for index, (run, checkpoint, expected) in enumerate(zip(runs, checkpoints, hashes)):
+        run.restore(checkpoint)
+        if run.hash() == expected:
+            continue
+        run = runs[index] = LockstepRun(factories[index], seed)
+        while run.tick < checkpoint[1]:
+            run.drive()
+
+def compare_backends(reference, candidate, seed=0, ticks=3 * 60 * 60, every=CHECK_EVERY):
+    # Runs both factories on the same seed with the autopilot steering,
+    # hashing every `every` ticks. On a mismatch both runs are rewound to the
+    # last matching checkpoint and replayed one tick at a time to find the
+    # first divergent tick. If the replay cannot reproduce the mismatch, the
+    # first mismatch seen is reported. Returns None when the runs agree, else
+    # (tick, difference) with the difference as reported by first_difference.
+    factories = (reference, candidate)
+    with unlogged():
+        runs = [LockstepRun(factory, seed) for factory in factories]
+        if runs[0].hash() != runs[1].hash():
+            return 0, first_difference(*(run.game_manager for run in runs))
+        checkpoints = [run.checkpoint() for run in runs]
+        hashes = [run.hash() for run in runs]
+        mismatch = None
+        while runs[0].tick < ticks and not (runs[0].finished and runs[1].finished):
+            for _ in range(min(1 if mismatch else every, ticks - runs[0].tick)):
+                for run in runs:
+                    run.drive()
+            if runs[0].hash() != runs[1].hash():
+                if mismatch:
+                    return runs[0].tick, first_difference(*(run.game_manager for run in runs))
+                mismatch = runs[0].tick, first_difference(*(run.game_manager for run in runs))
+                rewind(runs, checkpoints, hashes, factories, seed)
+            elif mismatch is None:
+                checkpoints = [run.checkpoint() for run in runs]
+                hashes = [run.hash() for run in runs]
+            elif runs[0].tick >= mismatch[0]:
+                break
+        return mismatch
+
+def load_backend(path):
+    # "module:attribute" naming a GameManager-compatible factory.
+    module, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module), attribute or "GameManager")
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Check a simulation backend against the reference GameManager.")
+    parser.add_argument("candidate", help="backend factory as module:attribute")
+    parser.add_argument("-r", "--reference", default="main:GameManager", help="reference factory as module:attribute")
+    parser.add_argument("-s", "--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("-t", "--ticks", type=int, default=3 * 60 * 60)
+    parser.add_argument("-e", "--every", type=int, default=CHECK_EVERY, help="ticks between state hashes")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    reference, candidate = load_backend(args.reference), load_backend(args.candidate)
+    failed = 0
+    for seed in args.seeds:
+        result = compare_backends(reference, candidate, seed, args.ticks, args.every)
+        if result is None:
+            print(f"Seed {seed}: identical for {args.ticks} ticks")
+            continue
+        failed += 1
+        tick, (group, index, fields, expected, actual) = result
+        print(f"Seed {seed}: diverged at tick {tick} in {group}[{index}] ({', '.join(fields)})")
+        print(f"  reference {expected}")
+        print(f"  candidate {actual}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import gc
+import tracemalloc
+import pygame
+
+DIAGNOSTICS_FILE = "memory_report.txt"
+GROWTH_LIMIT = 4 * 1024 * 1024  # Bytes of traced memory a wave may add before it is flagged
+TOP_LINES = 10  # Allocation sites listed per wave
+TRACE_FRAMES = 1
+GAME_MODULES = ("__main__", "main", "animation", "bullets", "spawner", "stats", "world_map")
+
+def surface_bytes(surface):
+    return surface.get_bytesize() * surface.get_width() * surface.get_height()
+
+def owned_surfaces(value, depth=2):
+    # Surfaces held directly by an attribute or inside its lists, tuples and
+    # dicts, a couple of levels deep. Surfaces are not tracked by gc, so they
+    # are found through the objects that hold them.
+    if isinstance(value, pygame.Surface):
+        yield value
+    elif depth and isinstance(value, (list, tuple)):
+        for item in value:
+            yield from owned_surfaces(item, depth - 1)
+    elif depth and isinstance(value, dict):
+        for item in value.values():
+            yield from owned_surfaces(item, depth - 1)
+
+def census(modules=GAME_MODULES):
+    # Live instances of every game class found by gc, with the bytes of the
+    # distinct surfaces they hold. Frames shared between instances count once
+    # per class.
+    counts = {}
+    surfaces = {}
+    for obj in gc.get_objects():
+        cls = type(obj)
+        if cls.__module__ not in modules or not hasattr(obj, "__dict__"):
+            continue
+        name = cls.__name__
+        counts[name] = counts.get(name, 0) + 1
+        held = surfaces.setdefault(name, {})
+        for value in vars(obj).values():
+            for surface in owned_surfaces(value):
+                held[id(surface)] = surface_bytes(surface)
+    return {name: (count, sum(surfaces[name].values())) for name, count in counts.items()}
+
+class MemoryMonitor:
+    # Opt-in leak detector. At every wave transition it takes a census of live
+    # game objects and a tracemalloc snapshot, diffs both against the previous
+    # wave and appends a report. Waves whose traced memory grows by more than
+    # growth_limit are kept in failures; check() raises on them.
+    def __init__(self, path=DIAGNOSTICS_FILE, growth_limit=GROWTH_LIMIT, top=TOP_LINES):
+        self.path = path
+        self.growth_limit = growth_limit
+        self.top = top
+        self.wave = None
+        self.snapshot = None
+        self.counts = {}
+        self.failures = []
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+        self.file = open(path, "a") if path else None
+
+    def sample(self, game_manager):
+        if game_manager.current_wave != self.wave:
+            self.wave_report(game_manager.current_wave)
+
+    def take_snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")
+        ))
+
+    def wave_report(self, wave):
+        gc.collect()
+        counts = census()
+        snapshot = self.take_snapshot()
+        lines = [f"Wave {wave}: {tracemalloc.get_traced_memory()[0] / 1024:.0f} KiB traced"]
+        for name, (count, size) in sorted(counts.items(), key=lambda entry: -entry[1][1]):
+            previous = self.counts.get(name, (0, 0))[0]
+            lines.append(f"  {name:<16} {count:>7} live ({count - previous:+d})  {size / 1024:>9.0f} KiB surfaces")
+        if self.snapshot is not None:
+            stats = snapshot.compare_to(self.snapshot, "lineno")
+            growth = sum(stat.size_diff for stat in stats)
+            lines.append(f"  Growth since wave {self.wave}: {growth / 1024:+.0f} KiB")
+            for stat in stats[:self.top]:
+                lines.append(f"    {stat}")
+            if growth > self.growth_limit:
+                self.failures.append((wave, growth))
+                lines.append(f"  Growth exceeds {self.growth_limit / 1024:.0f} KiB")
+        report = "\n".join(lines)
+        print(report)
+        if self.file:
+            self.file.write(report + "\n")
+            self.file.flush()
+        self.wave = wave
+        self.snapshot = snapshot
+        self.counts = counts
+        return report
+
+    def check(self):
+        if self.failures:
+            waves = ", ".join(f"wave {wave} (+{growth / 1024:.0f} KiB)" for wave, growth in self.failures)
+            raise RuntimeError(f"Memory grew past {self.growth_limit / 1024:.0f} KiB in {waves}")
+
+    def close(self):
+        if self.file:
+            self.file.close()
+        tracemalloc.stop()
@@ -0,0 +1,117 @@
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import pygame
+import main as game
+from canvas import OffscreenCanvas
+from checksum import unlogged
+from recording import RECORDING_SUFFIX, load_recording, replay
+
+EXPORT_DIR = "footage"
+FRAME_SKIP = 2  # Simulation ticks per exported frame
+SCALE = 0.5  # Exported frame size relative to the screen
+PENDING_PER_JOB = 4  # Frames queued per worker before rendering waits for encoding
+
+def encode_png(pixels, size, path):
+    pygame.image.save(pygame.image.frombytes(pixels, size, "RGB"), path)
+    return path
+
+class PngSequence:
+    # Frames are encoded by a process pool. At most PENDING_PER_JOB frames per
+    # worker are in flight, so a long session never piles up in memory.
+    def __init__(self, directory, jobs):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+        self.pending = deque()
+        self.limit = jobs * PENDING_PER_JOB
+        self.count = 0
+
+    def write(self, pixels, size):
+        path = os.path.join(self.directory, f"frame_{self.count:06d}.png")
+        self.count += 1
+        if self.pool is None:
+            encode_png(pixels, size, path)
+            return
+        self.pending.append(self.pool.submit(encode_png, pixels, size, path))
+        while len(self.pending) > self.limit:
+            self.pending.popleft().result()
+
+    def close(self):
+        while self.pending:
+            self.pending.popleft().result()
+        if self.pool:
+            self.pool.shutdown()
+
+class RawStream:
+    # Packed RGB24 frames back to back, e.g. for
+    # ffmpeg -f rawvideo -pix_fmt rgb24 -s WxH -r FPS -i session.rgb out.mp4
+    # A path of "-" writes to stdout for piping.
+    def __init__(self, path):
+        self.file = sys.stdout.buffer if path == "-" else open(path, "wb")
+        self.count = 0
+
+    def write(self, pixels, size):
+        self.file.write(pixels)
+        self.count += 1
+
+    def close(self):
+        if self.file is sys.stdout.buffer:
+            self.file.flush()
+        else:
+            self.file.close()
+
+def export_session(writer, recording, skip=FRAME_SKIP, scale=SCALE):
+    # Replays a recorded session as fast as it simulates and draws every
+    # `skip`-th tick, and the last, onto an offscreen surface. Returns the
+    # frame size written.
+    surface = pygame.Surface((game.SCREEN_WIDTH, game.SCREEN_HEIGHT))
+    canvas = OffscreenCanvas(surface)
+    size = (max(1, int(game.SCREEN_WIDTH * scale)), max(1, int(game.SCREEN_HEIGHT * scale)))
+    background_image = game.load_background()
+    fonts = pygame.font.SysFont(None, 48), pygame.font.SysFont(None, 36), pygame.font.SysFont(None, 24)
+    last = len(recording["ticks"])
+    with unlogged():
+        for tick, game_manager in enumerate(replay(recording), 1):
+            if tick % skip and tick != last:
+                continue
+            game.draw_frame(canvas, game_manager, background_image, *fonts)
+            frame = surface if size == surface.get_size() else pygame.transform.smoothscale(surface, size)
+            writer.write(pygame.image.tobytes(frame, "RGB"), size)
+    return size
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Render a recorded Arcane Conquest session to footage without a display. "
+                                                 "Sessions are recorded with ARCANE_RECORD=1 or balance.py --record.")
+    parser.add_argument("recording", help=f"recorded session ({RECORDING_SUFFIX} file)")
+    parser.add_argument("-f", "--format", choices=["png", "raw"], default="png")
+    parser.add_argument("-o", "--output", help=f"PNG directory (default {EXPORT_DIR}/SESSION) or raw file, - for stdout")
+    parser.add_argument("-k", "--skip", type=int, default=FRAME_SKIP, help="simulation ticks per frame")
+    parser.add_argument("--scale", type=float, default=SCALE, help="frame size relative to the screen")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="PNG encoding processes")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    pygame.init()
+    recording = load_recording(args.recording)
+    session = os.path.basename(args.recording).removesuffix(RECORDING_SUFFIX)
+    if args.format == "png":
+        writer = PngSequence(args.output or os.path.join(EXPORT_DIR, session), args.jobs)
+    else:
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        writer = RawStream(args.output or os.path.join(EXPORT_DIR, f"{session}.rgb"))
+    try:
+        size = export_session(writer, recording, max(1, args.skip), args.scale)
+    finally:
+        writer.close()
+    fps = game.FPS / max(1, args.skip)
+    print(f"Wrote {writer.count} frames at {size[0]}x{size[1]}, {fps:g} fps", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
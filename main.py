@@ -4,30 +4,110 @@ import tcod.libtcodpy as libtcodpy
 import random
 import math
 import uuid
-from stat_log import log_stats, init_csv
+import threading
+import functools
+import itertools
+import operator
+import copy
+import queue
+import types
+import os
+import time
+import numpy as np
+from stat_log import log_stats, init_log, shutdown as shutdown_stat_log
+from telemetry import TelemetryRecorder
+from diagnostics import MemoryMonitor
+from recording import SessionRecorder
+from asset_bundle import AssetLoader, load_image, open_bundle
+from world_map import MAX_MAP_SIZE, WorldMap
+from spawner import VIEW_MARGIN, WaveSpawner, load_waves
+from stats import StatBlock, load_perks
+from bullets import BulletField, load_bullets
+from canvas import create_canvas
+from animation import ATTACKED, ATTACKING, DEAD, STATE_FRAMES, AnimationClock
+import asset_bundle
+import savestate
 
 # Constants
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 TILE_SIZE = 16
-MAP_WIDTH = 160
-MAP_HEIGHT = 120
+MAP_WIDTH = min(MAX_MAP_SIZE, int(os.environ.get("ARCANE_MAP_WIDTH", 160)))
+MAP_HEIGHT = min(MAX_MAP_SIZE, int(os.environ.get("ARCANE_MAP_HEIGHT", 120)))
+MAP_GENERATOR = os.environ.get("ARCANE_MAP", "open")  # "open" or "procedural"
 GAME_DURATION = 180  # 3 minutes session
-BOSS_SPAWN_TIME = 70
 FPS = 60
 ZOOM_FACTOR = 1.5  # Camera zoom level
 ITEM_SCALE_FACTOR = 1.5
+ROTATION_STEPS = 64  # Quantized projectile angles, clamped to 32-128
+ORB_MERGE_THRESHOLD = 100  # Exp orbs on the ground before nearby ones are merged
+ORB_MERGE_CELL_SIZE = 2  # Tiles
+ORB_MERGE_MAX_CELL_SIZE = 8  # Tiles; caps the merge cell so only nearby orbs are merged
+ITEM_DROP_LIMIT = 40  # Heal and Book items on the ground before further drops are skipped
+STOP_RANGE = 9  # Tiles from the player where enemies stop advancing
+SEPARATION_RADIUS = 1.5  # Tiles; closer enemies push each other apart
+SEPARATION_WEIGHT = 2.0
+BULLET_CULL_MARGIN = 9  # Tiles outside the screen where bullet centres are still drawn (rotated boss bolts)
+TELEMETRY_ENABLED = os.environ.get("ARCANE_TELEMETRY") == "1"  # Opt-in per-tick recording
+DIAGNOSTICS_ENABLED = os.environ.get("ARCANE_DIAGNOSTICS") == "1"  # Opt-in per-wave memory reports
+RECORDING_ENABLED = os.environ.get("ARCANE_RECORD") == "1"  # Opt-in input recordings for replay and export
+THREADED_SIMULATION = os.environ.get("ARCANE_THREADED") == "1"  # Simulate on a fixed tick in its own thread
+RENDER_BACKEND = os.environ.get("ARCANE_RENDERER", "surface")  # "surface", "texture" or "software"; see canvas.py
+
+# Asset paths
+BACKGROUND_PATH = "Background/background1.png"
+PLAYER_FRAME_PATHS = [f"Player/player ({i}).gif" for i in range(1, 14)]
+ENEMY_FRAME_PATHS = {
+    'running': [f"Enemies/Enemy ({i}).gif" for i in range(1, 6)],
+    'attacked': [f"Enemies/Attacked/Attacked ({i}).gif" for i in range(1, 5)],
+    'attack': [f"Enemies/Attack/Attack ({i}).gif" for i in range(1, 12)],
+    'death': [f"Enemies/Death/death ({i}).gif" for i in range(1, 23)],
+    'idle': [f"Enemies/Idle/Idle ({i}).gif" for i in range(1, 9)]
+}
+BOSS_FRAME_PATHS = {
+    'running': [f"Boss/Run/Run ({i}).gif" for i in range(1, 8)],
+    'attack': [f"Boss/Attack/Attack ({i}).gif" for i in range(1, 7)],
+    'death': [f"Boss/Death/Death ({i}).gif" for i in range(1, 8)],
+    'idle': [f"Boss/Idle/Idle ({i}).gif" for i in range(1, 4)]
+}
+MAGICBOLT_FRAME_PATHS = [f"Magicbolt/magicbolt ({i}).gif" for i in range(1, 30)]
+ELECTRICBURST_FRAME_PATHS = [f"Electricburst/electricburst ({i}).png" for i in range(1, 16)]
+EXPLOSION_FRAME_PATHS = [f"Explosion/Explosion ({i}).gif" for i in range(1, 13)]
+SLASH_FRAME_PATHS = [f"EnemiesProjectile/FlyingSlash/Slash ({i}).gif" for i in range(1, 6)]
+SLASH_VANISH_FRAME_PATHS = [f"EnemiesProjectile/SlashVanish/vanish ({i}).gif" for i in range(1, 4)]
+BOSS_BOLT_FRAME_PATHS = [f"BossProjectile/BossBolt/Bolt ({i}).gif" for i in range(1, 30)]
+HEAL_PATH = "Items/heal.png"
+BOOK_PATH = "Items/book.png"
+FRAME_LIST_PATHS = {
+    "player": PLAYER_FRAME_PATHS,
+    "explosion": EXPLOSION_FRAME_PATHS,
+    "electricburst": ELECTRICBURST_FRAME_PATHS
+}
+FRAME_SET_PATHS = {"Enemy": ENEMY_FRAME_PATHS, "Boss": BOSS_FRAME_PATHS}
+# Entity groups drawn by draw_frame: view attribute, depth (higher draws on
+# top) and cull margin in tiles, about half the largest sprite. Explosions
+# grow with perks, so only the FOV culls them.
+DRAW_LAYERS = (
+    ("items", 0, 1),
+    ("enemies", 1, 6),
+    ("bosses", 1, 6),
+    ("projectiles", 2, 7),
+    ("explosions", 3, None)
+)
+ITEM_IMAGES = {"heal": (HEAL_PATH, (0, 255, 0)), "book": (BOOK_PATH, (255, 0, 0))}  # Path, fallback colour
+PERKS = load_perks()
+BULLETS = load_bullets()
+UPGRADE_INFO = {perk_id: (perk["name"], perk["description"], perk["icon"])
+                for perk_id, perk in PERKS.items() if perk.get("level_up")}
 
 class Camera:
     def __init__(self, width, height, tcod_map):
         self.width = width
         self.height = height
         self.tcod_map = tcod_map
-        self.fov_map = tcod.map.Map(width=MAP_WIDTH, height=MAP_HEIGHT)
-        for y in range(MAP_HEIGHT):
-            for x in range(MAP_WIDTH):
-                self.fov_map.transparent[y, x] = tcod_map.transparent[y, x]
-                self.fov_map.walkable[y, x] = tcod_map.walkable[y, x]
+        self.fov_map = None
+        self.fov_origin = (0, 0)
+        self.window_walkable = None
         self.x = 0
         self.y = 0
         self.zoom = ZOOM_FACTOR
@@ -35,32 +115,87 @@ class Camera:
     def update(self, player_x, player_y):
         self.x = player_x * TILE_SIZE * self.zoom - (self.width // 2)
         self.y = player_y * TILE_SIZE * self.zoom - (self.height // 2)
+        # FOV only covers the active chunk window, rebuilt when the player changes chunk.
+        if self.tcod_map.focus(player_x, player_y) or self.fov_map is None:
+            height, width = self.tcod_map.window_walkable.shape
+            self.fov_map = tcod.map.Map(width=width, height=height)
+            self.fov_map.transparent[:] = self.tcod_map.window_transparent
+            self.fov_map.walkable[:] = self.tcod_map.window_walkable
+            self.fov_origin = self.tcod_map.window_origin
+            self.window_walkable = self.tcod_map.window_walkable
         self.fov_map.compute_fov(
-            int(player_x), int(player_y),
+            int(player_x) - self.fov_origin[0], int(player_y) - self.fov_origin[1],
             radius=20,
             light_walls=True,
             algorithm=libtcodpy.FOV_DIAMOND
         )
 
+    def in_fov(self, x, y):
+        x, y = int(x) - self.fov_origin[0], int(y) - self.fov_origin[1]
+        height, width = self.fov_map.fov.shape
+        return 0 <= x < width and 0 <= y < height and bool(self.fov_map.fov[y, x])
+
+    def fov_mask(self, xs, ys):
+        # Vectorized in_fov for arrays of positions.
+        xs = np.asarray(xs).astype(np.int64) - self.fov_origin[0]
+        ys = np.asarray(ys).astype(np.int64) - self.fov_origin[1]
+        fov = self.fov_map.fov
+        height, width = fov.shape
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        visible = np.zeros(len(xs), dtype=bool)
+        visible[inside] = fov[ys[inside], xs[inside]]
+        return visible
+
+    def view_rect(self, margin=0):
+        # Visible tiles as (left, top, right, bottom), widened by margin tiles.
+        tile_size = TILE_SIZE * self.zoom
+        return (self.x / tile_size - margin, self.y / tile_size - margin,
+                (self.x + self.width) / tile_size + margin, (self.y + self.height) / tile_size + margin)
+
     def to_screen(self, x, y):
         screen_x = x * TILE_SIZE * self.zoom - self.x
         screen_y = y * TILE_SIZE * self.zoom - self.y
         return int(screen_x), int(screen_y)
 
+    def screen_positions(self, xs, ys):
+        # Vectorized to_screen, truncating the same way.
+        screen_x = np.asarray(xs, dtype=float) * TILE_SIZE * self.zoom - self.x
+        screen_y = np.asarray(ys, dtype=float) * TILE_SIZE * self.zoom - self.y
+        return screen_x.astype(np.int64), screen_y.astype(np.int64)
+
+    def on_screen(self, screen_x, screen_y, margin=0):
+        # Screen positions inside the view widened by margin tiles; margin may
+        # be an array with one entry per position.
+        margin = np.asarray(margin) * TILE_SIZE * self.zoom
+        return ((screen_x >= -margin) & (screen_x < self.width + margin) &
+                (screen_y >= -margin) & (screen_y < self.height + margin))
+
 class GameManager:
     def __init__(self):
-        self.tcod_map = tcod.map.Map(width=MAP_WIDTH, height=MAP_HEIGHT)
-        for y in range(MAP_HEIGHT):
-            for x in range(MAP_WIDTH):
-                self.tcod_map.walkable[y, x] = True
-                self.tcod_map.transparent[y, x] = True
+        build_rotation_atlases()
+        self.tcod_map = WorldMap(MAP_WIDTH, MAP_HEIGHT, MAP_GENERATOR, random.getrandbits(32))
         self.player = Player("Mage", [MAP_WIDTH // 2, MAP_HEIGHT // 2], self)
         self.enemies = []
         self.bosses = []
         self.items = []
         self.projectiles = []
-        self.enemy_projectiles = []
+        self.enemy_projectiles = BulletField(BULLETS, MAP_WIDTH, MAP_HEIGHT)
         self.explosions = []
+        self.camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT, self.tcod_map)
+        self.spawner = WaveSpawner(load_waves())
+        self.animations = AnimationClock()
+        self.recorder = None
+        self.reset()
+
+    def reset(self, seed=None):
+        # Starts a new session in place. The map, camera FOV, spawn rings and
+        # loaded assets are kept; only session state is cleared and reseeded.
+        if seed is not None:
+            random.seed(seed)
+        self.player.reset([MAP_WIDTH // 2, MAP_HEIGHT // 2])
+        for group in (self.enemies, self.bosses, self.items, self.projectiles, self.enemy_projectiles, self.explosions):
+            group.clear()
+        self.animations.clear()
         self.current_wave = 0
         self.time_elapsed = 0
         self.score = 0
@@ -72,15 +207,19 @@ class GameManager:
         self.level_up_pending = False
         self.level_up_choices = []
         self.damage_dealt = 0
-        self.cooldown_reduction = 0
-        self.camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT, self.tcod_map)
+        self.camera.update(self.player.position[0], self.player.position[1])
+        self.spawner.reset(random.getrandbits(32))
         self.session_id = str(uuid.uuid4())
         self.enemies_defeated_per_wave = []
         self.current_wave_enemies_killed = 0
+        self.unmerged_orb_count = 0
 
     def start_game(self):
         self.current_wave = 0
-        self.spawn_enemies(10)
+        self.spawner.queue_wave(self.current_wave)
+        self.spawn_pending()
+        if self.recorder:
+            self.recorder.begin(self)
 
     def defeat_enemy(self, enemy):
         if enemy in self.enemies:
@@ -89,144 +228,278 @@ class GameManager:
     def update(self, dt):
         if self.game_over or self.game_won or self.paused or self.level_up_pending:
             return
+        if self.recorder:
+            self.recorder.tick(dt)
         self.time_elapsed += dt
         if self.player.health <= 0:
             self.end_game()
         self.camera.update(self.player.position[0], self.player.position[1])
         self.player.update(dt, self.projectiles, self.enemies, self.explosions, self.time_elapsed)
-        for item in self.items[:]:
-            distance = ((self.player.position[0] - item.position[0])**2 + 
-                       (self.player.position[1] - item.position[1])**2)**0.5
-            if distance < 1:
-                self.score += item.value
-                if isinstance(item, Item):
-                    item.apply_effect(self.player)
-                elif isinstance(item, ExpOrb):
-                    if self.player.gain_exp(item.exp):
-                        self.trigger_level_up()
-                self.items.remove(item)
-            elif distance <= self.player.item_pickup_range:
-                item.update(dt, self.player, self.tcod_map)
-        if not self.enemies and not self.bosses and not self.game_over:
+        self.update_items(dt)
+        if not self.enemies and not self.bosses and not self.spawner.pending and not self.game_over:
             self.enemies_defeated_per_wave.append(self.current_wave_enemies_killed)
             self.current_wave_enemies_killed = 0
             self.current_wave += 1
-            self.spawn_enemies(self.current_wave + 10)
-        if self.time_elapsed >= BOSS_SPAWN_TIME and not self.bosses:
-            angle = random.uniform(0, 2 * math.pi)
-            distance = random.uniform(5, 40)  # Spawn within 40 tiles
-            x = self.player.position[0] + math.cos(angle) * distance
-            y = self.player.position[1] + math.sin(angle) * distance
-            x = max(0, min(MAP_WIDTH - 1, x))
-            y = max(0, min(MAP_HEIGHT - 1, y))
-            while abs(x - self.player.position[0]) < 1 and abs(y - self.player.position[1]) < 1:
-                angle = random.uniform(0, 2 * math.pi)
-                distance = random.uniform(5, 40)
-                x = self.player.position[0] + math.cos(angle) * distance
-                y = self.player.position[1] + math.sin(angle) * distance
-                x = max(0, min(MAP_WIDTH - 1, x))
-                y = max(0, min(MAP_HEIGHT - 1, y))
-            self.bosses.append(Boss([x, y]))
+            self.spawner.queue_wave(self.current_wave)
+        if self.spawner.boss_due(self.time_elapsed, self.bosses):
+            self.spawner.queue("boss", 1)
+        self.spawn_pending()
         self.player.attack(self.projectiles, self.enemies, self.time_elapsed)
+        self.steer_crowd()
+        self.update_enemies(self.enemies, dt)
         for enemy in self.enemies[:]:
-            enemy.update(dt, self.player, self.tcod_map, self.enemy_projectiles, self.time_elapsed, self)
             if enemy.is_dead and not enemy.is_animating:
                 self.enemies.remove(enemy)
+                self.animations.release(enemy.slot)
                 self.score += 100
                 self.current_wave_enemies_killed += 1
                 orb = ExpOrb(list(enemy.position))
                 self.items.append(orb)
-                if random.random() < 0.15:
-                    item_type = random.choice([Heal, Book])
-                    self.items.append(item_type(list(enemy.position)))
+                self.drop_item(enemy.position, 0.15)
+        if len(self.items) > ORB_MERGE_THRESHOLD:
+            self.coalesce_orbs()
         for projectile in self.projectiles[:]:
             projectile.update(dt, self.enemies, self)
-        for enemy_projectile in self.enemy_projectiles[:]:
-            enemy_projectile.update(dt, self.player, self)
-            if not enemy_projectile.active:
-                self.enemy_projectiles.remove(enemy_projectile)
+            if not projectile.active:
+                self.projectiles.remove(projectile)
+        self.enemy_projectiles.update(dt, self.player, self.time_elapsed)
         for explosion in self.explosions[:]:
             explosion.update(dt, self.enemies, self)
             if not explosion.active:
                 self.explosions.remove(explosion)
+        self.update_enemies(self.bosses, dt)
         for boss in self.bosses[:]:
-            boss.update(dt, self.player, self.tcod_map, self.enemy_projectiles, self.time_elapsed, self)
             if boss.health <= 0:
                 self.defeat_boss(boss)
         if self.time_elapsed >= GAME_DURATION:
             self.win_game()
 
+    def update_enemies(self, group, dt):
+        # Animation, state changes, movement and attack checks for a whole
+        # group in batched passes; Python only loops over the enemies whose
+        # attack fires or starts this tick, plus one position write-back.
+        if not group:
+            return
+        slots = np.array([enemy.slot for enemy in group])
+        fired = self.animations.advance(dt, slots)
+        for index in np.flatnonzero(fired):
+            group[index].fire_projectile(self.player, self.enemy_projectiles, self.time_elapsed)
+        free = ~self.animations.busy(slots)
+        movers = [enemy for enemy, is_free in zip(group, free) if is_free]
+        if not movers:
+            return
+        positions = np.array([enemy.position for enemy in movers], dtype=float)
+        steering = np.array([enemy.steering for enemy in movers], dtype=float)
+        speeds = np.array([enemy.speed for enemy in movers], dtype=float)
+        moved_to = slide_steps(self.tcod_map, positions, positions + steering * speeds[:, None] * dt)
+        for enemy, (x, y) in zip(movers, moved_to.tolist()):
+            enemy.position[0] = x
+            enemy.position[1] = y
+        self.animations.settle(slots[free], (np.abs(moved_to - positions) > 0.01).any(axis=1))
+        offsets = moved_to - np.array(self.player.position, dtype=float)
+        distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        ranges = np.array([enemy.attack_range for enemy in movers])
+        cooled = np.array([self.time_elapsed - enemy.last_attack_time >= enemy.attack_interval for enemy in movers])
+        for index in np.flatnonzero((distances <= ranges) & cooled):
+            movers[index].start_attack_animation()
+            movers[index].last_attack_time = self.time_elapsed
+
+    def update_items(self, dt):
+        if not self.items:
+            return
+        positions = np.array([item.position for item in self.items], dtype=float)
+        speeds = np.array([item.speed for item in self.items], dtype=float)
+        offsets = np.array(self.player.position, dtype=float) - positions
+        distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        picked = distances < 1
+        magnetized = ~picked & (distances <= self.player.item_pickup_range)
+        steps = offsets[magnetized] / distances[magnetized, None] * (speeds[magnetized, None] * dt)
+        for index, (step_x, step_y) in zip(np.flatnonzero(magnetized), steps):
+            position = self.items[index].position
+            position[0] += float(step_x)
+            position[1] += float(step_y)
+        if not picked.any():
+            return
+        for index in np.flatnonzero(picked):
+            item = self.items[index]
+            self.score += item.value
+            if isinstance(item, Item):
+                item.apply_effect(self.player)
+            elif isinstance(item, ExpOrb):
+                if self.player.gain_exp(item.exp):
+                    self.trigger_level_up()
+        self.items = [item for item, taken in zip(self.items, picked) if not taken]
+
+    def drop_item(self, position, chance):
+        # Heal and Book effects stack per pickup, so unlike exp orbs they
+        # cannot be merged; drops past ITEM_DROP_LIMIT are skipped instead.
+        # The rolls are made either way so the random sequence is unchanged.
+        if random.random() < chance:
+            item_type = random.choice([Heal, Book])
+            if sum(isinstance(item, Item) for item in self.items) < ITEM_DROP_LIMIT:
+                self.items.append(item_type(list(position)))
+
+    def coalesce_orbs(self):
+        # Orbs that found nothing to merge are only looked at again once
+        # their count changes.
+        orbs = [item for item in self.items if isinstance(item, ExpOrb)]
+        if len(orbs) <= ORB_MERGE_THRESHOLD or len(orbs) == self.unmerged_orb_count:
+            return
+        positions = np.array([orb.position for orb in orbs], dtype=float)
+        cell_size = ORB_MERGE_CELL_SIZE
+        while True:
+            cells = np.floor(positions / cell_size).astype(np.int64)
+            _, groups = np.unique(cells, axis=0, return_inverse=True)
+            groups = groups.ravel()
+            group_count = groups.max() + 1
+            if group_count <= ORB_MERGE_THRESHOLD or cell_size >= ORB_MERGE_MAX_CELL_SIZE:
+                break
+            cell_size *= 2
+        if group_count == len(orbs):
+            self.unmerged_orb_count = len(orbs)
+            return
+        counts = np.bincount(groups)
+        merged_x = np.bincount(groups, weights=positions[:, 0]) / counts
+        merged_y = np.bincount(groups, weights=positions[:, 1]) / counts
+        merged_value = np.bincount(groups, weights=[orb.value for orb in orbs])
+        merged_exp = np.bincount(groups, weights=[orb.exp for orb in orbs])
+        self.items = [item for item in self.items if not isinstance(item, ExpOrb)]
+        for i in range(group_count):
+            self.items.append(ExpOrb(
+                [float(merged_x[i]), float(merged_y[i])],
+                value=int(round(merged_value[i])),
+                exp=int(round(merged_exp[i]))
+            ))
+
+    def steer_crowd(self):
+        # One batched pass sets the steering of every enemy and boss that can
+        # move this tick: the flow toward the player (straight at it for
+        # bosses and for enemies the flow field does not reach), cut off inside
+        # STOP_RANGE, plus separation from neighbours.
+        group = self.enemies + self.bosses
+        if not group:
+            return
+        busy = self.animations.busy(np.array([enemy.slot for enemy in group]))
+        movers = [enemy for enemy, is_busy in zip(group, busy) if not is_busy and not enemy.is_dead]
+        if not movers:
+            return
+        positions = np.array([enemy.position for enemy in movers], dtype=float)
+        player_position = np.array(self.player.position, dtype=float)
+        offsets = player_position - positions
+        distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        is_boss = np.array([isinstance(enemy, Boss) for enemy in movers])
+
+        steering = offsets / np.maximum(distances, 1e-9)[:, None]
+        step_x, step_y, in_field = self.tcod_map.flow_steps(player_position, positions[:, 0], positions[:, 1])
+        # Enemies head for the centre of the next tile along the flow, at the
+        # stride of the second tile to match the old A* speed.
+        flow = np.column_stack([step_x[0], step_y[0]]) + 0.5 - positions
+        stride = np.hypot(step_x[1] + 0.5 - positions[:, 0], step_y[1] + 0.5 - positions[:, 1])
+        flow *= (stride / np.maximum(np.hypot(flow[:, 0], flow[:, 1]), 1e-9))[:, None]
+        stuck = (step_x[1] == positions[:, 0].astype(np.int64)) & (step_y[1] == positions[:, 1].astype(np.int64))
+        flow[stuck] = 0
+        use_flow = in_field & ~is_boss
+        steering[use_flow] = flow[use_flow]
+        outside = ~in_field & ~is_boss
+        steering[outside] = np.sign(np.floor(player_position) - np.floor(positions[outside]))
+        steering[distances <= STOP_RANGE] = 0
+
+        for enemy, (dx, dy) in zip(movers, steering):
+            if dx < 0:
+                enemy.facing_right = False
+            elif dx > 0:
+                enemy.facing_right = True
+        steering += separation_forces(positions, SEPARATION_RADIUS) * SEPARATION_WEIGHT
+        for enemy, (dx, dy) in zip(movers, steering):
+            enemy.steering = (float(dx), float(dy))
+
     def defeat_boss(self, boss):
         if boss in self.bosses:
             self.bosses.remove(boss)
+            self.animations.release(boss.slot)
+            boss.is_dead = True  # Ends any bullet pattern it is still firing
             self.score += 1000
             self.bosses_defeated += 1
             orb = ExpOrb(list(boss.position), value=200, exp=50)
             self.items.append(orb)
-            if random.random() < 0.8:
-                item_type = random.choice([Heal, Book])
-                self.items.append(item_type(list(boss.position)))
+            self.drop_item(boss.position, 0.8)
 
     def record_damage(self, amount):
         self.damage_dealt += amount
 
     def handle_events(self, dt):
         for event in pygame.event.get():
-            if event.type == pygame.QUIT:
+            if not self.handle_event(event):
                 return False
-            if event.type == pygame.KEYDOWN and not self.game_over and not self.game_won:
-                if event.key == pygame.K_ESCAPE:
-                    self.paused = not self.paused
-                elif self.level_up_pending and event.key in [pygame.K_1, pygame.K_2, pygame.K_3]:
-                    choice_idx = {pygame.K_1: 0, pygame.K_2: 1, pygame.K_3: 2}.get(event.key)
-                    if choice_idx < len(self.level_up_choices):
-                        selected_upgrade = self.level_up_choices[choice_idx]
-                        self.player.apply_upgrade(selected_upgrade)
-                        self.level_up_pending = False
-                        self.level_up_choices = []
-            elif event.type == pygame.MOUSEBUTTONDOWN and (self.game_over or self.game_won):
-                mouse_x, mouse_y = pygame.mouse.get_pos()
-                retry_button_rect = pygame.Rect(SCREEN_WIDTH // 2 - 100, 350, 200, 50)
-                if retry_button_rect.collidepoint(mouse_x, mouse_y):
-                    self.__init__()
-                    self.start_game()
+        self.handle_movement(pygame.key.get_pressed(), dt)
+        return True
+
+    def handle_event(self, event):
+        if event.type == pygame.QUIT:
+            return False
+        if event.type == pygame.KEYDOWN and not self.game_over and not self.game_won:
+            if event.key == pygame.K_ESCAPE:
+                self.paused = not self.paused
+            elif event.key == pygame.K_F5:
+                savestate.write_snapshot(self.save_state())
+            elif event.key == pygame.K_F9 and os.path.exists(savestate.SNAPSHOT_FILE):
+                self.restore_state(savestate.read_snapshot())
+            elif self.level_up_pending and event.key in [pygame.K_1, pygame.K_2, pygame.K_3]:
+                choice_idx = {pygame.K_1: 0, pygame.K_2: 1, pygame.K_3: 2}.get(event.key)
+                if choice_idx < len(self.level_up_choices):
+                    self.choose_upgrade(self.level_up_choices[choice_idx])
+        elif event.type == pygame.MOUSEBUTTONDOWN and (self.game_over or self.game_won):
+            mouse_x, mouse_y = event.pos
+            retry_button_rect = pygame.Rect(SCREEN_WIDTH // 2 - 100, 350, 200, 50)
+            if retry_button_rect.collidepoint(mouse_x, mouse_y):
+                self.reset()
+                self.start_game()
+        return True
+
+    def handle_movement(self, keys, dt):
         if not self.paused and not self.level_up_pending and not self.game_over and not self.game_won:
-            keys = pygame.key.get_pressed()
             if keys[pygame.K_a]:
-                self.player.move("left", self.tcod_map, dt)
+                self.move_player("left", dt)
             if keys[pygame.K_d]:
-                self.player.move("right", self.tcod_map, dt)
+                self.move_player("right", dt)
             if keys[pygame.K_w]:
-                self.player.move("up", self.tcod_map, dt)
+                self.move_player("up", dt)
             if keys[pygame.K_s]:
-                self.player.move("down", self.tcod_map, dt)
-        return True
+                self.move_player("down", dt)
+
+    def move_player(self, direction, dt):
+        if self.recorder:
+            self.recorder.move(direction)
+        self.player.move(direction, self.tcod_map, dt)
+
+    def choose_upgrade(self, upgrade):
+        if self.recorder:
+            self.recorder.pick(upgrade)
+        self.player.apply_upgrade(upgrade)
+        self.level_up_pending = False
+        self.level_up_choices = []
 
-    def spawn_enemies(self, count):
-        for _ in range(count):
-            angle = random.uniform(0, 2 * math.pi)
-            distance = random.uniform(5, 30)
-            x = self.player.position[0] + math.cos(angle) * distance
-            y = self.player.position[1] + math.sin(angle) * distance
-            x = max(0, min(MAP_WIDTH - 1, x))
-            y = max(0, min(MAP_HEIGHT - 1, y))
-            while abs(x - self.player.position[0]) < 1 and abs(y - self.player.position[1]) < 1:
-                angle = random.uniform(0, 2 * math.pi)
-                distance = random.uniform(5, 30)
-                x = self.player.position[0] + math.cos(angle) * distance
-                y = self.player.position[1] + math.sin(angle) * distance
-                x = max(0, min(MAP_WIDTH - 1, x))
-                y = max(0, min(MAP_HEIGHT - 1, y))
-            enemy = Enemy([x, y])
-            self.enemies.append(enemy)
+    def spawn_pending(self):
+        placements = self.spawner.take(self.tcod_map, self.player.position, self.camera.view_rect(VIEW_MARGIN))
+        enemies = [Enemy(position) for position in placements.get("enemy", [])]
+        bosses = [Boss(position) for position in placements.get("boss", [])]
+        for enemy in enemies + bosses:
+            self.animations.register(enemy)
+        self.enemies.extend(enemies)
+        self.bosses.extend(bosses)
+
+    @property
+    def cooldown_reduction(self):
+        return self.player.cooldown_reduction
 
     def trigger_level_up(self):
         self.level_up_pending = True
-        self.level_up_choices = random.sample(
-            ["hp_up", "atk_up", "cooldown_down", "magicbolt_count_up", "electricburst_count_up", "explosion_size_up"], 3)
+        self.level_up_choices = random.sample(list(UPGRADE_INFO), 3)
 
     def end_game(self):
         self.game_over = True
+        if self.recorder:
+            self.recorder.save()
         log_stats(
             session_id=self.session_id,
             distance=self.player.position[0],
@@ -244,6 +517,8 @@ class GameManager:
 
     def win_game(self):
         self.game_won = True
+        if self.recorder:
+            self.recorder.save()
         log_stats(
             session_id=self.session_id,
             distance=self.player.position[0],
@@ -259,34 +534,245 @@ class GameManager:
             player_level=self.player.level
         )
 
+    def snapshot(self):
+        return RenderSnapshot(self)
+
+    def __getstate__(self):
+        # The recorder belongs to the running session, not to its snapshots.
+        state = dict(self.__dict__)
+        state["recorder"] = None
+        return state
+
+    def save_state(self):
+        # Compact binary checkpoint of the whole session, including RNG state.
+        state = {"game_manager": self, "random": random.getstate()}
+        return savestate.dumps(state, asset_keys())
+
+    @staticmethod
+    def load_state(data, restore_random=True):
+        state = savestate.loads(data, resolve_asset)
+        if restore_random:
+            random.setstate(state["random"])
+        game_manager = state["game_manager"]
+        game_manager.camera.update(game_manager.player.position[0], game_manager.player.position[1])
+        return game_manager
+
+    def restore_state(self, data):
+        # Loads a checkpoint into this instance; the player is the only
+        # entity that keeps a reference back to its GameManager. A recording
+        # in progress is saved and continues from the checkpoint.
+        recorder = self.recorder
+        self.__dict__ = GameManager.load_state(data).__dict__
+        self.player.game_manager = self
+        self.recorder = recorder
+        if recorder:
+            recorder.begin(self)
+
+def asset_keys():
+    # Shared, reloadable objects are saved by key instead of by value.
+    keys = {id(surface): ("image", path) for path, surface in asset_bundle.surfaces.items()}
+    for name, frame_set in frame_sets.items():
+        keys.update((id(frames), ("frame_set", name, key)) for key, frames in frame_set.items())
+    keys.update((id(frames), ("frames", name)) for name, frames in frame_lists.items())
+    for name, atlas in list(rotation_atlases.items()):
+        keys[id(atlas.frames)] = ("atlas_frames", name)
+        keys.update((id(rotation), ("atlas", name, step)) for step, rotation in enumerate(atlas.rotations))
+    keys.update((id(image), ("item_image", kind)) for kind, image in item_images.items())
+    keys.update((id(icon), ("icon", upgrade)) for upgrade, icon in upgrade_icons.items())
+    return keys
+
+def resolve_asset(key):
+    kind = key[0]
+    if kind == "image":
+        return load_image(key[1])
+    if kind == "frame_set":
+        return load_frame_set(key[1], FRAME_SET_PATHS[key[1]])[key[2]]
+    if kind == "frames":
+        return frame_list(key[1])
+    if kind == "atlas_frames":
+        return get_rotation_atlas(key[1], ATLAS_LOADERS[key[1]]).frames
+    if kind == "atlas":
+        return get_rotation_atlas(key[1], ATLAS_LOADERS[key[1]]).rotations[key[2]]
+    if kind == "item_image":
+        return item_image(key[1])
+    if kind == "icon":
+        return upgrade_icon(key[1])
+    raise ValueError(f"Unknown asset key {key}")
+
+def separation_forces(positions, radius):
+    # Bins positions into a grid of radius-sized cells and compares each point
+    # only with the 3x3 cells around it, so the cost stays linear for a
+    # bounded crowd density. Each pair pushes apart with a linear falloff.
+    count = len(positions)
+    forces = np.zeros((count, 2))
+    if count < 2:
+        return forces
+    cells = np.floor(positions / radius).astype(np.int64)
+    keys = cells[:, 0] * (1 << 32) + cells[:, 1]
+    order = np.argsort(keys)
+    sorted_keys = keys[order]
+    for cell_dx in (-1, 0, 1):
+        for cell_dy in (-1, 0, 1):
+            neighbour_keys = (cells[:, 0] + cell_dx) * (1 << 32) + cells[:, 1] + cell_dy
+            starts = np.searchsorted(sorted_keys, neighbour_keys, "left")
+            counts = np.searchsorted(sorted_keys, neighbour_keys, "right") - starts
+            total = counts.sum()
+            if not total:
+                continue
+            i = np.repeat(np.arange(count), counts)
+            j = order[np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)]
+            pairs = i != j
+            i, j = i[pairs], j[pairs]
+            offsets = positions[i] - positions[j]
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+            # Stacked enemies get a fixed per-pair direction to split along.
+            stacked = distances < 1e-6
+            angles = (i[stacked] - j[stacked]) * 2.399963
+            offsets[stacked] = np.column_stack([np.cos(angles), np.sin(angles)])
+            distances[stacked] = 1e-6
+            close = distances < radius
+            i, offsets, distances = i[close], offsets[close], distances[close]
+            push = offsets / np.maximum(distances, 1e-6)[:, None] * ((radius - distances) / radius)[:, None]
+            forces[:, 0] += np.bincount(i, weights=push[:, 0], minlength=count)
+            forces[:, 1] += np.bincount(i, weights=push[:, 1], minlength=count)
+    return forces
+
+def slide_steps(world_map, positions, targets):
+    # Moves each position to its target if that tile is open, otherwise along
+    # whichever single axis is still open, otherwise not at all.
+    result = positions.copy()
+    pending = np.ones(len(positions), dtype=bool)
+    for xs, ys in ((targets[:, 0], targets[:, 1]), (targets[:, 0], positions[:, 1]), (positions[:, 0], targets[:, 1])):
+        step = pending & (xs >= 0) & (xs < MAP_WIDTH) & (ys >= 0) & (ys < MAP_HEIGHT)
+        step[step] = world_map.walkable_at(xs[step].astype(np.int64), ys[step].astype(np.int64))
+        result[step, 0] = xs[step]
+        result[step, 1] = ys[step]
+        pending &= ~step
+        if not pending.any():
+            break
+    return result
+
+class RenderSnapshot:
+    # Read-only copy of everything draw_frame touches, published by the
+    # simulation thread. Entities are shallow copies with their own position;
+    # frame lists are shared because they are only ever replaced, never mutated.
+    def __init__(self, game_manager):
+        self.tcod_map = game_manager.tcod_map
+        self.camera = copy.copy(game_manager.camera)
+        self.camera.fov_map = types.SimpleNamespace(fov=game_manager.camera.fov_map.fov.copy())
+        self.player = snapshot_entity(game_manager.player)
+        self.enemies = [snapshot_entity(enemy) for enemy in game_manager.enemies]
+        self.bosses = [snapshot_entity(boss) for boss in game_manager.bosses]
+        animations = game_manager.animations.copy()
+        for enemy in self.enemies + self.bosses:
+            enemy.animations = animations
+        self.items = [snapshot_entity(item) for item in game_manager.items]
+        self.projectiles = [snapshot_entity(projectile) for projectile in game_manager.projectiles]
+        self.enemy_projectiles = game_manager.enemy_projectiles.copy()
+        self.explosions = [snapshot_entity(explosion) for explosion in game_manager.explosions]
+        self.current_wave = game_manager.current_wave
+        self.time_elapsed = game_manager.time_elapsed
+        self.score = game_manager.score
+        self.enemies_killed = game_manager.enemies_killed
+        self.damage_dealt = game_manager.damage_dealt
+        self.cooldown_reduction = game_manager.cooldown_reduction
+        self.game_over = game_manager.game_over
+        self.game_won = game_manager.game_won
+        self.paused = game_manager.paused
+        self.level_up_pending = game_manager.level_up_pending
+        self.level_up_choices = list(game_manager.level_up_choices)
+
+def snapshot_entity(entity):
+    clone = copy.copy(entity)
+    clone.position = list(entity.position)
+    return clone
+
+class SimulationThread:
+    def __init__(self, game_manager, telemetry=None, diagnostics=None):
+        self.game_manager = game_manager
+        self.telemetry = telemetry
+        self.diagnostics = diagnostics
+        self.events = queue.Queue()
+        self.keys = None
+        self.snapshot = game_manager.snapshot()
+        self.running = False
+        self.error = None
+        self.thread = threading.Thread(target=self.run, name="simulation", daemon=True)
+
+    def start(self):
+        self.running = True
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.thread.join()
+
+    def post_event(self, event):
+        self.events.put(event)
+
+    def post_keys(self, keys):
+        self.keys = keys
+
+    def run(self):
+        try:
+            self.simulate()
+        except Exception as e:
+            self.error = e
+
+    def simulate(self):
+        tick = 1.0 / FPS
+        next_tick = last_tick = time.perf_counter()
+        while self.running:
+            while not self.events.empty():
+                self.game_manager.handle_event(self.events.get_nowait())
+            if self.keys is not None:
+                self.game_manager.handle_movement(self.keys, tick)
+            update_start = time.perf_counter()
+            self.game_manager.update(tick)
+            if self.telemetry:
+                # The simulation steps a fixed tick, but the frame time records
+                # how long the tick really took so stalls show up.
+                self.telemetry.sample(self.game_manager, update_start - last_tick, time.perf_counter() - update_start)
+            last_tick = update_start
+            if self.diagnostics:
+                self.diagnostics.sample(self.game_manager)
+            # Publishing is a single reference swap, so the renderer always
+            # sees a complete tick.
+            self.snapshot = self.game_manager.snapshot()
+            next_tick += tick
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.perf_counter()
+
+def stat_property(name):
+    return property(lambda self: self.stats[name])
+
 class Player:
     def __init__(self, class_type, position, game_manager):
         self.class_type = class_type
-        self.position = position
-        self.health = 100
-        self.max_health = 100
-        self.mana = 100
         self.speed = 10
         self.game_manager = game_manager
+        self.frames = frame_list("player")
+        self.frame_duration = 0.1
+        self.upgrade_info = UPGRADE_INFO
+        self.upgrade_icons = {upgrade: upgrade_icon(upgrade) for upgrade in self.upgrade_info}
+        self.reset(position)
+
+    def reset(self, position):
+        self.position = position
+        self.stats = StatBlock(PERKS)
+        self.health = self.max_health
+        self.mana = 100
         self.last_shot_time = 0
         self.last_explosion_time = 0
         self.last_electric_burst_time = 0
-        self.frames = [pygame.image.load(f"Player/player ({i}).gif") for i in range(1, 14)]
         self.current_frame = 0
         self.frame_timer = 0
-        self.frame_duration = 0.1
         self.level = 1
         self.exp = 0
         self.exp_to_next_level = 100
-        self.atk = 20
-        self.magic_dmg_amp = 1.0
-        self.magic_cooldown = 1.0
-        self.explosion_cooldown = 7.0 * self.magic_cooldown
-        self.electric_burst_cooldown = 4.0 * self.magic_cooldown
-        self.item_pickup_range = 10
-        self.magicbolt_count = 1
-        self.electricburst_count = 1
-        self.explosion_size_multiplier = 1.0
         self.pending_magicbolts = []
         self.pending_electricbursts = []
         self.item_collection_count = 0  # Track items collected
@@ -296,24 +782,6 @@ class Player:
             "explosion": 0
         }  # Track damage per magic
 
-        self.upgrade_info = {
-            "hp_up": ("Health", "Increase HP by 10%", "Icons/hp_up.png"),
-            "atk_up": ("Attack", "Increase attack by 10%", "Icons/atk_up.png"),
-            "cooldown_down": ("Cooldown Reduction", "Reduce magic cooldown by 10%", "Icons/Cooldown.png"),
-            "magicbolt_count_up": ("Magic Bolt Count", "Increase 1 Magic Bolt Count", "Icons/MagicBoltIcon.jpg"),
-            "electricburst_count_up": ("Electric Burst Count", "Increase 1 Electric Burst Count", "Icons/ElectricBurstIcon.png"),
-            "explosion_size_up": ("Explosion Size Increase", "Increase explosion size by 20%", "Icons/ExplosionIcon.png")
-        }
-        self.upgrade_icons = {}
-        for upgrade, (_, _, icon_path) in self.upgrade_info.items():
-            try:
-                icon = pygame.image.load(icon_path)
-                self.upgrade_icons[upgrade] = pygame.transform.scale(icon, (40, 40))
-            except pygame.error:
-                icon = pygame.Surface((40, 40))
-                icon.fill((255, 0, 0))
-                self.upgrade_icons[upgrade] = icon
-
     def gain_exp(self, amount):
         self.exp += amount
         leveled_up = False
@@ -328,22 +796,32 @@ class Player:
         self.exp_to_next_level = 100 + (self.level - 1) * 10
 
     def apply_upgrade(self, upgrade):
-        if upgrade == "hp_up":
-            self.max_health *= 1.1
-            self.health = min(self.health * 1.1, self.max_health)
-        elif upgrade == "atk_up":
-            self.atk *= 1.1
-        elif upgrade == "cooldown_down":
-            self.magic_cooldown = max(0.6, self.magic_cooldown * 0.9)
-            self.explosion_cooldown = 7.0 * self.magic_cooldown
-            self.electric_burst_cooldown = 4.0 * self.magic_cooldown
-            self.game_manager.cooldown_reduction += 5
-        elif upgrade == "magicbolt_count_up":
-            self.magicbolt_count += 1
-        elif upgrade == "electricburst_count_up":
-            self.electricburst_count += 1
-        elif upgrade == "explosion_size_up":
-            self.explosion_size_multiplier *= 1.2
+        self.apply_modifier(upgrade)
+
+    def apply_modifier(self, modifier):
+        # Current health keeps its share of max health when max health changes.
+        old_max_health = self.max_health
+        self.stats.add(modifier, self.game_manager.time_elapsed)
+        if self.max_health != old_max_health:
+            self.health = min(self.health * self.max_health / old_max_health, self.max_health)
+
+    def expire_modifiers(self, time_elapsed):
+        # A timed max health buff running out leaves health at most at the
+        # new max health.
+        self.stats.expire(time_elapsed)
+        self.health = min(self.health, self.max_health)
+
+    atk = stat_property("atk")
+    max_health = stat_property("max_health")
+    magic_dmg_amp = stat_property("magic_dmg_amp")
+    magic_cooldown = stat_property("magic_cooldown")
+    explosion_cooldown = stat_property("explosion_cooldown")
+    electric_burst_cooldown = stat_property("electric_burst_cooldown")
+    item_pickup_range = stat_property("item_pickup_range")
+    magicbolt_count = stat_property("magicbolt_count")
+    electricburst_count = stat_property("electricburst_count")
+    explosion_size_multiplier = stat_property("explosion_size_multiplier")
+    cooldown_reduction = stat_property("cooldown_reduction")
 
     def move(self, direction, tcod_map, dt):
         dx, dy = {"left": (-1, 0), "right": (1, 0), "up": (0, -1), "down": (0, 1)}.get(direction, (0, 0))
@@ -358,6 +836,7 @@ class Player:
         if self.frame_timer >= self.frame_duration:
             self.current_frame = (self.current_frame + 1) % len(self.frames)
             self.frame_timer = 0
+        self.expire_modifiers(time_elapsed)
 
         for i, (fire_time, position, direction, damage) in enumerate(self.pending_magicbolts[:]):
             if time_elapsed >= fire_time:
@@ -407,7 +886,7 @@ class Player:
                         angle_offset = math.radians(random.uniform(-15, 15))
                         rotated_x = direction_x * math.cos(angle_offset) - direction_y * math.sin(angle_offset)
                         rotated_y = direction_x * math.sin(angle_offset) + direction_y * math.cos(angle_offset)
-                        damage = self.atk * self.magic_dmg_amp
+                        damage = self.stats["magicbolt_damage"]
                         self.pending_magicbolts.append((
                             fire_time,
                             list(self.position),
@@ -419,12 +898,8 @@ class Player:
     def fire_explosion(self, time_elapsed, explosions_list):
         if time_elapsed - self.last_explosion_time >= self.explosion_cooldown:
             self.last_explosion_time = time_elapsed
-            damage = self.atk * 2.4 * self.magic_dmg_amp
-            explosion = FireExplosion(
-                list(self.position),
-                radius=12 * self.explosion_size_multiplier * (1 + 0.1 * (self.magic_dmg_amp - 1)),
-                damage=damage
-            )
+            damage = self.stats["explosion_damage"]
+            explosion = FireExplosion(list(self.position), radius=self.stats["explosion_radius"], damage=damage)
             explosions_list.append(explosion)
             self.magic_damage["explosion"] += damage  # Track damage
 
@@ -458,7 +933,7 @@ class Player:
                         angle_offset = math.radians(random.uniform(-15, 15))
                         rotated_x = direction_x * math.cos(angle_offset) - direction_y * math.sin(angle_offset)
                         rotated_y = direction_x * math.sin(angle_offset) + direction_y * math.cos(angle_offset)
-                        damage = self.atk * 2.0 * self.magic_dmg_amp
+                        damage = self.stats["electricburst_damage"]
                         self.pending_electricbursts.append((
                             fire_time,
                             list(self.position),
@@ -467,77 +942,101 @@ class Player:
                         ))
                         self.magic_damage["electricburst"] += damage  # Track damage
 
+frame_sets = {}
+frame_lists = {}
+item_images = {}
+upgrade_icons = {}
+
+def load_frame_set(name, frame_paths):
+    frame_set = frame_sets.get(name)
+    if frame_set is None:
+        frame_set = {}
+        for key, paths in frame_paths.items():
+            frames = [load_image(path) for path in paths]
+            if not frames:
+                raise ValueError(f"Failed to load {key} frames")
+            frame_set[key] = frames
+        frame_sets[name] = frame_set
+    return frame_set
+
+def frame_list(name):
+    frames = frame_lists.get(name)
+    if frames is None:
+        frames = frame_lists[name] = [load_image(path) for path in FRAME_LIST_PATHS[name]]
+    return frames
+
+def item_image(kind):
+    image = item_images.get(kind)
+    if image is None:
+        path, fallback_color = ITEM_IMAGES[kind]
+        size = (int(16 * ITEM_SCALE_FACTOR), int(16 * ITEM_SCALE_FACTOR))
+        try:
+            image = pygame.transform.scale(load_image(path), size)
+        except pygame.error:
+            image = pygame.Surface(size)
+            image.fill(fallback_color)
+        item_images[kind] = image
+    return image
+
+def upgrade_icon(upgrade):
+    icon = upgrade_icons.get(upgrade)
+    if icon is None:
+        try:
+            icon = pygame.transform.scale(load_image(UPGRADE_INFO[upgrade][2]), (40, 40))
+        except pygame.error:
+            icon = pygame.Surface((40, 40))
+            icon.fill((255, 0, 0))
+        upgrade_icons[upgrade] = icon
+    return icon
+
+def animation_field(name):
+    return property(lambda self: self.animations.data[name][self.slot].item())
+
 class AbstractEnemy:
+    # Animation state lives in the GameManager's AnimationClock, which the
+    # enemy joins through AnimationClock.register.
+    state = animation_field("state")
+    current_frame = animation_field("frame")
+    is_animating = animation_field("animating")
+
     def __init__(self, position):
         self.position = position
         self.health = 250
         self.speed = 1.8
         self.scale_factor = 4
-        self.state = 'idle'
         self.is_dead = False
-        self.is_animating = False
         self.facing_right = True
         self.last_attack_time = 0
         self.attack_interval = 2
         self.attack_range = 20.0
-        self.pending_projectile = False
-        self.frames = []
+        self.volleys_fired = 0
         self.running_frames = []
         self.attacked_frames = []
         self.attack_frames = []
         self.death_frames = []
         self.idle_frames = []
-        self.current_frame = 0
-        self.frame_timer = 0
-        self.frame_duration = 0.1
-        self.animation_timer = 0
-        self.attacked_animation_duration = 0.6
-        self.death_animation_duration = 1.7
-        self.attack_animation_duration = 0.8
         self.was_moving = False
+        self.steering = (0, 0)  # Set each tick by GameManager.steer_crowd
 
     def load_frames(self, frame_paths):
+        # Frame lists are shared by every instance of a class, so a wave of
+        # enemies only resolves its images once.
         try:
-            for key, paths in frame_paths.items():
-                frames = [pygame.image.load(path) for path in paths]
-                if not frames:
-                    raise ValueError(f"Failed to load {key} frames")
-                setattr(self, f"{key}_frames", frames)
-            self.frames = self.idle_frames
+            frame_set = load_frame_set(type(self).__name__, frame_paths)
         except (pygame.error, FileNotFoundError, ValueError):
+            frame_set = {}
             for key in frame_paths:
                 frame_count = len(frame_paths[key])
                 frames = [pygame.Surface((32, 32)) for _ in range(frame_count)]
                 for surface in frames:
                     surface.fill((255, 0, 0))
-                setattr(self, f"{key}_frames", frames)
-            self.frames = self.idle_frames
+                frame_set[key] = frames
+        for key, frames in frame_set.items():
+            setattr(self, f"{key}_frames", frames)
 
-    def move(self, player, tcod_map, dt, game_manager):
-        distance_to_player = ((self.position[0] - player.position[0])**2 + (self.position[1] - player.position[1])**2)**0.5
-        if distance_to_player <= 9:
-            dx, dy = 0, 0
-        else:
-            cost = tcod_map.walkable.astype('float32')
-            cost[~tcod_map.walkable] = float('inf')
-            astar = tcod.path.AStar(cost)
-            start = (int(self.position[0]), int(self.position[1]))
-            end = (int(player.position[0]), int(player.position[1]))
-            path = astar.get_path(start[0], start[1], end[0], end[1])
-            dx, dy = 0, 0
-            if path and len(path) > 1:
-                next_step = path[1]
-                dx = next_step[0] - self.position[0]
-                dy = next_step[1] - self.position[1]
-                if dx < 0:
-                    self.facing_right = False
-                elif dx > 0:
-                    self.facing_right = True
-        new_x = self.position[0] + dx * self.speed * dt
-        new_y = self.position[1] + dy * self.speed * dt
-        if (0 <= new_x < MAP_WIDTH and 0 <= new_y < MAP_HEIGHT and tcod_map.walkable[int(new_y), int(new_x)]):
-            self.position[0] = new_x
-            self.position[1] = new_y
+    @property
+    def frames(self):
+        return getattr(self, f"{STATE_FRAMES[self.state]}_frames")
 
     def take_damage(self, amount):
         if self.is_dead:
@@ -546,183 +1045,42 @@ class AbstractEnemy:
         game_manager = globals().get('game_manager')
         if game_manager:
             game_manager.record_damage(amount)
-        if self.state != 'dead':
+        if self.state != DEAD:
             self.start_attacked_animation()
         if self.health <= 0 and not self.is_dead:
             self.is_dead = True
             self.start_death_animation()
 
     def start_attacked_animation(self):
-        if self.state != 'dead' and self.attacked_frames:
-            self.state = 'attacked'
-            self.frames = self.attacked_frames
-            self.current_frame = 0
-            self.frame_timer = 0
-            self.animation_timer = 0
-            self.is_animating = True
+        if self.state != DEAD and self.attacked_frames:
+            self.animations.start(self.slot, ATTACKED)
 
     def start_attack_animation(self):
-        if self.state != 'dead':
-            self.state = 'attacking'
-            self.frames = self.attack_frames
-            self.current_frame = 0
-            self.frame_timer = 0
-            self.animation_timer = 0
-            self.is_animating = True
-            self.pending_projectile = True
+        if self.state != DEAD:
+            self.animations.start(self.slot, ATTACKING)
 
     def start_death_animation(self):
-        self.state = 'dead'
-        self.frames = self.death_frames
-        self.current_frame = 0
-        self.frame_timer = 0
-        self.animation_timer = 0
-        self.is_animating = True
+        self.animations.start(self.slot, DEAD)
 
-    def attack(self, player, enemy_projectiles, time_elapsed):
-        if self.is_dead or self.state == 'attacked':
-            return
-        distance = ((self.position[0] - player.position[0])**2 + (self.position[1] - player.position[1])**2)**0.5
-        if distance <= self.attack_range and time_elapsed - self.last_attack_time >= self.attack_interval:
-            self.start_attack_animation()
-            self.last_attack_time = time_elapsed
-
-    def fire_projectile(self, player, enemy_projectiles):
-        direction_x = player.position[0] - self.position[0]
-        direction_y = player.position[1] - self.position[1]
-        magnitude = (direction_x**2 + direction_y**2)**0.5
-        if magnitude != 0:
-            direction_x /= magnitude
-            direction_y /= magnitude
-            projectile = EnemyProjectile(list(self.position), (direction_x, direction_y), damage=5)
-            enemy_projectiles.append(projectile)
-
-    def update(self, dt, player, tcod_map, enemy_projectiles, time_elapsed, game_manager):
-        if self.is_dead and not self.is_animating:
-            return
-        self.frame_timer += dt
-        if self.frame_timer >= self.frame_duration and self.frames:
-            self.current_frame = (self.current_frame + 1) % len(self.frames)
-            self.frame_timer = 0
-        if self.is_animating:
-            self.animation_timer += dt
-            if self.state == 'attacked' and self.animation_timer >= self.attacked_animation_duration:
-                self.state = 'idle'
-                self.frames = self.idle_frames
-                self.current_frame = 0
-                self.is_animating = False
-            elif self.state == 'attacking' and self.animation_timer >= self.attack_animation_duration:
-                if self.pending_projectile:
-                    self.fire_projectile(player, enemy_projectiles)
-                    self.pending_projectile = False
-                self.state = 'idle'
-                self.frames = self.idle_frames
-                self.current_frame = 0
-                self.is_animating = False
-            elif self.state == 'dead' and self.animation_timer >= self.death_animation_duration:
-                self.is_animating = False
-        if self.state not in ['dead', 'attacked', 'attacking']:
-            old_position = self.position.copy()
-            self.move(player, tcod_map, dt, game_manager)
-            is_moving = (abs(old_position[0] - self.position[0]) > 0.01 or abs(old_position[1] - self.position[1]) > 0.01)
-            if is_moving:
-                self.state = 'running'
-                self.frames = self.running_frames
-            else:
-                self.state = 'idle'
-                self.frames = self.idle_frames
-                self.current_frame = 0
-            self.attack(player, enemy_projectiles, time_elapsed)
+    def fire_projectile(self, player, enemy_projectiles, time_elapsed):
+        patterns = BULLETS["shooters"][type(self).__name__]
+        enemy_projectiles.fire(patterns[self.volleys_fired % len(patterns)], self, player, time_elapsed)
+        self.volleys_fired += 1
 
-    def draw(self, screen, camera):
+    def draw(self, canvas, camera, screen):
         if self.is_dead and not self.is_animating:
             return
-        screen_x, screen_y = camera.to_screen(self.position[0], self.position[1])
+        screen_x, screen_y = screen
         if self.frames and self.current_frame < len(self.frames):
-            frame = self.frames[self.current_frame]
             scaled_size = int(TILE_SIZE * self.scale_factor * camera.zoom)
-            frame = pygame.transform.scale(frame, (scaled_size, scaled_size))
-            if not self.facing_right:
-                frame = pygame.transform.flip(frame, True, False)
-            screen.blit(frame, (screen_x - scaled_size // 2, screen_y - scaled_size // 2))
+            rect = (screen_x - scaled_size // 2, screen_y - scaled_size // 2, scaled_size, scaled_size)
+            canvas.sprite(self.frames[self.current_frame], rect, flip_x=not self.facing_right)
 
 class Enemy(AbstractEnemy):
     def __init__(self, position):
         super().__init__(position)
         self.scale_factor = 12
-        frame_paths = {
-            'running': [f"Enemies/Enemy ({i}).gif" for i in range(1, 6)],
-            'attacked': [f"Enemies/Attacked/Attacked ({i}).gif" for i in range(1, 5)],
-            'attack': [f"Enemies/Attack/Attack ({i}).gif" for i in range(1, 12)],
-            'death': [f"Enemies/Death/death ({i}).gif" for i in range(1, 23)],
-            'idle': [f"Enemies/Idle/Idle ({i}).gif" for i in range(1, 9)]
-        }
-        self.load_frames(frame_paths)
-
-class EnemyProjectile:
-    def __init__(self, position, direction, damage):
-        self.position = position
-        self.direction = direction
-        self.damage = damage
-        self.speed = 40
-        self.state = 'moving'
-        self.active = True
-        self.scale_factor = 3.0
-        try:
-            self.moving_frames = [pygame.image.load(f"EnemiesProjectile/FlyingSlash/Slash ({i}).gif") for i in range(1, 6)]
-            self.vanishing_frames = [pygame.image.load(f"EnemiesProjectile/SlashVanish/vanish ({i}).gif") for i in range(1, 4)]
-            if not all([self.moving_frames, self.vanishing_frames]):
-                raise ValueError("Some enemy projectile frames failed to load")
-        except (pygame.error, FileNotFoundError, ValueError):
-            self.moving_frames = [pygame.Surface((16, 16)) for _ in range(5)]
-            self.vanishing_frames = [pygame.Surface((16, 16)) for _ in range(3)]
-            for surface in self.moving_frames + self.vanishing_frames:
-                surface.fill((255, 0, 255))
-        self.frames = self.moving_frames
-        self.current_frame = 0
-        self.frame_timer = 0
-        self.frame_duration = 0.1
-        self.vanish_timer = 0
-        self.vanish_duration = 0.3
-        self.angle = math.degrees(math.atan2(self.direction[1], self.direction[0]))
-        self.rotated_frames = [pygame.transform.rotate(frame, -self.angle) for frame in self.moving_frames]
-        self.vanishing_rotated_frames = [pygame.transform.rotate(frame, -self.angle) for frame in self.vanishing_frames]
-
-    def update(self, dt, player, game_manager=None):
-        if not self.active:
-            return
-        if self.state == 'moving':
-            self.position[0] += self.direction[0] * self.speed * dt
-            self.position[1] += self.direction[1] * self.speed * dt
-            if abs(self.position[0] - player.position[0]) < 1 and abs(self.position[1] - player.position[1]) < 1:
-                player.health -= self.damage
-                self.state = 'vanishing'
-                self.frames = self.vanishing_frames
-                self.rotated_frames = self.vanishing_rotated_frames
-                self.current_frame = 0
-                self.frame_timer = 0
-            if (self.position[0] < 0 or self.position[0] >= MAP_WIDTH or
-                self.position[1] < 0 or self.position[1] >= MAP_HEIGHT):
-                self.active = False
-        elif self.state == 'vanishing':
-            self.vanish_timer += dt
-            if self.vanish_timer >= self.vanish_duration:
-                self.active = False
-        self.frame_timer += dt
-        if self.frame_timer >= self.frame_duration:
-            self.current_frame = (self.current_frame + 1) % len(self.frames)
-            self.frame_timer = 0
-
-    def draw(self, screen, camera):
-        if not self.active:
-            return
-        screen_x, screen_y = camera.to_screen(self.position[0], self.position[1])
-        frame = self.rotated_frames[self.current_frame]
-        original_size = frame.get_size()
-        scaled_size = (int(original_size[0] * self.scale_factor * camera.zoom), int(original_size[1] * self.scale_factor * camera.zoom))
-        frame = pygame.transform.scale(frame, scaled_size)
-        rect = frame.get_rect(center=(int(screen_x), int(screen_y)))
-        screen.blit(frame, rect)
+        self.load_frames(ENEMY_FRAME_PATHS)
 
 class Boss(AbstractEnemy):
     def __init__(self, position):
@@ -732,103 +1090,15 @@ class Boss(AbstractEnemy):
         self.scale_factor = 12
         self.attack_interval = 2 * 0.5
         self.attack_range = 20.0
-        frame_paths = {
-            'running': [f"Boss/Run/Run ({i}).gif" for i in range(1, 8)],
-            'attack': [f"Boss/Attack/Attack ({i}).gif" for i in range(1, 7)],
-            'death': [f"Boss/Death/Death ({i}).gif" for i in range(1, 8)],
-            'idle': [f"Boss/Idle/Idle ({i}).gif" for i in range(1, 4)]
-        }
-        self.load_frames(frame_paths)
+        self.load_frames(BOSS_FRAME_PATHS)
         self.attacked_frames = self.idle_frames  # Boss has no attacked frames
 
-    def move(self, player, tcod_map, dt, game_manager):
-        distance_to_player = ((self.position[0] - player.position[0])**2 + (self.position[1] - player.position[1])**2)**0.5
-        if distance_to_player <= 9:
-            dx, dy = 0, 0
-        else:
-            dx = player.position[0] - self.position[0]
-            dy = player.position[1] - self.position[1]
-            magnitude = (dx**2 + dy**2)**0.5
-            if magnitude != 0:
-                dx /= magnitude
-                dy /= magnitude
-                if dx < 0:
-                    self.facing_right = False
-                elif dx > 0:
-                    self.facing_right = True
-        new_x = self.position[0] + dx * self.speed * dt
-        new_y = self.position[1] + dy * self.speed * dt
-        if (0 <= new_x < MAP_WIDTH and 0 <= new_y < MAP_HEIGHT and tcod_map.walkable[int(new_y), int(new_x)]):
-            self.position[0] = new_x
-            self.position[1] = new_y
-
-    def fire_projectile(self, player, enemy_projectiles):
-        direction_x = player.position[0] - self.position[0]
-        direction_y = player.position[1] - self.position[1]
-        magnitude = (direction_x**2 + direction_y**2)**0.5
-        if magnitude != 0:
-            direction_x /= magnitude
-            direction_y /= magnitude
-            for angle_offset in [-5, 5]:
-                offset_rad = math.radians(angle_offset)
-                rotated_x = direction_x * math.cos(offset_rad) - direction_y * math.sin(offset_rad)
-                rotated_y = direction_x * math.sin(offset_rad) + direction_y * math.cos(offset_rad)
-                projectile = BossProjectile(list(self.position), (rotated_x, rotated_y), damage=5 * 2)
-                enemy_projectiles.append(projectile)
-
-class BossProjectile:
-    def __init__(self, position, direction, damage):
-        self.position = position
-        self.direction = direction
-        self.damage = damage
-        self.speed = 40
-        self.active = True
-        self.scale_factor = 3.0
-        try:
-            self.frames = [pygame.image.load(f"BossProjectile/BossBolt/Bolt ({i}).gif") for i in range(1, 30)]
-        except (pygame.error, FileNotFoundError):
-            self.frames = [pygame.Surface((16, 16)) for _ in range(30)]
-            for frame in self.frames:
-                frame.fill((255, 0, 255))
-        self.current_frame = 0
-        self.frame_timer = 0
-        self.frame_duration = 0.1
-        self.angle = math.degrees(math.atan2(self.direction[1], self.direction[0]))
-        self.rotated_frames = [pygame.transform.rotate(frame, -self.angle) for frame in self.frames]
-
-    def update(self, dt, player, game_manager=None):
-        if not self.active:
-            return
-        self.position[0] += self.direction[0] * self.speed * dt
-        self.position[1] += self.direction[1] * self.speed * dt
-        self.frame_timer += dt
-        if self.frame_timer >= self.frame_duration:
-            self.current_frame = (self.current_frame + 1) % len(self.frames)
-            self.frame_timer = 0
-        if abs(self.position[0] - player.position[0]) < 1 and abs(self.position[1] - player.position[1]) < 1:
-            player.health -= self.damage
-            self.active = False
-        if (self.position[0] < 0 or self.position[0] >= MAP_WIDTH or
-            self.position[1] < 0 or self.position[1] >= MAP_HEIGHT):
-            self.active = False
-
-    def draw(self, screen, camera):
-        if not self.active:
-            return
-        screen_x, screen_y = camera.to_screen(self.position[0], self.position[1])
-        frame = self.rotated_frames[self.current_frame]
-        original_size = frame.get_size()
-        scaled_size = (int(original_size[0] * self.scale_factor * camera.zoom), int(original_size[1] * self.scale_factor * camera.zoom))
-        frame = pygame.transform.scale(frame, scaled_size)
-        rect = frame.get_rect(center=(int(screen_x), int(screen_y)))
-        screen.blit(frame, rect)
-
 class FireExplosion:
     def __init__(self, position, radius=12, damage=48):
         self.position = position
         self.radius = radius
         self.damage = damage
-        self.frames = [pygame.image.load(f"Explosion/Explosion ({i}).gif") for i in range(1, 13)]
+        self.frames = frame_list("explosion")
         self.current_frame = 0
         self.frame_timer = 0.05
         self.active = True
@@ -862,13 +1132,13 @@ class FireExplosion:
                         if boss.health <= 0:
                             game_manager.defeat_boss(boss)
 
-    def draw(self, screen, camera):
+    def draw(self, canvas, camera, screen):
         if not self.active:
             return
-        screen_x, screen_y = camera.to_screen(self.position[0], self.position[1])
+        screen_x, screen_y = screen
         scaled_size = int(self.radius * TILE_SIZE * 2 * camera.zoom)
-        frame = pygame.transform.scale(self.frames[self.current_frame], (scaled_size, scaled_size))
-        screen.blit(frame, (screen_x - scaled_size // 2, screen_y - scaled_size // 2))
+        rect = (screen_x - scaled_size // 2, screen_y - scaled_size // 2, scaled_size, scaled_size)
+        canvas.sprite(self.frames[self.current_frame], rect)
 
 class Projectile:
     def __init__(self, position, direction, damage):
@@ -876,9 +1146,10 @@ class Projectile:
         self.direction = direction
         self.damage = damage
         self.speed = 60
-        self.frames = [pygame.image.load(f"Magicbolt/magicbolt ({i}).gif") for i in range(1, 30)]
+        atlas = get_rotation_atlas("magicbolt", load_magicbolt_frames)
+        self.frames = atlas.frames
         self.angle = math.degrees(math.atan2(self.direction[1], self.direction[0]))
-        self.rotated_frames = [pygame.transform.rotate(frame, -self.angle) for frame in self.frames]
+        self.rotated_frames = atlas.get(self.angle)
         self.current_frame = 0
         self.frame_timer = 0.02
         self.active = True
@@ -905,20 +1176,18 @@ class Projectile:
         if self.frame_timer >= 1:
             self.current_frame = (self.current_frame + 1) % len(self.frames)
             self.frame_timer = 0
+        if (self.position[0] < 0 or self.position[0] >= MAP_WIDTH or
+            self.position[1] < 0 or self.position[1] >= MAP_HEIGHT):
+            self.active = False
 
-    def draw(self, screen, camera):
-        screen_x, screen_y = camera.to_screen(self.position[0], self.position[1])
-        frame = self.rotated_frames[self.current_frame]
-        scaled_size = (int(frame.get_width() * camera.zoom), int(frame.get_height() * camera.zoom))
-        frame = pygame.transform.scale(frame, scaled_size)
-        rect = frame.get_rect(center=(int(screen_x), int(screen_y)))
-        screen.blit(frame, rect)
+    def draw(self, canvas, camera, screen):
+        canvas.rotated_sprite(self.frames, self.rotated_frames, self.current_frame, self.angle, screen, camera.zoom)
 
 class ElectricBurst(Projectile):
     def __init__(self, position, direction, damage):
         super().__init__(position, direction, damage)
         self.speed = 7.5
-        self.frames = [pygame.image.load(f"ElectricBurst/electricburst ({i}).png") for i in range(1, 16)]
+        self.frames = frame_list("electricburst")
         self.current_frame = 0
         self.frame_timer = 0
         self.frame_duration = 0.143
@@ -967,16 +1236,13 @@ class ElectricBurst(Projectile):
             self.position[1] < 0 or self.position[1] >= MAP_HEIGHT):
             self.active = False
 
-    def draw(self, screen, camera):
+    def draw(self, canvas, camera, screen):
         if not self.active:
             return
-        screen_x, screen_y = camera.to_screen(self.position[0], self.position[1])
+        screen_x, screen_y = screen
         frame = self.frames[self.current_frame]
-        original_size = frame.get_size()
-        scaled_size = (int(original_size[0] * 3 * camera.zoom), int(original_size[1] * 3 * camera.zoom))
-        frame = pygame.transform.scale(frame, scaled_size)
-        rect = frame.get_rect(center=(int(screen_x), int(screen_y)))
-        screen.blit(frame, rect)
+        width, height = int(frame.get_width() * 3 * camera.zoom), int(frame.get_height() * 3 * camera.zoom)
+        canvas.sprite(frame, (screen_x - width // 2, screen_y - height // 2, width, height))
 
 class Item:
     def __init__(self, position, value=50):
@@ -987,36 +1253,19 @@ class Item:
         self.image = None
         self.item_type = "generic"
 
-    def update(self, dt, player, tcod_map):
-        direction_x = player.position[0] - self.position[0]
-        direction_y = player.position[1] - self.position[1]
-        distance = (direction_x**2 + direction_y**2)**0.5
-        if distance > 0:
-            direction_x /= distance
-            direction_y /= distance
-            self.position[0] += direction_x * self.speed * dt
-            self.position[1] += direction_y * self.speed * dt
-
-    def draw(self, screen, camera):
-        screen_x, screen_y = camera.to_screen(self.position[0], self.position[1])
+    def draw(self, canvas, camera, screen):
+        screen_x, screen_y = screen
         if self.image:
             scaled_size = int(self.radius * 2 * camera.zoom * ITEM_SCALE_FACTOR)
-            scaled_image = pygame.transform.scale(self.image, (scaled_size, scaled_size))
-            screen.blit(scaled_image, (screen_x - scaled_size // 2, screen_y - scaled_size // 2))
+            canvas.sprite(self.image, (screen_x - scaled_size // 2, screen_y - scaled_size // 2, scaled_size, scaled_size))
         else:
-            pygame.draw.circle(screen, (255, 255, 0), (screen_x, screen_y), int(self.radius * camera.zoom))
+            canvas.circle((255, 255, 0), (screen_x, screen_y), int(self.radius * camera.zoom))
 
 class Heal(Item):
     def __init__(self, position):
         super().__init__(position, value=100)
         self.item_type = "heal"
-        try:
-            self.image = pygame.image.load("Items/heal.png")
-            self.image = pygame.transform.scale(self.image, 
-                (int(16 * ITEM_SCALE_FACTOR), int(16 * ITEM_SCALE_FACTOR)))
-        except pygame.error:
-            self.image = pygame.Surface((int(16 * ITEM_SCALE_FACTOR), int(16 * ITEM_SCALE_FACTOR)))
-            self.image.fill((0, 255, 0))
+        self.image = item_image("heal")
 
     def apply_effect(self, player):
         heal_amount = player.max_health * 0.15
@@ -1027,16 +1276,10 @@ class Book(Item):
     def __init__(self, position):
         super().__init__(position, value=100)
         self.item_type = "book"
-        try:
-            self.image = pygame.image.load("Items/book.png")
-            self.image = pygame.transform.scale(self.image, 
-                (int(16 * ITEM_SCALE_FACTOR), int(16 * ITEM_SCALE_FACTOR)))
-        except pygame.error:
-            self.image = pygame.Surface((int(16 * ITEM_SCALE_FACTOR), int(16 * ITEM_SCALE_FACTOR)))
-            self.image.fill((255, 0, 0))
+        self.image = item_image("book")
 
     def apply_effect(self, player):
-        player.atk *= 1.05  # Permanent 5% attack increase
+        player.apply_modifier("book")
         player.item_collection_count += 1
 
 class ExpOrb:
@@ -1048,231 +1291,425 @@ class ExpOrb:
         self.color = (0, 0, 255)
         self.speed = 16
 
-    def update(self, dt, player, tcod_map):
-        direction_x = player.position[0] - self.position[0]
-        direction_y = player.position[1] - self.position[1]
-        distance = (direction_x**2 + direction_y**2)**0.5
-        if distance > 0:
-            direction_x /= distance
-            direction_y /= distance
-            self.position[0] += direction_x * self.speed * dt
-            self.position[1] += direction_y * self.speed * dt
-
-    def draw(self, screen, camera):
-        screen_x, screen_y = camera.to_screen(self.position[0], self.position[1])
-        pygame.draw.circle(screen, self.color, (screen_x, screen_y), int(self.radius * camera.zoom))
+    def draw(self, canvas, camera, screen):
+        screen_x, screen_y = screen
+        canvas.circle(self.color, (screen_x, screen_y), int(self.radius * camera.zoom))
+
+class RotationAtlas:
+    def __init__(self, frames, steps=ROTATION_STEPS):
+        self.frames = frames
+        self.steps = max(32, min(128, steps))
+        self.rotations = [
+            [pygame.transform.rotate(frame, -step * 360 / self.steps) for frame in frames]
+            for step in range(self.steps)
+        ]
+
+    def get(self, angle):
+        step = round(angle * self.steps / 360) % self.steps
+        return self.rotations[step]
+
+rotation_atlases = {}
+rotation_atlas_lock = threading.Lock()
+
+def get_rotation_atlas(name, loader):
+    # The asset loader thread may be building the same atlas.
+    with rotation_atlas_lock:
+        if name not in rotation_atlases:
+            rotation_atlases[name] = RotationAtlas(loader())
+        return rotation_atlases[name]
+
+def load_magicbolt_frames():
+    return [load_image(path) for path in MAGICBOLT_FRAME_PATHS]
+
+def load_slash_frames():
+    try:
+        frames = [load_image(path) for path in SLASH_FRAME_PATHS]
+    except (pygame.error, FileNotFoundError):
+        frames = [pygame.Surface((16, 16)) for _ in range(5)]
+        for surface in frames:
+            surface.fill((255, 0, 255))
+    return frames
+
+def load_slash_vanish_frames():
+    try:
+        frames = [load_image(path) for path in SLASH_VANISH_FRAME_PATHS]
+    except (pygame.error, FileNotFoundError):
+        frames = [pygame.Surface((16, 16)) for _ in range(3)]
+        for surface in frames:
+            surface.fill((255, 0, 255))
+    return frames
+
+def load_boss_bolt_frames():
+    try:
+        frames = [load_image(path) for path in BOSS_BOLT_FRAME_PATHS]
+    except (pygame.error, FileNotFoundError):
+        frames = [pygame.Surface((16, 16)) for _ in range(30)]
+        for surface in frames:
+            surface.fill((255, 0, 255))
+    return frames
+
+ATLAS_LOADERS = {
+    "magicbolt": load_magicbolt_frames,
+    "slash": load_slash_frames,
+    "slash_vanish": load_slash_vanish_frames,
+    "boss_bolt": load_boss_bolt_frames
+}
+
+def build_rotation_atlases():
+    # Every atlas is built before a session starts, so the first cast never
+    # stalls a tick. Atlases the asset loader already built are reused.
+    for name, loader in ATLAS_LOADERS.items():
+        get_rotation_atlas(name, loader)
+
+bullet_sprites = {}
+BULLET_SPRITE_CACHE = 8192  # Scaled bullet sprites kept before the cache is dropped
+
+def bullet_sprite(atlas_name, step, frame, scale, zoom):
+    key = (atlas_name, step, frame, scale, zoom)
+    sprite = bullet_sprites.get(key)
+    if sprite is None:
+        if len(bullet_sprites) >= BULLET_SPRITE_CACHE:
+            bullet_sprites.clear()
+        atlas = get_rotation_atlas(atlas_name, ATLAS_LOADERS[atlas_name])
+        image = atlas.rotations[step][frame]
+        width, height = image.get_size()
+        scaled = pygame.transform.scale(image, (int(width * scale * zoom), int(height * scale * zoom)))
+        # Rotated frames are mostly transparent padding; blitting only the
+        # opaque part keeps large bullet counts cheap to fill.
+        bounds = scaled.get_bounding_rect()
+        sprite = (scaled.subsurface(bounds).copy(), bounds.x - scaled.get_width() // 2,
+                  bounds.y - scaled.get_height() // 2)
+        bullet_sprites[key] = sprite
+    return sprite
+
+def build_draw_list(view):
+    # Every entity's screen position in one transform, culled to the screen
+    # rect plus its layer's margin and then to the FOV. The list is ordered
+    # by depth and, within a depth, by screen y so nearer sprites overlap
+    # the ones behind them.
+    groups = [(getattr(view, name), depth, margin) for name, depth, margin in DRAW_LAYERS]
+    entities = list(itertools.chain.from_iterable(group for group, _, _ in groups))
+    if not entities:
+        return []
+    counts = [len(group) for group, _, _ in groups]
+    depths = np.repeat([depth for _, depth, _ in groups], counts)
+    margins = np.repeat([np.inf if margin is None else margin for _, _, margin in groups], counts)
+    positions = np.fromiter(itertools.chain.from_iterable(map(operator.attrgetter("position"), entities)),
+                            float, count=2 * len(entities))
+    xs, ys = positions[0::2], positions[1::2]
+    screen_x, screen_y = view.camera.screen_positions(xs, ys)
+    shown = np.flatnonzero(view.camera.on_screen(screen_x, screen_y, margins))
+    shown = shown[view.camera.fov_mask(xs[shown], ys[shown])]
+    shown = shown[np.lexsort((screen_y[shown], depths[shown]))]
+    return [(entities[index], (x, y))
+            for index, x, y in zip(shown.tolist(), screen_x[shown].tolist(), screen_y[shown].tolist())]
+
+def draw_bullets(canvas, camera, bullets):
+    # Culls the whole field against the screen and FOV at once. Texture
+    # canvases rotate each bullet while drawing; on surfaces each kind and
+    # state is blitted in one batch from sprites scaled once per rotation,
+    # frame and zoom.
+    data = bullets.data[:bullets.count]
+    screen_x, screen_y = camera.screen_positions(data["x"], data["y"])
+    shown = np.flatnonzero(camera.on_screen(screen_x, screen_y, BULLET_CULL_MARGIN))
+    shown = shown[camera.fov_mask(data["x"][shown], data["y"][shown])]
+    if not len(shown):
+        return
+    data, screen_x, screen_y = data[shown], screen_x[shown], screen_y[shown]
+    for kind_index, kind_name in enumerate(bullets.kind_names):
+        kind = bullets.config["kinds"][kind_name]
+        for state, atlas_name in ((0, kind["atlas"]), (1, kind.get("vanish_atlas"))):
+            group = np.flatnonzero((data["kind"] == kind_index) & (data["state"] == state))
+            if not len(group) or atlas_name is None:
+                continue
+            atlas = get_rotation_atlas(atlas_name, ATLAS_LOADERS[atlas_name])
+            frames = data["frame"][group] % len(atlas.frames)
+            if canvas.rotates:
+                scale = kind["scale"] * camera.zoom
+                for frame, angle, x, y in zip(frames.tolist(), data["angle"][group].tolist(),
+                                              screen_x[group].tolist(), screen_y[group].tolist()):
+                    image = atlas.frames[frame]
+                    width, height = int(image.get_width() * scale), int(image.get_height() * scale)
+                    canvas.sprite(image, (x - width // 2, y - height // 2, width, height), angle=angle)
+                continue
+            steps = np.round(data["angle"][group] * atlas.steps / 360).astype(int) % atlas.steps
+            blits = []
+            for step, frame, x, y in zip(steps.tolist(), frames.tolist(), screen_x[group].tolist(), screen_y[group].tolist()):
+                sprite, offset_x, offset_y = bullet_sprite(atlas_name, step, frame, kind["scale"], camera.zoom)
+                blits.append((sprite, (x + offset_x, y + offset_y)))
+            canvas.screen.blits(blits, doreturn=False)
+
+def asset_load_tasks():
+    # Everything the first wave touches comes first. Returns the tasks and how
+    # many of them must finish before the game can start.
+    def images(paths):
+        return [functools.partial(load_image, path) for path in paths]
+    critical = (
+        images([BACKGROUND_PATH, *PLAYER_FRAME_PATHS, *(icon for _, _, icon in UPGRADE_INFO.values())])
+        + images([path for paths in ENEMY_FRAME_PATHS.values() for path in paths])
+        + [
+            functools.partial(get_rotation_atlas, "magicbolt", load_magicbolt_frames),
+            functools.partial(get_rotation_atlas, "slash", load_slash_frames),
+            functools.partial(get_rotation_atlas, "slash_vanish", load_slash_vanish_frames)
+        ]
+    )
+    deferred = (
+        images([*ELECTRICBURST_FRAME_PATHS, *EXPLOSION_FRAME_PATHS, HEAL_PATH, BOOK_PATH])
+        + images([path for paths in BOSS_FRAME_PATHS.values() for path in paths])
+        + [functools.partial(get_rotation_atlas, "boss_bolt", load_boss_bolt_frames)]
+    )
+    return critical + deferred, len(critical)
+
+def draw_loading_screen(canvas, font, progress):
+    canvas.fill((0, 0, 0))
+    title_text = font.render("Loading...", True, (255, 255, 255))
+    canvas.blit(title_text, (SCREEN_WIDTH // 2 - title_text.get_width() // 2, SCREEN_HEIGHT // 2 - 60))
+    bar_rect = pygame.Rect(SCREEN_WIDTH // 2 - 200, SCREEN_HEIGHT // 2, 400, 20)
+    canvas.rect((50, 50, 50), bar_rect)
+    canvas.rect((0, 0, 255), (bar_rect.x, bar_rect.y, bar_rect.width * progress, bar_rect.height))
+    canvas.present()
 
 def map_to_screen(x, y):
     return int(x * TILE_SIZE), int(y * TILE_SIZE)
 
-def draw_map(screen, tcod_map, camera):
-    for x in range(MAP_WIDTH):
-        for y in range(MAP_HEIGHT):
-            if camera.fov_map.fov[y, x]:
-                tile_surface = pygame.Surface((int(TILE_SIZE * camera.zoom), int(TILE_SIZE * camera.zoom)), pygame.SRCALPHA)
-                color = (100, 100, 100, 128) if tcod_map.walkable[y, x] else (0, 0, 0, 128)
-                tile_surface.fill(color)
-                screen_x, screen_y = camera.to_screen(x, y)
-                screen.blit(tile_surface, (screen_x, screen_y))
-
-def main():
-    pygame.init()
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    pygame.display.set_caption("Arcane Conquest")
+FLOOR_COLOR = (100, 100, 100, 128)
+WALL_COLOR = (0, 0, 0, 128)
+
+def draw_map(canvas, tcod_map, camera):
+    # Only lit cells of the active window that fall on screen are drawn, as
+    # one tile layer.
+    origin_x, origin_y = camera.fov_origin
+    height, width = camera.fov_map.fov.shape
+    left, top, right, bottom = camera.view_rect()
+    x0, y0 = max(0, int(left) - origin_x), max(0, int(top) - origin_y)
+    x1, y1 = min(width, int(right) + 1 - origin_x), min(height, int(bottom) + 1 - origin_y)
+    if x0 >= x1 or y0 >= y1:
+        return
+    colors = np.zeros((y1 - y0, x1 - x0, 4), dtype=np.uint8)
+    colors[:] = WALL_COLOR
+    colors[camera.window_walkable[y0:y1, x0:x1]] = FLOOR_COLOR
+    colors[~camera.fov_map.fov[y0:y1, x0:x1]] = 0
+    canvas.tile_layer(colors, camera.to_screen(origin_x + x0, origin_y + y0), int(TILE_SIZE * camera.zoom))
+
+def draw_frame(canvas, view, background_image, font, stats_font, small_font):
+    canvas.fill((0, 0, 0))
+    canvas.sprite(background_image, (0, 0, int(background_image.get_width() * ZOOM_FACTOR),
+                                     int(background_image.get_height() * ZOOM_FACTOR)))
+    draw_map(canvas, view.tcod_map, view.camera)
+    exp_bar_width = SCREEN_WIDTH
+    exp_bar_height = 10
+    exp_percentage = view.player.exp / view.player.exp_to_next_level
+    filled_width = exp_bar_width * min(exp_percentage, 1.0)
+    canvas.rect((50, 50, 50), (0, 0, exp_bar_width, exp_bar_height))
+    canvas.rect((0, 0, 255), (0, 0, filled_width, exp_bar_height))
+    level_text = font.render(f"Level: {view.player.level}", True, (255, 255, 255))
+    canvas.blit(level_text, (10, exp_bar_height + 5))
+    score_text = font.render(f"Score: {view.score}", True, (255, 255, 255))
+    wave_text = font.render(f"Wave: {view.current_wave}", True, (255, 255, 255))
+    canvas.blit(score_text, (10, exp_bar_height + 45))
+    canvas.blit(wave_text, (10, exp_bar_height + 85))
+    player_x, player_y = view.camera.to_screen(*view.player.position)
+    scaled_size = int(TILE_SIZE * 4 * view.camera.zoom)
+    canvas.sprite(view.player.frames[view.player.current_frame],
+                  (player_x - scaled_size // 2, player_y - scaled_size // 2, scaled_size, scaled_size))
+    health_bar_width = int(TILE_SIZE * 4 * view.camera.zoom)
+    health_bar_height = int(5 * view.camera.zoom)
+    health_percentage = view.player.health / view.player.max_health
+    filled_width = health_bar_width * health_percentage
+    health_bar_x = player_x - (health_bar_width // 2)
+    health_bar_y = player_y + (scaled_size // 2) + 2
+    canvas.rect((255, 0, 0), (health_bar_x, health_bar_y, health_bar_width, health_bar_height))
+    canvas.rect((0, 255, 0), (health_bar_x, health_bar_y, filled_width, health_bar_height))
+        
+    draw_list = build_draw_list(view)
+    for entity, screen in draw_list:
+        entity.draw(canvas, view.camera, screen)
+
+    draw_bullets(canvas, view.camera, view.enemy_projectiles)
+
+    for boss, _ in draw_list:
+        if isinstance(boss, Boss):
+            boss_health_bar_width = 400
+            boss_health_bar_height = 20
+            boss_health_percentage = boss.health / (300 * 2.5)
+            boss_filled_width = boss_health_bar_width * max(0, boss_health_percentage)
+            boss_health_bar_x = (SCREEN_WIDTH - boss_health_bar_width) // 2
+            boss_health_bar_y = exp_bar_height + 45
+            canvas.rect((255, 0, 0), (boss_health_bar_x, boss_health_bar_y, boss_health_bar_width, boss_health_bar_height))
+            canvas.rect((0, 255, 0), (boss_health_bar_x, boss_health_bar_y, boss_filled_width, boss_health_bar_height))
+            boss_health_text = small_font.render(f"Boss HP: {int(boss.health)}/{int(300 * 2.5)}", True, (255, 255, 255))
+            canvas.blit(boss_health_text, (boss_health_bar_x, boss_health_bar_y - 25))
+                
+    if view.paused:
+        canvas.shade((0, 0, 0, 200))
+        pause_text = font.render("Paused - Character Stats", True, (255, 255, 255))
+        canvas.blit(pause_text, (SCREEN_WIDTH // 2 - pause_text.get_width() // 2, 50))
+        stats_y = 150
+        stats_spacing = 60
+        center_x = SCREEN_WIDTH // 2
+        core_stats = [
+            (u"\u2665", f"HP: {view.player.health:.1f}/{view.player.max_health:.1f}"),
+            (u"\u2694", f"ATK: {view.player.atk:.1f}"),
+            (u"\u2728", f"Magic Damage: {view.player.magic_dmg_amp:.1f}x"),
+            (u"\u23F2", f"Cooldown Reduction: {view.cooldown_reduction}%")
+        ]
+        for i, (icon, stat) in enumerate(core_stats):
+            icon_text = small_font.render(icon, True, (255, 255, 255))
+            stat_text = stats_font.render(stat, True, (255, 255, 255))
+            icon_x = center_x - stat_text.get_width() // 2 - 40
+            canvas.blit(icon_text, (icon_x, stats_y + i * stats_spacing))
+            canvas.blit(stat_text, (center_x - stat_text.get_width() // 2, stats_y + i * stats_spacing))
+        game_stats_y = stats_y + len(core_stats) * stats_spacing + 80
+        game_stats = [
+            f"Current Level: {view.player.level}",
+            f"Time Survived: {int(view.time_elapsed)}s",
+            f"Enemies Killed: {view.enemies_killed}"
+        ]
+        for i, stat in enumerate(game_stats):
+            stat_text = stats_font.render(stat, True, (255, 255, 255))
+            canvas.blit(stat_text, (SCREEN_WIDTH // 2 - stat_text.get_width() // 2, game_stats_y + i * 40))
+                
+    if view.level_up_pending:
+        canvas.shade((0, 0, 0, 200))
+        title_text = font.render("Level Up! Choose an Upgrade (1, 2, 3)", True, (255, 255, 255))
+        canvas.blit(title_text, (SCREEN_WIDTH // 2 - title_text.get_width() // 2, 50))
+        box_width = 400
+        box_height = 100
+        box_spacing = 10
+        start_x = (SCREEN_WIDTH - box_width) // 2
+        box_y = 150
+        for i, choice in enumerate(view.level_up_choices):
+            upgrade_name, description, _ = view.player.upgrade_info[choice]
+            icon = view.player.upgrade_icons[choice]
+            level_text = str(i + 1)
+            current_y = box_y + i * (box_height + box_spacing)
+            canvas.rect((100, 100, 100), (start_x, current_y, box_width, box_height))
+            canvas.rect((255, 255, 255), (start_x, current_y, box_width, box_height), 2)
+            canvas.blit(icon, (start_x + 10, current_y + 10))
+            name_text = stats_font.render(upgrade_name, True, (255, 255, 255))
+            canvas.blit(name_text, (start_x + 60, current_y + 10))
+            keybind_text = small_font.render(level_text, True, (255, 255, 0))
+            canvas.blit(keybind_text, (start_x + box_width - keybind_text.get_width() - 10, current_y + 10))
+            desc_text = small_font.render(description, True, (255, 255, 255))
+            canvas.blit(desc_text, (start_x + 60, current_y + 40))
+
+    if view.game_over:
+        canvas.shade((0, 0, 0, 200))
+        game_over_font = pygame.font.SysFont(None, 40)
+        game_over_text = game_over_font.render("You died", True, (255, 0, 0))
+        canvas.blit(game_over_text, (SCREEN_WIDTH // 2 - game_over_text.get_width() // 2, 50))
+        stats_y = 120
+        stats_spacing = 50
+        center_x = SCREEN_WIDTH // 2
+        overall_stats = [
+            f"Survival Time: {int(view.time_elapsed)}s",
+            f"Enemies Defeated: {view.enemies_killed}",
+            f"Waves Completed: {view.current_wave}",
+            f"Score: {view.score}",
+            f"Damage Dealt: {int(view.damage_dealt)}"
+        ]
+        for i, stat in enumerate(overall_stats):
+            stat_text = game_over_font.render(stat, True, (255, 255, 255))
+            canvas.blit(stat_text, (center_x - stat_text.get_width() // 2, stats_y + i * stats_spacing))
+        retry_button_rect = pygame.Rect(SCREEN_WIDTH // 2 - 100, 350, 200, 50)
+        canvas.rect((0, 255, 0), retry_button_rect)
+        retry_text = game_over_font.render("Retry", True, (0, 0, 0))
+        canvas.blit(retry_text, (SCREEN_WIDTH // 2 - retry_text.get_width() // 2, 360))
+
+    if view.game_won:
+        canvas.shade((0, 0, 0, 200))
+        game_over_font = pygame.font.SysFont(None, 40)
+        win_text = game_over_font.render("You Win", True, (255, 255, 0))
+        canvas.blit(win_text, (SCREEN_WIDTH // 2 - win_text.get_width() // 2, 50))
+        stats_y = 120
+        stats_spacing = 50
+        center_x = SCREEN_WIDTH // 2
+        overall_stats = [
+            f"Survival Time: {int(view.time_elapsed)}s",
+            f"Enemies Defeated: {view.enemies_killed}",
+            f"Waves Completed: {view.current_wave}",
+            f"Score: {view.score}",
+            f"Damage Dealt: {int(view.damage_dealt)}"
+        ]
+        for i, stat in enumerate(overall_stats):
+            stat_text = game_over_font.render(stat, True, (255, 255, 255))
+            canvas.blit(stat_text, (center_x - stat_text.get_width() // 2, stats_y + i * stats_spacing))
+        retry_button_rect = pygame.Rect(SCREEN_WIDTH // 2 - 100, 350, 200, 50)
+        canvas.rect((0, 255, 0), retry_button_rect)
+        play_again_text = game_over_font.render("Play Again", True, (0, 0, 0))
+        canvas.blit(play_again_text, (SCREEN_WIDTH // 2 - play_again_text.get_width() // 2, 360))
+    canvas.present()
+
+def load_background():
     try:
-        background_image = pygame.image.load("Background/background1.png")
-        background_image = pygame.transform.scale(background_image, 
+        background_image = load_image(BACKGROUND_PATH)
+        return pygame.transform.scale(background_image,
             (int(SCREEN_WIDTH / ZOOM_FACTOR), int(SCREEN_HEIGHT / ZOOM_FACTOR)))
     except pygame.error as e:
         print(f"Error loading background image: {e}")
-        background_image = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-    init_csv()
+        return pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+def main():
+    pygame.init()
+    canvas = create_canvas(RENDER_BACKEND, (SCREEN_WIDTH, SCREEN_HEIGHT), "Arcane Conquest")
+    clock = pygame.time.Clock()
+    open_bundle()
+    tasks, critical_count = asset_load_tasks()
+    asset_loader = AssetLoader(tasks)
+    asset_loader.start()
+    loading_font = pygame.font.SysFont(None, 48)
+    while not asset_loader.done(critical_count):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                return
+        draw_loading_screen(canvas, loading_font, asset_loader.completed / critical_count)
+        clock.tick(FPS)
+    background_image = load_background()
+    init_log()
     game_manager = GameManager()
+    game_manager.recorder = SessionRecorder() if RECORDING_ENABLED else None
     game_manager.start_game()
-    clock = pygame.time.Clock()
+    telemetry = TelemetryRecorder() if TELEMETRY_ENABLED else None
+    diagnostics = MemoryMonitor() if DIAGNOSTICS_ENABLED else None
+    font = pygame.font.SysFont(None, 48)
+    stats_font = pygame.font.SysFont(None, 36)
+    small_font = pygame.font.SysFont(None, 24)
+    simulation = SimulationThread(game_manager, telemetry, diagnostics) if THREADED_SIMULATION else None
+    if simulation:
+        simulation.start()
     running = True
     while running:
         dt = clock.tick(FPS) / 1000.0
-        font = pygame.font.SysFont(None, 48)
-        stats_font = pygame.font.SysFont(None, 36)
-        small_font = pygame.font.SysFont(None, 24)
-        running = game_manager.handle_events(dt)
-        game_manager.update(dt)
-        screen.fill((0, 0, 0))
-        scaled_bg = pygame.transform.scale(background_image, 
-            (int(background_image.get_width() * ZOOM_FACTOR), int(background_image.get_height() * ZOOM_FACTOR)))
-        screen.blit(scaled_bg, (0, 0))
-        draw_map(screen, game_manager.tcod_map, game_manager.camera)
-        exp_bar_width = SCREEN_WIDTH
-        exp_bar_height = 10
-        exp_percentage = game_manager.player.exp / game_manager.player.exp_to_next_level
-        filled_width = exp_bar_width * min(exp_percentage, 1.0)
-        pygame.draw.rect(screen, (50, 50, 50), (0, 0, exp_bar_width, exp_bar_height))
-        pygame.draw.rect(screen, (0, 0, 255), (0, 0, filled_width, exp_bar_height))
-        level_text = font.render(f"Level: {game_manager.player.level}", True, (255, 255, 255))
-        screen.blit(level_text, (10, exp_bar_height + 5))
-        score_text = font.render(f"Score: {game_manager.score}", True, (255, 255, 255))
-        wave_text = font.render(f"Wave: {game_manager.current_wave}", True, (255, 255, 255))
-        screen.blit(score_text, (10, exp_bar_height + 45))
-        screen.blit(wave_text, (10, exp_bar_height + 85))
-        player_x, player_y = game_manager.camera.to_screen(*game_manager.player.position)
-        frame = game_manager.player.frames[game_manager.player.current_frame]
-        scaled_size = int(TILE_SIZE * 4 * game_manager.camera.zoom)
-        frame = pygame.transform.scale(frame, (scaled_size, scaled_size))
-        screen.blit(frame, (player_x - scaled_size // 2, player_y - scaled_size // 2))
-        health_bar_width = int(TILE_SIZE * 4 * game_manager.camera.zoom)
-        health_bar_height = int(5 * game_manager.camera.zoom)
-        health_percentage = game_manager.player.health / game_manager.player.max_health
-        filled_width = health_bar_width * health_percentage
-        health_bar_x = player_x - (health_bar_width // 2)
-        health_bar_y = player_y + (scaled_size // 2) + 2
-        pygame.draw.rect(screen, (255, 0, 0), (health_bar_x, health_bar_y, health_bar_width, health_bar_height))
-        pygame.draw.rect(screen, (0, 255, 0), (health_bar_x, health_bar_y, filled_width, health_bar_height))
-        
-        for enemy in game_manager.enemies:
-            if game_manager.camera.fov_map.fov[int(enemy.position[1]), int(enemy.position[0])]:
-                enemy.draw(screen, game_manager.camera)
-
-        for item in game_manager.items:
-            if game_manager.camera.fov_map.fov[int(item.position[1]), int(item.position[0])]:
-                item.draw(screen, game_manager.camera)
-                
-        for boss in game_manager.bosses:
-            if game_manager.camera.fov_map.fov[int(boss.position[1]), int(boss.position[0])]:
-                boss.draw(screen, game_manager.camera)
-                boss_health_bar_width = 400
-                boss_health_bar_height = 20
-                boss_health_percentage = boss.health / (300 * 2.5)
-                boss_filled_width = boss_health_bar_width * max(0, boss_health_percentage)
-                boss_health_bar_x = (SCREEN_WIDTH - boss_health_bar_width) // 2
-                boss_health_bar_y = exp_bar_height + 45
-                pygame.draw.rect(screen, (255, 0, 0), (boss_health_bar_x, boss_health_bar_y, boss_health_bar_width, boss_health_bar_height))
-                pygame.draw.rect(screen, (0, 255, 0), (boss_health_bar_x, boss_health_bar_y, boss_filled_width, boss_health_bar_height))
-                boss_health_text = small_font.render(f"Boss HP: {int(boss.health)}/{int(300 * 2.5)}", True, (255, 255, 255))
-                screen.blit(boss_health_text, (boss_health_bar_x, boss_health_bar_y - 25))
-                
-        for projectile in game_manager.projectiles[:]:
-            x, y = int(projectile.position[0]), int(projectile.position[1])
-            if 0 <= x < MAP_WIDTH and 0 <= y < MAP_HEIGHT and game_manager.camera.fov_map.fov[y, x]:
-                projectile.draw(screen, game_manager.camera)
-
-        for enemy_projectile in game_manager.enemy_projectiles[:]:
-            x, y = int(enemy_projectile.position[0]), int(enemy_projectile.position[1])
-            if 0 <= x < MAP_WIDTH and 0 <= y < MAP_HEIGHT and game_manager.camera.fov_map.fov[y, x]:
-                enemy_projectile.draw(screen, game_manager.camera)
-                
-        for explosion in game_manager.explosions[:]:
-            x, y = int(explosion.position[0]), int(explosion.position[1])
-            if 0 <= x < MAP_WIDTH and 0 <= y < MAP_HEIGHT and game_manager.camera.fov_map.fov[y, x]:
-                explosion.draw(screen, game_manager.camera)
-                
-        if game_manager.paused:
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 200))
-            screen.blit(overlay, (0, 0))
-            pause_text = font.render("Paused - Character Stats", True, (255, 255, 255))
-            screen.blit(pause_text, (SCREEN_WIDTH // 2 - pause_text.get_width() // 2, 50))
-            stats_y = 150
-            stats_spacing = 60
-            center_x = SCREEN_WIDTH // 2
-            core_stats = [
-                (u"\u2665", f"HP: {game_manager.player.health:.1f}/{game_manager.player.max_health:.1f}"),
-                (u"\u2694", f"ATK: {game_manager.player.atk:.1f}"),
-                (u"\u2728", f"Magic Damage: {game_manager.player.magic_dmg_amp:.1f}x"),
-                (u"\u23F2", f"Cooldown Reduction: {game_manager.cooldown_reduction}%")
-            ]
-            for i, (icon, stat) in enumerate(core_stats):
-                icon_text = small_font.render(icon, True, (255, 255, 255))
-                stat_text = stats_font.render(stat, True, (255, 255, 255))
-                icon_x = center_x - stat_text.get_width() // 2 - 40
-                screen.blit(icon_text, (icon_x, stats_y + i * stats_spacing))
-                screen.blit(stat_text, (center_x - stat_text.get_width() // 2, stats_y + i * stats_spacing))
-            game_stats_y = stats_y + len(core_stats) * stats_spacing + 80
-            game_stats = [
-                f"Current Level: {game_manager.player.level}",
-                f"Time Survived: {int(game_manager.time_elapsed)}s",
-                f"Enemies Killed: {game_manager.enemies_killed}"
-            ]
-            for i, stat in enumerate(game_stats):
-                stat_text = stats_font.render(stat, True, (255, 255, 255))
-                screen.blit(stat_text, (SCREEN_WIDTH // 2 - stat_text.get_width() // 2, game_stats_y + i * 40))
-                
-        if game_manager.level_up_pending:
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 200))
-            screen.blit(overlay, (0, 0))
-            title_text = font.render("Level Up! Choose an Upgrade (1, 2, 3)", True, (255, 255, 255))
-            screen.blit(title_text, (SCREEN_WIDTH // 2 - title_text.get_width() // 2, 50))
-            box_width = 400
-            box_height = 100
-            box_spacing = 10
-            start_x = (SCREEN_WIDTH - box_width) // 2
-            box_y = 150
-            for i, choice in enumerate(game_manager.level_up_choices):
-                upgrade_name, description, _ = game_manager.player.upgrade_info[choice]
-                icon = game_manager.player.upgrade_icons[choice]
-                level_text = str(i + 1)
-                current_y = box_y + i * (box_height + box_spacing)
-                pygame.draw.rect(screen, (100, 100, 100), (start_x, current_y, box_width, box_height))
-                pygame.draw.rect(screen, (255, 255, 255), (start_x, current_y, box_width, box_height), 2)
-                screen.blit(icon, (start_x + 10, current_y + 10))
-                name_text = stats_font.render(upgrade_name, True, (255, 255, 255))
-                screen.blit(name_text, (start_x + 60, current_y + 10))
-                keybind_text = small_font.render(level_text, True, (255, 255, 0))
-                screen.blit(keybind_text, (start_x + box_width - keybind_text.get_width() - 10, current_y + 10))
-                desc_text = small_font.render(description, True, (255, 255, 255))
-                screen.blit(desc_text, (start_x + 60, current_y + 40))
-
-        if game_manager.game_over:
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 200))
-            screen.blit(overlay, (0, 0))
-            game_over_font = pygame.font.SysFont(None, 40)
-            game_over_text = game_over_font.render("You died", True, (255, 0, 0))
-            screen.blit(game_over_text, (SCREEN_WIDTH // 2 - game_over_text.get_width() // 2, 50))
-            stats_y = 120
-            stats_spacing = 50
-            center_x = SCREEN_WIDTH // 2
-            overall_stats = [
-                f"Survival Time: {int(game_manager.time_elapsed)}s",
-                f"Enemies Defeated: {game_manager.enemies_killed}",
-                f"Waves Completed: {game_manager.current_wave}",
-                f"Score: {game_manager.score}",
-                f"Damage Dealt: {int(game_manager.damage_dealt)}"
-            ]
-            for i, stat in enumerate(overall_stats):
-                stat_text = game_over_font.render(stat, True, (255, 255, 255))
-                screen.blit(stat_text, (center_x - stat_text.get_width() // 2, stats_y + i * stats_spacing))
-            retry_button_rect = pygame.Rect(SCREEN_WIDTH // 2 - 100, 350, 200, 50)
-            pygame.draw.rect(screen, (0, 255, 0), retry_button_rect)
-            retry_text = game_over_font.render("Retry", True, (0, 0, 0))
-            screen.blit(retry_text, (SCREEN_WIDTH // 2 - retry_text.get_width() // 2, 360))
-
-        if game_manager.game_won:
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 200))
-            screen.blit(overlay, (0, 0))
-            game_over_font = pygame.font.SysFont(None, 40)
-            win_text = game_over_font.render("You Win", True, (255, 255, 0))
-            screen.blit(win_text, (SCREEN_WIDTH // 2 - win_text.get_width() // 2, 50))
-            stats_y = 120
-            stats_spacing = 50
-            center_x = SCREEN_WIDTH // 2
-            overall_stats = [
-                f"Survival Time: {int(game_manager.time_elapsed)}s",
-                f"Enemies Defeated: {game_manager.enemies_killed}",
-                f"Waves Completed: {game_manager.current_wave}",
-                f"Score: {game_manager.score}",
-                f"Damage Dealt: {int(game_manager.damage_dealt)}"
-            ]
-            for i, stat in enumerate(overall_stats):
-                stat_text = game_over_font.render(stat, True, (255, 255, 255))
-                screen.blit(stat_text, (center_x - stat_text.get_width() // 2, stats_y + i * stats_spacing))
-            retry_button_rect = pygame.Rect(SCREEN_WIDTH // 2 - 100, 350, 200, 50)
-            pygame.draw.rect(screen, (0, 255, 0), retry_button_rect)
-            play_again_text = game_over_font.render("Play Again", True, (0, 0, 0))
-            screen.blit(play_again_text, (SCREEN_WIDTH // 2 - play_again_text.get_width() // 2, 360))
-        pygame.display.flip()
+        if simulation:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                else:
+                    simulation.post_event(event)
+            simulation.post_keys(pygame.key.get_pressed())
+            if simulation.error:
+                raise simulation.error
+            view = simulation.snapshot
+        else:
+            running = game_manager.handle_events(dt)
+            update_start = time.perf_counter()
+            game_manager.update(dt)
+            if telemetry:
+                telemetry.sample(game_manager, dt, time.perf_counter() - update_start)
+            if diagnostics:
+                diagnostics.sample(game_manager)
+            view = game_manager
+        draw_frame(canvas, view, background_image, font, stats_font, small_font)
+    if simulation:
+        simulation.stop()
+    if telemetry:
+        telemetry.close()
+    if diagnostics:
+        diagnostics.close()
+    if game_manager.recorder:
+        game_manager.recorder.save()
+    shutdown_stat_log()
     pygame.quit()
 
 if __name__ == "__main__":
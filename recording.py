@@ -0,0 +1,66 @@
+import os
+import savestate
+
+RECORDING_DIR = "recordings"
+RECORDING_SUFFIX = ".rec"
+
+class SessionRecorder:
+    # Records a session as its starting snapshot plus, for every tick the
+    # simulation advanced, the tick's dt, the moves applied and the perk
+    # picked before it. Paused ticks and ticks waiting on a level-up choice
+    # change nothing and are not recorded. Replaying the ticks from the
+    # snapshot reproduces the session exactly.
+    def __init__(self, directory=RECORDING_DIR):
+        self.directory = directory
+        self.session_id = None
+        self.start = None
+        self.ticks = []
+        self.moves = []
+        self.perk = None
+
+    def begin(self, game_manager):
+        # Saves any session in progress and records from the current state.
+        self.save()
+        self.session_id = game_manager.session_id
+        self.start = game_manager.save_state()
+        self.ticks = []
+        self.moves = []
+        self.perk = None
+
+    def move(self, direction):
+        self.moves.append(direction)
+
+    def pick(self, upgrade):
+        self.perk = upgrade
+
+    def tick(self, dt):
+        self.ticks.append((dt, tuple(self.moves), self.perk))
+        self.moves = []
+        self.perk = None
+
+    def save(self):
+        # Writes the session to directory/<session id>.rec once; returns the
+        # path, or None when nothing was recorded.
+        if self.start is None or not self.ticks:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, self.session_id + RECORDING_SUFFIX)
+        savestate.write_snapshot(savestate.dumps({"start": self.start, "ticks": self.ticks}, {}), path)
+        self.start = None
+        return path
+
+def load_recording(path):
+    return savestate.loads(savestate.read_snapshot(path), None)
+
+def replay(recording):
+    # Yields the session after each recorded tick.
+    from main import GameManager
+    game_manager = GameManager.load_state(recording["start"])
+    game_manager.player.game_manager = game_manager
+    for dt, moves, perk in recording["ticks"]:
+        if perk is not None:
+            game_manager.choose_upgrade(perk)
+        for direction in moves:
+            game_manager.move_player(direction, dt)
+        game_manager.update(dt)
+        yield game_manager
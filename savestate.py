@@ -0,0 +1,64 @@
+import io
+import os
+import pickle
+import struct
+import zlib
+import pygame
+
+SNAPSHOT_FILE = "checkpoint.snap"
+MAGIC = b"ACSS"
+VERSION = 3
+COMPRESSION_LEVEL = 1  # Fast zlib; entity state compresses well even at level 1
+
+def surface_from_bytes(pixels, size):
+    return pygame.image.frombytes(pixels, size, "RGBA").copy()
+
+class SnapshotPickler(pickle.Pickler):
+    # Shared assets are written as keys from asset_keys (object id -> key)
+    # and resolved again on load. Any other surface is stored as raw pixels.
+    def __init__(self, file, asset_keys):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.asset_keys = asset_keys
+
+    def persistent_id(self, obj):
+        return self.asset_keys.get(id(obj))
+
+    def reducer_override(self, obj):
+        if isinstance(obj, pygame.Surface):
+            return surface_from_bytes, (pygame.image.tobytes(obj, "RGBA"), obj.get_size())
+        return NotImplemented
+
+class SnapshotUnpickler(pickle.Unpickler):
+    def __init__(self, file, resolve):
+        super().__init__(file)
+        self.resolve = resolve
+        self.resolved = {}
+
+    def persistent_load(self, key):
+        if key not in self.resolved:
+            self.resolved[key] = self.resolve(key)
+        return self.resolved[key]
+
+def dumps(state, asset_keys):
+    buffer = io.BytesIO()
+    SnapshotPickler(buffer, asset_keys).dump(state)
+    return MAGIC + struct.pack("<I", VERSION) + zlib.compress(buffer.getvalue(), COMPRESSION_LEVEL)
+
+def loads(data, resolve):
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not a game snapshot")
+    (version,) = struct.unpack_from("<I", data, len(MAGIC))
+    if version != VERSION:
+        raise ValueError(f"Snapshot version {version} is not supported")
+    payload = zlib.decompress(data[len(MAGIC) + 4:])
+    return SnapshotUnpickler(io.BytesIO(payload), resolve).load()
+
+def write_snapshot(data, path=SNAPSHOT_FILE):
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+def read_snapshot(path=SNAPSHOT_FILE):
+    with open(path, "rb") as f:
+        return f.read()
@@ -0,0 +1,140 @@
+import csv
+import os
+import sqlite3
+import time
+
+STORE_FILE = "gamedata.db"
+SCHEMA_VERSION = 2
+BUSY_TIMEOUT_MS = 10000
+COLUMN_TYPES = {
+    "SessionID": "TEXT NOT NULL UNIQUE",
+    "DistanceTraveled": "REAL",
+    "SurvivalTime": "REAL",
+    "EnemiesDefeated": "INTEGER",
+    "Score": "INTEGER",
+    "MagicBoltDamage": "REAL",
+    "ElectricBurstDamage": "REAL",
+    "ExplosionDamage": "REAL",
+    "ItemCollectionCount": "INTEGER",
+    "WaveNumber": "INTEGER",
+    "BossesDefeated": "INTEGER",
+    "PlayerLevel": "INTEGER"
+}
+DAMAGE_COLUMNS = {
+    "Magic Bolt": "MagicBoltDamage",
+    "Electric Burst": "ElectricBurstDamage",
+    "Explosion": "ExplosionDamage"
+}
+SYNCHRONOUS = {"batch": "FULL", "close": "NORMAL", "never": "OFF"}
+
+def open_store(fieldnames, path=STORE_FILE, fsync_policy="close"):
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={SYNCHRONOUS.get(fsync_policy, 'NORMAL')}")
+    migrate(conn, fieldnames)
+    return conn
+
+def table_columns(conn):
+    return [row[1] for row in conn.execute("PRAGMA table_info(sessions)")]
+
+def migrate(conn, fieldnames):
+    # Version 1 creates the table and version 2 the record of imported CSV
+    # logs; later FIELDNAMES additions become new nullable columns so older
+    # rows stay readable. A current schema is only read, never written.
+    with conn:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            columns = ", ".join(f'"{name}" {COLUMN_TYPES.get(name, "NUMERIC")}' for name in fieldnames)
+            conn.execute(f"CREATE TABLE IF NOT EXISTS sessions (id INTEGER PRIMARY KEY, RecordedAt REAL NOT NULL, {columns})")
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_recorded_at ON sessions (RecordedAt)")
+            conn.execute("CREATE INDEX IF NOT EXISTS sessions_wave ON sessions (WaveNumber)")
+        if version < 2:
+            conn.execute("CREATE TABLE IF NOT EXISTS csv_imports (path TEXT PRIMARY KEY, size INTEGER, mtime REAL)")
+        existing = set(table_columns(conn))
+        for name in fieldnames:
+            if name not in existing:
+                column_type = COLUMN_TYPES.get(name, "NUMERIC").replace(" NOT NULL UNIQUE", "")
+                conn.execute(f'ALTER TABLE sessions ADD COLUMN "{name}" {column_type}')
+        if version < SCHEMA_VERSION:
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+def insert_sessions(conn, rows, recorded_at=None):
+    if not rows:
+        return 0
+    fieldnames = list(rows[0])
+    recorded_at = time.time() if recorded_at is None else recorded_at
+    columns = ", ".join(f'"{name}"' for name in fieldnames)
+    placeholders = ", ".join("?" for _ in fieldnames)
+    with conn:
+        cursor = conn.executemany(
+            f"INSERT OR IGNORE INTO sessions (RecordedAt, {columns}) VALUES (?, {placeholders})",
+            [(recorded_at, *(row[name] for name in fieldnames)) for row in rows]
+        )
+    return cursor.rowcount
+
+def import_csv(conn, csv_path, batch_size=10000):
+    recorded_at = os.path.getmtime(csv_path)
+    imported = 0
+    with open(csv_path, newline="") as f:
+        batch = []
+        for row in csv.DictReader(f):
+            batch.append(row)
+            if len(batch) == batch_size:
+                imported += insert_sessions(conn, batch, recorded_at)
+                batch = []
+        imported += insert_sessions(conn, batch, recorded_at)
+    return imported
+
+def sync_csv(conn, csv_path):
+    # Imports the CSV log again whenever its size or modification time
+    # differs from the last import. Stored sessions are skipped by SessionID,
+    # so rows appended by the CSV backend or by a failed store write are
+    # picked up without duplicating the rest.
+    path = os.path.abspath(csv_path)
+    stat = os.stat(path)
+    last = conn.execute("SELECT size, mtime FROM csv_imports WHERE path = ?", (path,)).fetchone()
+    if last == (stat.st_size, stat.st_mtime):
+        return 0
+    imported = import_csv(conn, path)
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO csv_imports (path, size, mtime) VALUES (?, ?, ?)",
+                     (path, stat.st_size, stat.st_mtime))
+    return imported
+
+def session_count(conn):
+    return conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+def recent_sessions_query(columns, last=None):
+    selected = ", ".join(f'"{name}"' for name in columns)
+    if last is None:
+        return f"SELECT id, {selected} FROM sessions ORDER BY id", ()
+    return f"SELECT * FROM (SELECT id, {selected} FROM sessions ORDER BY id DESC LIMIT ?) ORDER BY id", (last,)
+
+def load_sessions(conn, columns=None, last=None):
+    import pandas as pd
+    columns = columns or [name for name in table_columns(conn) if name not in ("id", "RecordedAt")]
+    query, params = recent_sessions_query(columns, last)
+    return pd.read_sql_query(query, conn, params=params, index_col="id")
+
+def magic_damage_stats(conn, last=None):
+    # Two passes over the same sessions in one query: the means first, then
+    # the squared deviations from them, which stay exact where
+    # AVG(x * x) - AVG(x) * AVG(x) cancels to noise.
+    source = "sessions" if last is None else "(SELECT * FROM sessions ORDER BY id DESC LIMIT ?)"
+    params = () if last is None else (last,)
+    columns = list(DAMAGE_COLUMNS.values())
+    means = ", ".join(f'AVG("{column}") AS "{column}"' for column in columns)
+    aggregates = ", ".join(f'AVG(source."{column}"), SUM((source."{column}" - means."{column}") * '
+                           f'(source."{column}" - means."{column}"))' for column in columns)
+    row = conn.execute(
+        f"WITH source AS (SELECT * FROM {source}), means AS (SELECT {means} FROM source) "
+        f"SELECT COUNT(*), {aggregates} FROM source CROSS JOIN means",
+        params
+    ).fetchone()
+    count = row[0]
+    stats = []
+    for i, perk in enumerate(DAMAGE_COLUMNS):
+        mean, squares = row[1 + i * 2], row[2 + i * 2]
+        std = (squares / (count - 1)) ** 0.5 if count > 1 else float("nan")
+        stats.append({"perk": perk, "mean": mean, "std": std})
+    return stats
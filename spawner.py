@@ -0,0 +1,112 @@
+import json
+import math
+from collections import deque
+import numpy as np
+
+WAVES_FILE = "waves.json"
+SPAWN_BUDGET = 4  # Entities placed per tick while a wave is arriving
+VIEW_MARGIN = 2  # Tiles around the screen still treated as visible
+DEFAULT_WAVES = {
+    "base_enemies": 10,  # Enemies in wave 0
+    "enemies_per_wave": 1,  # Extra enemies each following wave
+    "enemy_ring": [5, 30],  # Spawn distance from the player in tiles
+    "boss_time": 70,  # Seconds before a boss appears whenever none is alive
+    "boss_ring": [5, 40],
+    "waves": []  # Optional scripted waves by number, e.g. {"enemies": 20, "bosses": 1}
+}
+
+def load_waves(path=WAVES_FILE):
+    waves = dict(DEFAULT_WAVES)
+    try:
+        with open(path) as f:
+            waves.update(json.load(f))
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"Error loading waves: {e}")
+    return waves
+
+class SpawnRing:
+    # Tile offsets between the two radii, computed once and shifted onto the
+    # player's tile for every batch.
+    def __init__(self, inner, outer):
+        radius = math.ceil(outer)
+        dy, dx = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+        distance = np.hypot(dx, dy)
+        ring = (distance >= inner) & (distance <= outer)
+        self.dx, self.dy = dx[ring], dy[ring]
+
+    def sample(self, world_map, center, count, rng, view=None):
+        xs = int(center[0]) + self.dx
+        ys = int(center[1]) + self.dy
+        valid = world_map.walkable_at(xs, ys)
+        if view is not None:
+            # Prefer tiles the player cannot see so enemies do not pop in.
+            left, top, right, bottom = view
+            hidden = valid & ((xs < left) | (xs > right) | (ys < top) | (ys > bottom))
+            if hidden.any():
+                valid = hidden
+        candidates = np.flatnonzero(valid)
+        if not len(candidates):
+            return np.empty((0, 2))
+        picks = rng.choice(candidates, size=count, replace=len(candidates) < count)
+        return np.column_stack([xs[picks] + rng.random(count), ys[picks] + rng.random(count)])
+
+class WaveSpawner:
+    def __init__(self, waves, seed=None):
+        self.waves = waves
+        self.rng = np.random.default_rng(seed)
+        self.rings = self.build_rings()
+        self.pending = deque()
+
+    def reset(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.pending.clear()
+
+    def build_rings(self):
+        return {
+            "enemy": SpawnRing(*self.waves["enemy_ring"]),
+            "boss": SpawnRing(*self.waves["boss_ring"])
+        }
+
+    def __getstate__(self):
+        # Rings are rebuilt from the wave data.
+        state = dict(self.__dict__)
+        del state["rings"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.rings = self.build_rings()
+
+    def wave_counts(self, wave):
+        if wave < len(self.waves["waves"]):
+            scripted = self.waves["waves"][wave]
+            return scripted.get("enemies", 0), scripted.get("bosses", 0)
+        return self.waves["base_enemies"] + self.waves["enemies_per_wave"] * wave, 0
+
+    def queue_wave(self, wave):
+        enemies, bosses = self.wave_counts(wave)
+        self.queue("enemy", enemies)
+        self.queue("boss", bosses)
+
+    def queue(self, kind, count):
+        self.pending.extend([kind] * count)
+
+    def pending_count(self, kind):
+        return sum(1 for pending in self.pending if pending == kind)
+
+    def boss_due(self, time_elapsed, bosses_alive):
+        return time_elapsed >= self.waves["boss_time"] and not bosses_alive and not self.pending_count("boss")
+
+    def take(self, world_map, center, view=None, budget=SPAWN_BUDGET):
+        # Places up to `budget` pending entities, one position batch per kind.
+        # Spawns with no open tile around the player stay queued.
+        batch = [self.pending.popleft() for _ in range(min(budget, len(self.pending)))]
+        placements = {}
+        for kind in dict.fromkeys(batch):
+            count = batch.count(kind)
+            positions = self.rings[kind].sample(world_map, center, count, self.rng, view)
+            placements[kind] = positions.tolist()
+            self.pending.extend([kind] * (count - len(positions)))
+        return placements
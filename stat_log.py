@@ -1,23 +1,210 @@
+import atexit
 import csv
+import io
 import os
+import queue
+import sqlite3
+import threading
+import time
+import session_store
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
 
 CSV_FILE = "gamedata.csv"
+LOG_BACKEND = "sqlite"  # "sqlite" writes to session_store, "csv" appends to CSV_FILE
 FIELDNAMES = [
     "SessionID", "DistanceTraveled", "SurvivalTime", "EnemiesDefeated", "Score",
     "MagicBoltDamage", "ElectricBurstDamage", "ExplosionDamage",
     "ItemCollectionCount", "WaveNumber", "BossesDefeated", "PlayerLevel"
 ]
+QUEUE_SIZE = 1024  # Rows waiting for the writer before log_stats blocks
+BATCH_SIZE = 256  # Rows written per locked append
+FSYNC_POLICY = "close"  # "batch", "close" or "never"
+WRITE_ATTEMPTS = 3  # Tries per batch before sqlite rows fall back to the CSV log
+RETRY_DELAY = 1.0  # Seconds between attempts
+
+_STOP = object()
+
+def lock_file(f):
+    if os.name == "nt":
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+def unlock_file(f):
+    if os.name == "nt":
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def encode_rows(rows, header=False):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=FIELDNAMES)
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+def append_rows(f, rows):
+    # Header check and append happen under one lock so concurrent processes
+    # never interleave rows or write the header twice.
+    lock_file(f)
+    try:
+        header = os.fstat(f.fileno()).st_size == 0
+        f.write(encode_rows(rows, header))
+        f.flush()
+    finally:
+        unlock_file(f)
+
+class StatWriter:
+    def __init__(self, path=CSV_FILE, queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE, fsync_policy=FSYNC_POLICY):
+        self.path = path
+        self.batch_size = batch_size
+        self.fsync_policy = fsync_policy
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.file = None
+        self.thread = threading.Thread(target=self.run, name="stat_log writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, row):
+        self.queue.put(row)
+
+    def flush(self):
+        self.queue.join()
+
+    def close(self):
+        self.queue.put(_STOP)
+        self.thread.join()
+
+    def run(self):
+        running = True
+        while running:
+            rows = [self.queue.get()]
+            while len(rows) < self.batch_size:
+                try:
+                    rows.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if any(row is _STOP for row in rows):
+                running = False
+            batch = [row for row in rows if row is not _STOP]
+            try:
+                if batch:
+                    self.write_batch(batch)
+                if not running:
+                    self.close_file()
+            except (OSError, sqlite3.Error) as e:
+                print(f"Error writing {self.path}: {e}")
+            finally:
+                for _ in rows:
+                    self.queue.task_done()
+
+    def write_batch(self, rows):
+        # A failed write drops the connection and retries on a fresh one, so
+        # a locked or broken store never stops the writer. Rows the store
+        # still refuses are appended to the CSV log instead of being lost.
+        for attempt in range(WRITE_ATTEMPTS):
+            try:
+                self.write(rows)
+                return
+            except (OSError, sqlite3.Error) as e:
+                print(f"Error writing stats to {LOG_BACKEND}: {e}")
+                self.discard_file()
+            if attempt + 1 < WRITE_ATTEMPTS:
+                time.sleep(RETRY_DELAY)
+        if LOG_BACKEND == "sqlite":
+            with open(self.path, "ab") as f:
+                append_rows(f, rows)
+
+    def write(self, rows):
+        if LOG_BACKEND == "sqlite":
+            if self.file is None:
+                self.file = session_store.open_store(FIELDNAMES, fsync_policy=self.fsync_policy)
+            session_store.insert_sessions(self.file, rows)
+            return
+        if self.file is None:
+            self.file = open(self.path, "ab")
+        append_rows(self.file, rows)
+        if self.fsync_policy == "batch":
+            os.fsync(self.file.fileno())
+
+    def discard_file(self):
+        try:
+            self.close_file()
+        except (OSError, sqlite3.Error):
+            pass
+        self.file = None
+
+    def close_file(self):
+        if self.file is None:
+            return
+        if LOG_BACKEND == "csv" and self.fsync_policy != "never":
+            os.fsync(self.file.fileno())
+        self.file.close()
+        self.file = None
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = StatWriter()
+        return _writer
+
+def flush():
+    if _writer is not None:
+        _writer.flush()
+
+def shutdown():
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.close()
+
+def reset_after_fork():
+    # A forked child inherits the parent's writer without its thread.
+    global _writer, _writer_lock
+    _writer = None
+    _writer_lock = threading.Lock()
+
+atexit.register(shutdown)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_after_fork)
 
 def init_csv():
-    if not os.path.exists(CSV_FILE):
-        with open(CSV_FILE, "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
-            writer.writeheader()
+    with open(CSV_FILE, "ab") as f:
+        lock_file(f)
+        try:
+            if os.fstat(f.fileno()).st_size == 0:
+                f.write(encode_rows([], header=True))
+        finally:
+            unlock_file(f)
+
+def init_store():
+    conn = session_store.open_store(FIELDNAMES, fsync_policy=FSYNC_POLICY)
+    try:
+        if os.path.exists(CSV_FILE):
+            session_store.sync_csv(conn, CSV_FILE)
+    finally:
+        conn.close()
+
+def init_log():
+    if LOG_BACKEND == "sqlite":
+        init_store()
+    else:
+        init_csv()
 
 def log_stats(session_id, distance, survival_time, enemies_defeated, score,
               magicbolt_damage, electricburst_damage, explosion_damage,
               item_collection_count, wave_number, bosses_defeated, player_level):
-    init_csv()
     row = {
         "SessionID": session_id,
         "DistanceTraveled": distance,
@@ -32,6 +219,4 @@ def log_stats(session_id, distance, survival_time, enemies_defeated, score,
         "BossesDefeated": bosses_defeated,
         "PlayerLevel": player_level
     }
-    with open(CSV_FILE, "a", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
-        writer.writerow(row)
\ No newline at end of file
+    get_writer().submit(row)
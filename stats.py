@@ -0,0 +1,130 @@
+import json
+
+PERKS_FILE = "perks.json"  # Optional overrides and additions to PERKS, keyed by id
+BASE_STATS = {
+    "max_health": 100,
+    "atk": 20,
+    "magic_dmg_amp": 1.0,
+    "magic_cooldown": 1.0,
+    "item_pickup_range": 10,
+    "magicbolt_count": 1,
+    "electricburst_count": 1,
+    "explosion_size_multiplier": 1.0,
+    "cooldown_reduction": 0  # Percent shown on the HUD
+}
+DERIVED_STATS = {
+    "explosion_cooldown": lambda stats: 7.0 * stats["magic_cooldown"],
+    "electric_burst_cooldown": lambda stats: 4.0 * stats["magic_cooldown"],
+    "magicbolt_damage": lambda stats: stats["atk"] * stats["magic_dmg_amp"],
+    "electricburst_damage": lambda stats: stats["atk"] * 2.0 * stats["magic_dmg_amp"],
+    "explosion_damage": lambda stats: stats["atk"] * 2.4 * stats["magic_dmg_amp"],
+    "explosion_radius": lambda stats: 12 * stats["explosion_size_multiplier"] * (1 + 0.1 * (stats["magic_dmg_amp"] - 1))
+}
+# Each effect adds to or multiplies one stat, optionally clamped by "min" or
+# "max". Perks with "level_up" are offered on level up; "duration" makes a
+# modifier a timed buff.
+PERKS = {
+    "hp_up": {
+        "name": "Health", "description": "Increase HP by 10%", "icon": "Icons/hp_up.png", "level_up": True,
+        "effects": [{"stat": "max_health", "op": "mul", "value": 1.1}]
+    },
+    "atk_up": {
+        "name": "Attack", "description": "Increase attack by 10%", "icon": "Icons/atk_up.png", "level_up": True,
+        "effects": [{"stat": "atk", "op": "mul", "value": 1.1}]
+    },
+    "cooldown_down": {
+        "name": "Cooldown Reduction", "description": "Reduce magic cooldown by 10%", "icon": "Icons/Cooldown.png",
+        "level_up": True,
+        "effects": [
+            {"stat": "magic_cooldown", "op": "mul", "value": 0.9, "min": 0.6},
+            {"stat": "cooldown_reduction", "op": "add", "value": 5}
+        ]
+    },
+    "magicbolt_count_up": {
+        "name": "Magic Bolt Count", "description": "Increase 1 Magic Bolt Count", "icon": "Icons/MagicBoltIcon.jpg",
+        "level_up": True,
+        "effects": [{"stat": "magicbolt_count", "op": "add", "value": 1}]
+    },
+    "electricburst_count_up": {
+        "name": "Electric Burst Count", "description": "Increase 1 Electric Burst Count",
+        "icon": "Icons/ElectricBurstIcon.png", "level_up": True,
+        "effects": [{"stat": "electricburst_count", "op": "add", "value": 1}]
+    },
+    "explosion_size_up": {
+        "name": "Explosion Size Increase", "description": "Increase explosion size by 20%",
+        "icon": "Icons/ExplosionIcon.png", "level_up": True,
+        "effects": [{"stat": "explosion_size_multiplier", "op": "mul", "value": 1.2}]
+    },
+    "book": {
+        "name": "Book", "description": "Permanent 5% attack increase", "icon": "Items/book.png",
+        "effects": [{"stat": "atk", "op": "mul", "value": 1.05}]
+    }
+}
+
+def load_perks(path=PERKS_FILE):
+    perks = dict(PERKS)
+    try:
+        with open(path) as f:
+            perks.update(json.load(f))
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"Error loading perks: {e}")
+    return perks
+
+class StatBlock:
+    # Stats are recomputed only when a modifier is added or expires, so
+    # reads during casts are plain dict lookups. Every change is appended to
+    # the timeline with the resulting stats.
+    def __init__(self, perks, base=BASE_STATS):
+        self.perks = perks
+        self.base = dict(base)
+        self.active = []  # (modifier id, expiry time or None)
+        self.values = self.compute()
+        self.timeline = []
+
+    def __getitem__(self, name):
+        return self.values[name]
+
+    def add(self, modifier, time=0.0):
+        duration = self.perks[modifier].get("duration")
+        self.active.append((modifier, time + duration if duration else None))
+        self.changed(time, modifier)
+
+    def expire(self, time):
+        expired = [modifier for modifier, expires in self.active if expires is not None and expires <= time]
+        if expired:
+            self.active = [(modifier, expires) for modifier, expires in self.active if expires is None or expires > time]
+            self.changed(time, *(f"-{modifier}" for modifier in expired))
+
+    def changed(self, time, *events):
+        self.values = self.compute()
+        for event in events:
+            self.timeline.append((time, event, self.values))
+
+    def compute(self):
+        added = dict.fromkeys(self.base, 0)
+        multiplied = dict.fromkeys(self.base, 1)
+        lower, upper = {}, {}
+        for modifier, _ in self.active:
+            for effect in self.perks[modifier]["effects"]:
+                stat = effect["stat"]
+                if effect["op"] == "add":
+                    added[stat] += effect["value"]
+                else:
+                    multiplied[stat] *= effect["value"]
+                if "min" in effect:
+                    lower[stat] = max(lower.get(stat, effect["min"]), effect["min"])
+                if "max" in effect:
+                    upper[stat] = min(upper.get(stat, effect["max"]), effect["max"])
+        values = {}
+        for stat, base in self.base.items():
+            value = (base + added[stat]) * multiplied[stat]
+            if stat in lower:
+                value = max(lower[stat], value)
+            if stat in upper:
+                value = min(upper[stat], value)
+            values[stat] = value
+        for stat, formula in DERIVED_STATS.items():
+            values[stat] = formula(values)
+        return values
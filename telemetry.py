@@ -0,0 +1,132 @@
+import json
+import os
+import struct
+import uuid
+import numpy as np
+
+TELEMETRY_FILE = "telemetry.bin"
+SAMPLE_EVERY = 1  # Ticks between samples
+RING_SIZE = 4096  # Samples buffered before a chunk is appended to disk
+MAGIC = b"ACTL"
+VERSION = 2
+HEADER_ALIGN = 64
+
+RECORD_DTYPE = np.dtype([
+    ("session", "<u8"),
+    ("tick", "<u4"),
+    ("time", "<f4"),
+    ("x", "<f4"),
+    ("y", "<f4"),
+    ("health", "<f4"),
+    ("max_health", "<f4"),
+    ("level", "<u4"),
+    ("wave", "<u4"),
+    ("score", "<u4"),
+    ("enemies", "<u4"),
+    ("bosses", "<u4"),
+    ("projectiles", "<u4"),
+    ("enemy_projectiles", "<u4"),
+    ("explosions", "<u4"),
+    ("items", "<u4"),
+    ("magicbolt_damage", "<f4"),
+    ("electricburst_damage", "<f4"),
+    ("explosion_damage", "<f4"),
+    ("frame_ms", "<f4"),
+    ("update_ms", "<f4"),
+])
+
+def build_header(dtype=RECORD_DTYPE):
+    meta = json.dumps({"version": VERSION, "descr": dtype.descr}).encode("utf-8")
+    size = len(MAGIC) + 4 + len(meta)
+    padding = -size % HEADER_ALIGN
+    return MAGIC + struct.pack("<I", len(meta) + padding) + meta + b" " * padding
+
+def read_header(f):
+    magic = f.read(len(MAGIC))
+    if magic != MAGIC:
+        raise ValueError("Not a telemetry file")
+    (meta_length,) = struct.unpack("<I", f.read(4))
+    meta = json.loads(f.read(meta_length).decode("utf-8"))
+    dtype = np.dtype([tuple(field) for field in meta["descr"]])
+    return dtype, len(MAGIC) + 4 + meta_length
+
+def session_key(session_id):
+    return uuid.UUID(session_id).int & 0xFFFFFFFFFFFFFFFF
+
+def load_telemetry(path=TELEMETRY_FILE):
+    with open(path, "rb") as f:
+        dtype, offset = read_header(f)
+    count = (os.path.getsize(path) - offset) // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(count,))
+
+class TelemetryRecorder:
+    def __init__(self, path=TELEMETRY_FILE, sample_every=SAMPLE_EVERY, ring_size=RING_SIZE):
+        self.path = path
+        self.sample_every = max(1, sample_every)
+        self.buffer = np.zeros(ring_size, dtype=RECORD_DTYPE)
+        self.count = 0
+        self.tick = 0
+        self.session_id = None
+        self.session = 0
+        self.file = self.open_file()
+
+    def open_file(self):
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, "rb") as f:
+                dtype, _ = read_header(f)
+            if dtype != RECORD_DTYPE:
+                raise ValueError(f"{self.path} was written with a different record layout")
+            return open(self.path, "ab")
+        f = open(self.path, "ab")
+        f.write(build_header())
+        f.flush()
+        return f
+
+    def sample(self, game_manager, frame_time, update_time):
+        if game_manager.game_over or game_manager.game_won or game_manager.paused or game_manager.level_up_pending:
+            return
+        if game_manager.session_id != self.session_id:
+            self.session_id = game_manager.session_id
+            self.session = session_key(self.session_id)
+            self.tick = 0
+        self.tick += 1
+        if self.tick % self.sample_every:
+            return
+        player = game_manager.player
+        record = self.buffer[self.count]
+        record["session"] = self.session
+        record["tick"] = self.tick
+        record["time"] = game_manager.time_elapsed
+        record["x"] = player.position[0]
+        record["y"] = player.position[1]
+        record["health"] = player.health
+        record["max_health"] = player.max_health
+        record["level"] = player.level
+        record["wave"] = game_manager.current_wave
+        record["score"] = game_manager.score
+        record["enemies"] = len(game_manager.enemies)
+        record["bosses"] = len(game_manager.bosses)
+        record["projectiles"] = len(game_manager.projectiles)
+        record["enemy_projectiles"] = len(game_manager.enemy_projectiles)
+        record["explosions"] = len(game_manager.explosions)
+        record["items"] = len(game_manager.items)
+        record["magicbolt_damage"] = player.magic_damage["magicbolt"]
+        record["electricburst_damage"] = player.magic_damage["electricburst"]
+        record["explosion_damage"] = player.magic_damage["explosion"]
+        record["frame_ms"] = frame_time * 1000
+        record["update_ms"] = update_time * 1000
+        self.count += 1
+        if self.count == len(self.buffer):
+            self.flush()
+
+    def flush(self):
+        if self.count:
+            self.file.write(self.buffer[:self.count].tobytes())
+            self.file.flush()
+            self.count = 0
+
+    def close(self):
+        self.flush()
+        self.file.close()
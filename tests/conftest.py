@@ -0,0 +1,16 @@
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # Asset paths are relative to the repository
+
+@pytest.fixture(scope="session", autouse=True)
+def pygame_init():
+    import pygame
+    pygame.init()
+    yield
+    pygame.quit()
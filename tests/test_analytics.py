@@ -0,0 +1,37 @@
+import math
+import numpy as np
+from analytics import RunningStats
+
+def test_merged_chunks_match_the_whole_sample():
+    values = np.random.default_rng(7).normal(50, 12, 1001)
+    merged = RunningStats()
+    for chunk in np.array_split(values, 7):
+        part = RunningStats()
+        part.update(chunk)
+        merged.merge(part)
+    assert merged.count == len(values)
+    assert math.isclose(merged.mean, values.mean(), rel_tol=1e-12)
+    assert math.isclose(merged.std, values.std(ddof=1), rel_tol=1e-12)
+    assert merged.minimum == values.min() and merged.maximum == values.max()
+
+def test_merge_order_does_not_matter():
+    a, b = RunningStats(), RunningStats()
+    a.update([1.0, 2.0, 3.0])
+    b.update([10.0, 20.0])
+    left, right = RunningStats.from_dict(a.to_dict()), RunningStats.from_dict(b.to_dict())
+    left.merge(b)
+    right.merge(a)
+    for key, value in left.to_dict().items():
+        assert math.isclose(value, right.to_dict()[key])
+
+def test_empty_and_nan_values_are_ignored():
+    stats = RunningStats()
+    stats.merge(RunningStats())
+    stats.update([])
+    stats.update([float("nan")])
+    assert stats.count == 0 and math.isnan(stats.std)
+    stats.update([4.0, float("nan")])
+    empty = RunningStats()
+    empty.merge(stats)
+    assert (empty.count, empty.mean, empty.minimum, empty.maximum) == (1, 4.0, 4.0, 4.0)
+    assert math.isnan(empty.std)
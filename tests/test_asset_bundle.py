@@ -0,0 +1,48 @@
+import os
+import pygame
+import pytest
+import asset_bundle
+
+def write_sprite(path, color):
+    surface = pygame.Surface((3, 2), pygame.SRCALPHA)
+    surface.fill(color)
+    pygame.image.save(surface, str(path))
+
+@pytest.fixture
+def sprites(tmp_path, monkeypatch):
+    (tmp_path / "Items").mkdir()
+    write_sprite(tmp_path / "Items" / "heal.png", (200, 10, 10, 255))
+    write_sprite(tmp_path / "Items" / "book.png", (10, 10, 200, 128))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(asset_bundle, "surfaces", {})
+    assert asset_bundle.build_bundle("test.bundle") == 2
+    bundle = asset_bundle.AssetBundle("test.bundle")
+    monkeypatch.setattr(asset_bundle, "bundle", bundle)
+    return bundle
+
+def test_images_round_trip_through_the_bundle(sprites, monkeypatch):
+    monkeypatch.setattr(pygame.image, "load", None)  # Any disk read would fail
+    heal = asset_bundle.load_image("Items/heal.png")
+    book = asset_bundle.load_image(os.path.join("items", "BOOK.png"))
+    assert heal.get_size() == (3, 2) and heal.get_at((2, 1)) == (200, 10, 10, 255)
+    assert book.get_at((0, 0)) == (10, 10, 200, 128)
+    assert asset_bundle.load_image("Items/heal.png") is heal
+
+def test_edited_sources_are_loaded_from_disk(sprites, tmp_path):
+    path = tmp_path / "Items" / "heal.png"
+    write_sprite(path, (0, 255, 0, 255))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert sprites.stale("Items/heal.png")
+    assert asset_bundle.load_image("Items/heal.png").get_at((0, 0)) == (0, 255, 0, 255)
+
+def test_bundle_without_sources_is_used(sprites, tmp_path):
+    os.remove(tmp_path / "Items" / "book.png")
+    assert not sprites.stale("Items/book.png")
+    assert asset_bundle.load_image("Items/book.png").get_at((0, 0)) == (10, 10, 200, 128)
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "junk.bundle"
+    path.write_bytes(b"not a bundle at all")
+    with pytest.raises(ValueError):
+        asset_bundle.AssetBundle(str(path))
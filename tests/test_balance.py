@@ -0,0 +1,28 @@
+import balance
+from checksum import unlogged
+from stats import PERKS
+
+def test_sessions_level_up_and_arms_differ():
+    runner = balance.BalanceRunner(ticks=2400)
+    policies = balance.perk_policies(PERKS)
+    arms = [balance.Arm("prefer_hp_up", policies["prefer_hp_up"], {}),
+            balance.Arm("prefer_atk_up", policies["prefer_atk_up"], {"atk": 40})]
+    levels = []
+    with unlogged():
+        for arm in arms:
+            runner.play(arm, 0)
+            levels.append(runner.game_manager.player.level)
+    assert min(levels) > 1
+    assert len({arm.scores[0] for arm in arms}) > 1
+
+def test_successive_halving_ranks_every_arm():
+    runner = balance.BalanceRunner(ticks=600)
+    arms = [balance.Arm("random", None, {}), balance.Arm("random", None, {"max_health": 1})]
+    ranked = balance.successive_halving(runner, arms, samples=2, budget=4, log=lambda message: None)
+    assert sorted(map(id, ranked)) == sorted(map(id, arms))
+    assert runner.simulations == 4
+
+def test_wilson_interval_contains_the_rate():
+    low, high = balance.wilson_interval(7, 10)
+    assert 0 < low < 0.7 < high < 1
+    assert balance.wilson_interval(0, 0) == (0.0, 1.0)
@@ -0,0 +1,45 @@
+import pickle
+import types
+import numpy as np
+from bullets import DEFAULT_BULLETS, MOVING, VANISHING, BulletField
+
+def player(x, y):
+    return types.SimpleNamespace(position=[x, y], health=100.0)
+
+def field():
+    return BulletField(DEFAULT_BULLETS, 100, 100, capacity=4)
+
+def test_retired_bullets_are_compacted_in_order():
+    bullets = field()
+    target = player(50, 50)
+    bullets.emit("boss_bolt", 10, 10, [0, 90], 10, 5)  # Far from the player
+    bullets.emit("boss_bolt", 50, 50, [0], 0, 7)  # Hits and is removed
+    bullets.emit("boss_bolt", 99.9, 10, [0], 10, 5)  # Leaves the map
+    bullets.emit("boss_bolt", 20, 20, [180], 10, 5)
+    assert len(bullets) == 5 and len(bullets.data) >= 5
+    bullets.update(0.1, target, 0)
+    assert target.health == 93
+    assert len(bullets) == 3
+    kept = bullets.data[:len(bullets)]
+    np.testing.assert_allclose(kept["x"], [11, 10, 19])
+    np.testing.assert_allclose(kept["y"], [10, 11, 20])
+
+def test_vanishing_bullets_stay_until_their_animation_ends():
+    bullets = field()
+    target = player(50, 50)
+    bullets.emit("slash", 50, 50, [0], 0, 5)
+    bullets.emit("boss_bolt", 5, 5, [0], 1, 5)
+    bullets.update(0.01, target, 0)
+    assert len(bullets) == 2 and bullets.data["state"][0] == VANISHING
+    assert target.health == 95
+    duration = DEFAULT_BULLETS["kinds"]["slash"]["vanish_duration"]
+    bullets.update(duration, target, 0)
+    assert len(bullets) == 1 and bullets.data["state"][0] == MOVING
+    assert target.health == 95  # A vanishing bullet does not hit again
+
+def test_snapshots_keep_only_live_bullets():
+    bullets = field()
+    bullets.emit("boss_bolt", 5, 5, np.arange(10) * 36.0, 1, 5)
+    restored = pickle.loads(pickle.dumps(bullets))
+    assert len(restored) == 10 and len(restored.data) == 10
+    np.testing.assert_array_equal(restored.data, bullets.data[:10])
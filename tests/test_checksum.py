@@ -0,0 +1,57 @@
+import main
+from checksum import compare_backends, first_difference
+
+PERTURB_TICK = 1201
+
+class Perturbed(main.GameManager):
+    # Knocks one point of health off an enemy on a single tick.
+    ticks = 0
+
+    def update(self, dt):
+        super().update(dt)
+        self.ticks += 1
+        if self.ticks == PERTURB_TICK:
+            self.enemies[-1].health -= 1
+
+class UnfaithfulSnapshots(Perturbed):
+    # Restores checkpoints with the player nudged off its saved position.
+    @staticmethod
+    def load_state(data, restore_random=True):
+        game_manager = main.GameManager.load_state(data, restore_random)
+        game_manager.player.position[0] += 0.5
+        return game_manager
+
+class ForgetfulSnapshots(Perturbed):
+    # Restores checkpoints with the tick counter lost, so a replay never
+    # repeats the perturbation.
+    @staticmethod
+    def load_state(data, restore_random=True):
+        game_manager = main.GameManager.load_state(data, restore_random)
+        game_manager.ticks = 0
+        return game_manager
+
+def test_identical_backends_agree():
+    assert compare_backends(main.GameManager, main.GameManager, seed=1, ticks=600) is None
+
+def test_bisect_reports_the_exact_tick():
+    tick, (group, index, fields, expected, actual) = compare_backends(
+        main.GameManager, Perturbed, seed=1, ticks=1800, every=60)
+    assert tick == PERTURB_TICK
+    assert group == "enemies" and fields == ["health"]
+    assert actual[2] == expected[2] - 1
+
+def test_bisect_survives_an_unfaithful_restore():
+    tick, difference = compare_backends(main.GameManager, UnfaithfulSnapshots, seed=1, ticks=1800, every=60)
+    assert tick == PERTURB_TICK
+    assert difference[0] == "enemies"
+
+def test_first_difference_reports_count_changes():
+    reference, candidate = main.GameManager(), main.GameManager()
+    assert first_difference(reference, candidate) is None
+    candidate.items.append(main.ExpOrb([1.0, 2.0]))
+    assert first_difference(reference, candidate) == ("items", 0, ["count"], None, [1.0, 2.0])
+
+def test_unreproduced_mismatch_is_still_reported():
+    tick, difference = compare_backends(main.GameManager, ForgetfulSnapshots, seed=1, ticks=1800, every=60)
+    assert tick == 1260
+    assert difference[0] == "enemies"
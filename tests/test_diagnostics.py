@@ -0,0 +1,48 @@
+import random
+import autopilot
+import main
+from checksum import unlogged
+from diagnostics import MemoryMonitor
+
+MAX_PROJECTILES = 30  # Bolts in flight; spent ones pile up past this within a minute
+
+def test_waves_stay_within_the_growth_limit():
+    monitor = MemoryMonitor(path=None)
+    most_projectiles = 0
+    try:
+        with unlogged():
+            random.seed(2)
+            game_manager = main.GameManager()
+            game_manager.reset(2)
+            game_manager.start_game()
+            for _ in range(3600):
+                if game_manager.level_up_pending:
+                    game_manager.choose_upgrade(game_manager.level_up_choices[0])
+                game_manager.move_player(autopilot.choose_move(game_manager), 1 / 60)
+                game_manager.update(1 / 60)
+                game_manager.player.health = game_manager.player.max_health
+                monitor.sample(game_manager)
+                most_projectiles = max(most_projectiles, len(game_manager.projectiles))
+    finally:
+        monitor.close()
+    assert game_manager.current_wave >= 2
+    assert monitor.wave == game_manager.current_wave
+    assert monitor.counts["Player"][0] >= 1
+    monitor.check()
+    assert most_projectiles <= MAX_PROJECTILES
+
+def test_check_reports_waves_over_the_limit():
+    monitor = MemoryMonitor(path=None, growth_limit=0)
+    try:
+        monitor.wave_report(0)
+        hoard = [bytearray(1024) for _ in range(64)]
+        monitor.wave_report(1)
+    finally:
+        monitor.close()
+    assert hoard and monitor.failures and monitor.failures[0][0] == 1
+    try:
+        monitor.check()
+    except RuntimeError as e:
+        assert "wave 1" in str(e)
+    else:
+        raise AssertionError("growth past the limit was not reported")
@@ -0,0 +1,43 @@
+import numpy as np
+import main
+
+def orb_grid(count, spacing):
+    columns = int(count ** 0.5) + 1
+    return [main.ExpOrb([1 + spacing * (i % columns), 1 + spacing * (i // columns)], value=5, exp=2)
+            for i in range(count)]
+
+def test_clustered_orbs_merge_and_keep_their_exp():
+    game_manager = main.GameManager()
+    game_manager.items = orb_grid(400, 0.5)
+    game_manager.coalesce_orbs()
+    assert len(game_manager.items) <= main.ORB_MERGE_THRESHOLD
+    assert sum(orb.exp for orb in game_manager.items) == 800
+    assert sum(orb.value for orb in game_manager.items) == 2000
+
+def test_scattered_orbs_are_not_merged_across_the_map():
+    game_manager = main.GameManager()
+    orbs = orb_grid(150, main.ORB_MERGE_MAX_CELL_SIZE)
+    game_manager.items = list(orbs)
+    game_manager.coalesce_orbs()
+    assert game_manager.items == orbs
+
+def test_unmergeable_orbs_are_only_rescanned_when_their_count_changes(monkeypatch):
+    game_manager = main.GameManager()
+    game_manager.items = orb_grid(150, main.ORB_MERGE_MAX_CELL_SIZE)
+    game_manager.coalesce_orbs()
+    passes = []
+    unique = np.unique
+    monkeypatch.setattr(np, "unique", lambda *args, **kwargs: passes.append(1) or unique(*args, **kwargs))
+    game_manager.coalesce_orbs()
+    assert not passes
+    game_manager.items.append(main.ExpOrb([1.1, 1.1]))
+    game_manager.coalesce_orbs()
+    assert passes
+    assert len(game_manager.items) == 150
+
+def test_item_drops_stop_at_the_limit():
+    game_manager = main.GameManager()
+    for _ in range(main.ITEM_DROP_LIMIT + 10):
+        game_manager.drop_item([5, 5], 1)
+    assert len(game_manager.items) == main.ITEM_DROP_LIMIT
+    assert all(isinstance(item, main.Item) for item in game_manager.items)
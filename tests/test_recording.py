@@ -0,0 +1,57 @@
+import random
+import autopilot
+import export
+import main
+from checksum import state_hash, unlogged
+from recording import SessionRecorder, load_recording, replay
+
+def record_session(directory, seed, ticks):
+    # An autopilot session with a pause in the middle; returns the saved path
+    # and the final state hash.
+    random.seed(seed)
+    game_manager = main.GameManager()
+    game_manager.reset(seed)
+    game_manager.recorder = SessionRecorder(str(directory))
+    game_manager.start_game()
+    for tick in range(ticks):
+        game_manager.paused = 100 <= tick < 110
+        if game_manager.level_up_pending:
+            game_manager.choose_upgrade(game_manager.level_up_choices[-1])
+        if not game_manager.paused:
+            game_manager.move_player(autopilot.choose_move(game_manager), 1 / 60)
+        game_manager.update(1 / 60)
+    return game_manager.recorder.save(), state_hash(game_manager)
+
+class FrameCounter:
+    def __init__(self):
+        self.count = 0
+
+    def write(self, pixels, size):
+        assert len(pixels) == size[0] * size[1] * 3
+        self.count += 1
+
+def test_replay_reproduces_the_recorded_session(tmp_path):
+    with unlogged():
+        path, expected = record_session(tmp_path, 4, 1500)
+        recording = load_recording(path)
+        assert len(recording["ticks"]) == 1490
+        assert any(perk for dt, moves, perk in recording["ticks"])
+        for game_manager in replay(recording):
+            pass
+    assert state_hash(game_manager) == expected
+
+def test_snapshots_do_not_carry_the_recorder(tmp_path):
+    with unlogged():
+        game_manager = main.GameManager()
+        game_manager.recorder = SessionRecorder(str(tmp_path))
+        game_manager.start_game()
+        assert main.GameManager.load_state(game_manager.save_state()).recorder is None
+        assert game_manager.recorder.save() is None  # Nothing played yet
+
+def test_export_draws_every_skipped_tick_and_the_last(tmp_path):
+    with unlogged():
+        path, _ = record_session(tmp_path, 2, 45)
+    writer = FrameCounter()
+    size = export.export_session(writer, load_recording(path), skip=10, scale=0.25)
+    assert size == (main.SCREEN_WIDTH // 4, main.SCREEN_HEIGHT // 4)
+    assert writer.count == 5
@@ -0,0 +1,13 @@
+import pygame
+import main
+
+def test_sessions_start_with_every_atlas_built():
+    main.GameManager()
+    assert set(main.rotation_atlases) == set(main.ATLAS_LOADERS)
+
+def test_atlas_picks_the_nearest_step():
+    atlas = main.RotationAtlas([pygame.Surface((4, 2))], steps=64)
+    assert atlas.get(0) is atlas.rotations[0]
+    assert atlas.get(360 / 64 * 0.6) is atlas.rotations[1]
+    assert atlas.get(-360 / 64) is atlas.rotations[63]
+    assert atlas.get(90)[0].get_size() == (2, 4)
@@ -0,0 +1,58 @@
+import random
+import pygame
+import savestate
+from checksum import state_hash, unlogged
+import main
+
+def new_session(seed):
+    random.seed(seed)
+    game_manager = main.GameManager()
+    game_manager.reset(seed)
+    game_manager.start_game()
+    return game_manager
+
+def advance(game_manager, directions):
+    # The player is kept alive so the session reaches busy waves.
+    for direction in directions:
+        if game_manager.level_up_pending:
+            game_manager.choose_upgrade(game_manager.level_up_choices[0])
+        game_manager.move_player(direction, 1 / 60)
+        game_manager.update(1 / 60)
+        game_manager.player.health = game_manager.player.max_health
+
+def walk(seed, ticks):
+    rng = random.Random(seed)
+    return [rng.choice(["left", "right", "up", "down"]) for _ in range(ticks)]
+
+def test_restored_session_replays_tick_for_tick():
+    with unlogged():
+        original = new_session(3)
+        advance(original, walk(1, 900))
+        data = original.save_state()
+        later = walk(2, 300)
+        advance(original, later)
+        expected = state_hash(original)
+        restored = main.GameManager.load_state(data)
+        restored.player.game_manager = restored
+        advance(restored, later)
+        assert state_hash(restored) == expected
+
+def test_snapshot_header_is_checked():
+    data = savestate.dumps({"value": 1}, {})
+    assert savestate.loads(data, None) == {"value": 1}
+    try:
+        savestate.loads(b"XXXX" + data[4:], None)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("bad magic accepted")
+
+def test_shared_assets_are_written_as_keys():
+    surface = pygame.Surface((4, 4))
+    loose = pygame.Surface((2, 3), pygame.SRCALPHA)
+    loose.fill((1, 2, 3, 4))
+    data = savestate.dumps({"shared": surface, "loose": loose}, {id(surface): ("image", "x")})
+    state = savestate.loads(data, lambda key: ("resolved", key))
+    assert state["shared"] == ("resolved", ("image", "x"))
+    assert state["loose"].get_size() == (2, 3)
+    assert state["loose"].get_at((1, 1)) == (1, 2, 3, 4)
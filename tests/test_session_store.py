@@ -0,0 +1,80 @@
+import sqlite3
+import session_store
+from stat_log import FIELDNAMES
+
+def row(session_id, score, damage=(10.0, 20.0, 30.0), **extra):
+    values = dict.fromkeys(FIELDNAMES, 0)
+    values.update(SessionID=session_id, Score=score, MagicBoltDamage=damage[0],
+                  ElectricBurstDamage=damage[1], ExplosionDamage=damage[2], **extra)
+    return values
+
+def test_migration_creates_the_schema_once(tmp_path):
+    path = str(tmp_path / "store.db")
+    session_store.open_store(FIELDNAMES, path).close()
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == session_store.SCHEMA_VERSION
+    # A current schema is only read, so a read-only connection migrates cleanly.
+    session_store.migrate(conn, FIELDNAMES)
+    assert session_store.table_columns(conn) == ["id", "RecordedAt"] + FIELDNAMES
+
+def test_new_fields_become_nullable_columns(tmp_path):
+    path = str(tmp_path / "store.db")
+    old_fields = FIELDNAMES[:-1]
+    conn = session_store.open_store(old_fields, path)
+    session_store.insert_sessions(conn, [{name: row("old", 1)[name] for name in old_fields}])
+    conn.close()
+    conn = session_store.open_store(FIELDNAMES, path)
+    assert session_store.table_columns(conn)[2:] == FIELDNAMES
+    assert conn.execute(f'SELECT "Score", "{FIELDNAMES[-1]}" FROM sessions').fetchone() == (1, None)
+
+def test_duplicate_sessions_are_ignored(tmp_path):
+    conn = session_store.open_store(FIELDNAMES, str(tmp_path / "store.db"))
+    assert session_store.insert_sessions(conn, [row("a", 1), row("b", 2)]) == 2
+    assert session_store.insert_sessions(conn, [row("a", 1)]) == 0
+    assert session_store.session_count(conn) == 2
+
+def test_recent_sessions_keep_insertion_order(tmp_path):
+    conn = session_store.open_store(FIELDNAMES, str(tmp_path / "store.db"))
+    session_store.insert_sessions(conn, [row(str(i), i) for i in range(5)])
+    query, params = session_store.recent_sessions_query(["Score"], last=2)
+    assert [score for _, score in conn.execute(query, params)] == [3, 4]
+    query, params = session_store.recent_sessions_query(["Score"])
+    assert [score for _, score in conn.execute(query, params)] == [0, 1, 2, 3, 4]
+
+def test_magic_damage_stats(tmp_path):
+    conn = session_store.open_store(FIELDNAMES, str(tmp_path / "store.db"))
+    session_store.insert_sessions(conn, [row("a", 0, (10.0, 0.0, 5.0)), row("b", 0, (20.0, 0.0, 5.0)),
+                                         row("c", 0, (30.0, 0.0, 5.0))])
+    stats = {entry["perk"]: entry for entry in session_store.magic_damage_stats(conn)}
+    assert stats["Magic Bolt"]["mean"] == 20.0
+    assert abs(stats["Magic Bolt"]["std"] - 10.0) < 1e-9
+    assert stats["Explosion"]["std"] == 0.0
+    latest = {entry["perk"]: entry for entry in session_store.magic_damage_stats(conn, last=2)}
+    assert latest["Magic Bolt"]["mean"] == 25.0
+
+def test_import_csv(tmp_path):
+    from stat_log import encode_rows
+    csv_path = tmp_path / "log.csv"
+    csv_path.write_bytes(encode_rows([row("a", 5), row("b", 6)], header=True))
+    conn = session_store.open_store(FIELDNAMES, str(tmp_path / "store.db"))
+    assert session_store.import_csv(conn, str(csv_path), batch_size=1) == 2
+    assert session_store.import_csv(conn, str(csv_path)) == 0
+
+def test_damage_spread_survives_large_means(tmp_path):
+    conn = session_store.open_store(FIELDNAMES, str(tmp_path / "store.db"))
+    session_store.insert_sessions(conn, [row(str(i), 0, (1e9 + i, 0.0, 0.0)) for i in range(1, 4)])
+    stats = {entry["perk"]: entry for entry in session_store.magic_damage_stats(conn)}
+    assert stats["Magic Bolt"]["std"] == 1.0
+    assert session_store.magic_damage_stats(session_store.open_store(FIELDNAMES, str(tmp_path / "empty.db")))[0]["mean"] is None
+
+def test_csv_is_synced_again_after_it_grows(tmp_path):
+    from stat_log import encode_rows
+    csv_path = tmp_path / "log.csv"
+    csv_path.write_bytes(encode_rows([row("a", 5)], header=True))
+    conn = session_store.open_store(FIELDNAMES, str(tmp_path / "store.db"))
+    assert session_store.sync_csv(conn, str(csv_path)) == 1
+    assert session_store.sync_csv(conn, str(csv_path)) == 0
+    with open(csv_path, "ab") as f:
+        f.write(encode_rows([row("b", 6)]))
+    assert session_store.sync_csv(conn, str(csv_path)) == 1
+    assert session_store.session_count(conn) == 2
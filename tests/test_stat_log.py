@@ -0,0 +1,77 @@
+import csv
+import sqlite3
+import threading
+import pytest
+import session_store
+import stat_log
+from stat_log import FIELDNAMES, StatWriter
+
+def row(session_id):
+    values = dict.fromkeys(FIELDNAMES, 0)
+    values["SessionID"] = session_id
+    return values
+
+def flushed(writer, timeout=5):
+    thread = threading.Thread(target=writer.flush, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return not thread.is_alive()
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(stat_log, "RETRY_DELAY", 0)
+    monkeypatch.setattr(stat_log, "LOG_BACKEND", "sqlite")
+    path = str(tmp_path / "store.db")
+    open_store = session_store.open_store
+    monkeypatch.setattr(session_store, "open_store",
+                        lambda fieldnames, fsync_policy="close": open_store(fieldnames, path, fsync_policy))
+    return path
+
+def test_rows_reach_the_store(tmp_path, store):
+    writer = StatWriter(str(tmp_path / "log.csv"))
+    writer.submit(row("a"))
+    writer.close()
+    assert session_store.session_count(sqlite3.connect(store)) == 1
+
+def test_locked_store_falls_back_to_csv(tmp_path, store, monkeypatch):
+    def locked(*args):
+        raise sqlite3.OperationalError("database is locked")
+    monkeypatch.setattr(session_store, "insert_sessions", locked)
+    writer = StatWriter(str(tmp_path / "log.csv"))
+    writer.submit(row("a"))
+    assert flushed(writer)
+    writer.submit(row("b"))
+    assert flushed(writer)
+    assert writer.thread.is_alive()
+    writer.close()
+    with open(tmp_path / "log.csv", newline="") as f:
+        assert [entry["SessionID"] for entry in csv.DictReader(f)] == ["a", "b"]
+
+def test_store_recovers_after_a_failed_attempt(tmp_path, store, monkeypatch):
+    insert_sessions = session_store.insert_sessions
+    failures = [sqlite3.OperationalError("database is locked")]
+    def flaky(conn, rows):
+        if failures:
+            raise failures.pop()
+        return insert_sessions(conn, rows)
+    monkeypatch.setattr(session_store, "insert_sessions", flaky)
+    writer = StatWriter(str(tmp_path / "log.csv"))
+    writer.submit(row("a"))
+    writer.close()
+    assert session_store.session_count(sqlite3.connect(store)) == 1
+    assert not (tmp_path / "log.csv").exists()
+
+def test_rows_kept_in_csv_reach_the_store_on_next_start(tmp_path, store, monkeypatch):
+    csv_path = str(tmp_path / "log.csv")
+    monkeypatch.setattr(stat_log, "CSV_FILE", csv_path)
+    stat_log.init_store()
+    insert_sessions = session_store.insert_sessions
+    def locked(*args):
+        raise sqlite3.OperationalError("database is locked")
+    monkeypatch.setattr(session_store, "insert_sessions", locked)
+    writer = StatWriter(csv_path)
+    writer.submit(row("a"))
+    writer.close()
+    monkeypatch.setattr(session_store, "insert_sessions", insert_sessions)
+    stat_log.init_store()
+    assert session_store.session_count(sqlite3.connect(store)) == 1
@@ -0,0 +1,46 @@
+import pytest
+import main
+from stats import BASE_STATS, PERKS, StatBlock
+
+TIMED_PERKS = dict(PERKS, vigor={
+    "name": "Vigor", "description": "Double HP for 10 seconds", "icon": "Icons/hp_up.png", "duration": 10,
+    "effects": [{"stat": "max_health", "op": "mul", "value": 2}]
+})
+
+def test_modifiers_stack_and_update_derived_stats():
+    stats = StatBlock(PERKS)
+    stats.add("atk_up")
+    stats.add("book")
+    stats.add("magicbolt_count_up")
+    assert stats["atk"] == pytest.approx(BASE_STATS["atk"] * 1.1 * 1.05)
+    assert stats["magicbolt_damage"] == pytest.approx(stats["atk"] * stats["magic_dmg_amp"])
+    assert stats["magicbolt_count"] == BASE_STATS["magicbolt_count"] + 1
+    assert [event for _, event, _ in stats.timeline] == ["atk_up", "book", "magicbolt_count_up"]
+
+def test_effect_limits_clamp_the_stat():
+    stats = StatBlock(PERKS)
+    for _ in range(10):
+        stats.add("cooldown_down")
+    assert stats["magic_cooldown"] == 0.6
+    assert stats["explosion_cooldown"] == pytest.approx(7.0 * 0.6)
+    assert stats["cooldown_reduction"] == 50
+
+def test_timed_modifiers_expire():
+    stats = StatBlock(TIMED_PERKS)
+    stats.add("vigor", time=5.0)
+    stats.add("hp_up", time=5.0)
+    stats.expire(14.9)
+    assert stats["max_health"] == pytest.approx(BASE_STATS["max_health"] * 2 * 1.1)
+    stats.expire(15.0)
+    assert stats["max_health"] == pytest.approx(BASE_STATS["max_health"] * 1.1)
+    assert stats.timeline[-1][:2] == (15.0, "-vigor")
+
+def test_health_is_clamped_when_a_max_health_buff_expires():
+    game_manager = main.GameManager()
+    player = game_manager.player
+    player.stats.perks = TIMED_PERKS
+    player.apply_modifier("vigor")
+    assert player.health == player.max_health == 2 * BASE_STATS["max_health"]
+    player.expire_modifiers(10.0)
+    assert player.max_health == BASE_STATS["max_health"]
+    assert player.health == player.max_health
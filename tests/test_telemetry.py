@@ -0,0 +1,51 @@
+import random
+import numpy as np
+import pytest
+import main
+from checksum import unlogged
+from telemetry import RECORD_DTYPE, TelemetryRecorder, build_header, load_telemetry
+
+def start_game(seed):
+    random.seed(seed)
+    game_manager = main.GameManager()
+    game_manager.reset(seed)
+    game_manager.start_game()
+    return game_manager
+
+def test_samples_read_back_after_a_flush(tmp_path):
+    path = str(tmp_path / "telemetry.bin")
+    recorder = TelemetryRecorder(path, sample_every=2, ring_size=8)
+    with unlogged():
+        game_manager = start_game(1)
+        for tick in range(10):
+            game_manager.update(1 / 60)
+            recorder.sample(game_manager, 0.02, 0.001)
+        # The five samples fit in the ring, so none reach the file until a flush.
+        assert len(load_telemetry(path)) == 0
+        recorder.flush()
+    records = load_telemetry(path)
+    assert len(records) == 5
+    assert list(records["tick"]) == [2, 4, 6, 8, 10]
+    assert np.allclose(records["frame_ms"], 20)
+    assert records["wave"][-1] == game_manager.current_wave
+    assert records["health"][-1] == pytest.approx(game_manager.player.health)
+    recorder.close()
+
+def test_counts_past_sixteen_bits_are_kept(tmp_path):
+    path = str(tmp_path / "telemetry.bin")
+    recorder = TelemetryRecorder(path)
+    with unlogged():
+        game_manager = start_game(1)
+        game_manager.update(1 / 60)
+        game_manager.items = [None] * 70000
+        recorder.sample(game_manager, 1 / 60, 0.001)
+    recorder.close()
+    assert load_telemetry(path)["items"][0] == 70000
+
+def test_files_with_another_layout_are_refused(tmp_path):
+    path = tmp_path / "telemetry.bin"
+    old = np.dtype([(name, "<u2" if kind == "<u4" else kind) for name, kind in RECORD_DTYPE.descr])
+    path.write_bytes(build_header(old))
+    assert load_telemetry(str(path)).dtype == old
+    with pytest.raises(ValueError):
+        TelemetryRecorder(str(path))
@@ -1,73 +1,234 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-df = pd.read_csv("gamedata.csv")
-df["Session"] = range(1, len(df) + 1)
-
-damage_stats = pd.DataFrame([
-    {"perk": "Magic Bolt", "mean": df["MagicBoltDamage"].mean(), "std": df["MagicBoltDamage"].std()},
-    {"perk": "Electric Burst", "mean": df["ElectricBurstDamage"].mean(), "std": df["ElectricBurstDamage"].std()},
-    {"perk": "Explosion", "mean": df["ExplosionDamage"].mean(), "std": df["ExplosionDamage"].std()}
-])
-
-wave_data = df.groupby("WaveNumber")["EnemiesDefeated"].mean().reset_index()
-wave_data["WaveNumber"] = wave_data["WaveNumber"].astype(int)
-df["TotalDamage"] = df["MagicBoltDamage"] + df["ElectricBurstDamage"] + df["ExplosionDamage"]
-
-plt.style.use("ggplot")
-fig, axs = plt.subplots(3, 2, figsize=(18, 12))
-fig.suptitle("Gameplay Statistics", fontsize=20, fontweight="bold")
-
-# Graph 1: Distant Traveled vs Survival Time
-axs[0, 0].scatter(df["SurvivalTime"], df["DistanceTraveled"], color="tab:blue", alpha=0.6)
-axs[0, 0].set_title("Distant Traveled vs Survival Time")
-axs[0, 0].set_xlabel("Survival Time (s)")
-axs[0, 0].set_ylabel("Distance Traveled (tiles)")
-axs[0, 0].set_xlim(0, df["SurvivalTime"].max() + 20)
-axs[0, 0].set_ylim(0, df["DistanceTraveled"].max() + 10)
-
-# Graph 2: Enemies Defeated Per Wave
-sns.barplot(x="WaveNumber", y="EnemiesDefeated", data=wave_data, ax=axs[0, 1], color="tab:orange")
-axs[0, 1].set_title("Enemies Defeated Per Wave")
-axs[0, 1].set_xlabel("Wave Number")
-axs[0, 1].set_ylabel("Average Enemies Defeated")
-axs[0, 1].set_ylim(0, wave_data["EnemiesDefeated"].max() + 20)
-
-# Graph 3: Enemies Defeated vs. Distance Traveled
-axs[1, 0].scatter(df["DistanceTraveled"], df["EnemiesDefeated"], color="tab:brown", alpha=0.6)
-axs[1, 0].set_title("Enemies Defeated vs. Distance Traveled")
-axs[1, 0].set_xlabel("Distance Traveled (tiles)")
-axs[1, 0].set_ylabel("Enemies Defeated")
-axs[1, 0].set_xlim(0, df["DistanceTraveled"].max() + 10)
-axs[1, 0].set_ylim(0, df["EnemiesDefeated"].max() + 20)
-
-# Graph 4: Damage Output Per Magic
-sns.barplot(x="perk", y="mean", data=damage_stats, ax=axs[1, 1], color="tab:red")
-axs[1, 1].errorbar(x=damage_stats["perk"], y=damage_stats["mean"], yerr=damage_stats["std"], fmt="none", c="black", capsize=5)
-axs[1, 1].set_title("Damage Output Per Magic")
-axs[1, 1].set_xlabel("Perk")
-axs[1, 1].set_ylabel("Mean Damage")
-axs[1, 1].set_ylim(0, damage_stats["mean"].max() + damage_stats["std"].max())
-
-# Graph 5: Survival Time Per Session
-axs[2, 0].plot(df["Session"], df["SurvivalTime"], marker="o", color="tab:purple")
-axs[2, 0].set_title("Survival Time Per Session")
-axs[2, 0].set_xlabel("Session")
-axs[2, 0].set_ylabel("Survival Time (s)")
-axs[2, 0].set_ylim(0, df["SurvivalTime"].max() + 20)
-
-# Graph 6: Total Damage Dealt vs. Survival Time
-axs[2, 1].scatter(df["SurvivalTime"], df["TotalDamage"], color="tab:cyan", alpha=0.6)
-axs[2, 1].set_title("Total Damage Dealt vs. Survival Time")
-axs[2, 1].set_xlabel("Survival Time (s)")
-axs[2, 1].set_ylabel("Total Damage")
-axs[2, 1].set_xlim(0, df["SurvivalTime"].max() + 20)
-axs[2, 1].set_ylim(0, df["TotalDamage"].max() + 1000)
-
-plt.tight_layout(rect=[0, 0.03, 1, 0.95])
-plt.subplots_adjust(hspace=0.5)
-
-# Save plot
-plt.savefig("visualization.png")
\ No newline at end of file
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import session_store
+from stat_log import FIELDNAMES, init_store
+
+OUTPUT_DIR = "visualizations"
+FIGURE_CACHE = "figure_cache.json"
+CHART_VERSION = 1  # Bump when a renderer changes so cached charts are redrawn
+FIGURE_SIZE = (9, 4)
+PLOT_COLUMNS = ["SurvivalTime", "DistanceTraveled", "EnemiesDefeated", "MagicBoltDamage", "ElectricBurstDamage", "ExplosionDamage"]
+
+# Scatter charts: x column, y column, x padding, y padding, colour, density colour map, title, x label, y label
+SCATTER_CHARTS = {
+    "distance_vs_time": ("SurvivalTime", "DistanceTraveled", 20, 10, "tab:blue", "Blues",
+                         "Distant Traveled vs Survival Time", "Survival Time (s)", "Distance Traveled (tiles)"),
+    "enemies_vs_distance": ("DistanceTraveled", "EnemiesDefeated", 10, 20, "tab:brown", "copper_r",
+                            "Enemies Defeated vs. Distance Traveled", "Distance Traveled (tiles)", "Enemies Defeated"),
+    "damage_vs_time": ("SurvivalTime", "TotalDamage", 20, 1000, "tab:cyan", "GnBu",
+                       "Total Damage Dealt vs. Survival Time", "Survival Time (s)", "Total Damage")
+}
+CHARTS = ["distance_vs_time", "enemies_per_wave", "enemies_vs_distance", "damage_per_magic", "survival_per_session", "damage_vs_time"]
+STREAMED_CHARTS = set(SCATTER_CHARTS) | {"survival_per_session"}
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Render Arcane Conquest gameplay charts.")
+    parser.add_argument("csv", nargs="?", help="stream this CSV log instead of the session store")
+    parser.add_argument("-c", "--charts", nargs="+", choices=CHARTS, default=CHARTS, help="charts to render")
+    parser.add_argument("-o", "--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("-f", "--force", action="store_true", help="redraw charts even if unchanged")
+    return parser.parse_args(argv)
+
+def load_source(args):
+    from analytics import (
+        SessionAggregates, aggregate_columns, input_hash, iter_csv_chunks, iter_store_chunks,
+        load_aggregates, save_aggregates, update_aggregates
+    )
+    if args.csv:
+        aggregates = SessionAggregates()
+        total = 0
+        for chunk in iter_csv_chunks(args.csv, aggregate_columns()):
+            aggregates.fold(chunk)
+            total += len(chunk["WaveNumber"])
+        stat = os.stat(args.csv)
+        source_key = input_hash(os.path.abspath(args.csv), stat.st_size, stat.st_mtime)
+        return aggregates, total, source_key, lambda: iter_csv_chunks(args.csv, PLOT_COLUMNS)
+    init_store()
+    conn = session_store.open_store(FIELDNAMES)
+    aggregates, _ = update_aggregates(conn, load_aggregates())
+    save_aggregates(aggregates)
+    source_key = input_hash(session_store.STORE_FILE, aggregates.last_id)
+    total = session_store.session_count(conn)
+    return aggregates, total, source_key, lambda: (chunk for _, chunk in iter_store_chunks(conn, PLOT_COLUMNS))
+
+def prepare(charts, aggregates, total, read_chunks):
+    # Bar charts come straight from the running aggregates. Scatter and
+    # series charts share one chunked pass over the sessions.
+    from analytics import SCATTER_SAMPLE, DensityGrid, PointSample, SeriesDownsampler
+    metrics = aggregates.metrics
+    data = {}
+    if "enemies_per_wave" in charts:
+        waves = aggregates.wave_means()
+        data["enemies_per_wave"] = {
+            "waves": [row["WaveNumber"] for row in waves],
+            "means": [row["EnemiesDefeated"] for row in waves]
+        }
+    if "damage_per_magic" in charts:
+        stats = aggregates.damage_stats()
+        data["damage_per_magic"] = {key: [row[key] for row in stats] for key in ("perk", "mean", "std")}
+    accumulators = {}
+    for name in charts:
+        if name in SCATTER_CHARTS:
+            x_column, y_column, x_pad, y_pad = SCATTER_CHARTS[name][:4]
+            x_range = (0, metrics[x_column].maximum + x_pad)
+            y_range = (0, metrics[y_column].maximum + y_pad)
+            plot = DensityGrid(x_range, y_range) if total > SCATTER_SAMPLE else PointSample()
+            accumulators[name] = (plot, x_range, y_range)
+    series = SeriesDownsampler(total) if "survival_per_session" in charts else None
+    if accumulators or series:
+        for chunk in read_chunks():
+            chunk["TotalDamage"] = chunk["MagicBoltDamage"] + chunk["ElectricBurstDamage"] + chunk["ExplosionDamage"]
+            for name, (plot, _, _) in accumulators.items():
+                plot.fold(chunk[SCATTER_CHARTS[name][0]], chunk[SCATTER_CHARTS[name][1]])
+            if series:
+                series.fold(chunk["SurvivalTime"])
+    for name, (plot, x_range, y_range) in accumulators.items():
+        if isinstance(plot, DensityGrid):
+            data[name] = {"x_edges": plot.x_edges, "y_edges": plot.y_edges, "counts": plot.counts,
+                          "x_range": x_range, "y_range": y_range}
+        else:
+            data[name] = {"points": plot.points, "x_range": x_range, "y_range": y_range}
+    if series:
+        sessions, survival_times = series.series()
+        data["survival_per_session"] = {"sessions": sessions, "survival_times": survival_times,
+                                        "bucket_size": series.bucket_size,
+                                        "y_max": metrics["SurvivalTime"].maximum + 20}
+    return data
+
+def content_hash(name, chart_data):
+    import numpy as np
+    digest = hashlib.sha1(f"{name}:{CHART_VERSION}".encode("utf-8"))
+    for key in sorted(chart_data):
+        value = chart_data[key]
+        digest.update(key.encode("utf-8"))
+        if isinstance(value, np.ndarray):
+            digest.update(str(value.dtype).encode("utf-8") + str(value.shape).encode("utf-8"))
+            digest.update(np.ascontiguousarray(value).tobytes())
+        else:
+            digest.update(json.dumps(value, default=float).encode("utf-8"))
+    return digest.hexdigest()
+
+def init_worker():
+    import matplotlib
+    matplotlib.use("Agg")
+
+def render_scatter(ax, name, chart_data):
+    import numpy as np
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LogNorm
+    _, _, _, _, color, cmap, title, x_label, y_label = SCATTER_CHARTS[name]
+    if "counts" in chart_data:
+        counts = np.ma.masked_equal(chart_data["counts"].T, 0)
+        mesh = ax.pcolormesh(chart_data["x_edges"], chart_data["y_edges"], counts, cmap=cmap, norm=LogNorm())
+        plt.colorbar(mesh, ax=ax, label="Sessions")
+    else:
+        points = chart_data["points"]
+        ax.scatter(points[:, 0], points[:, 1], color=color, alpha=0.6)
+    ax.set_title(title)
+    ax.set_xlabel(x_label)
+    ax.set_ylabel(y_label)
+    ax.set_xlim(*chart_data["x_range"])
+    ax.set_ylim(*chart_data["y_range"])
+
+def render_enemies_per_wave(ax, chart_data):
+    import seaborn as sns
+    sns.barplot(x=chart_data["waves"], y=chart_data["means"], ax=ax, color="tab:orange")
+    ax.set_title("Enemies Defeated Per Wave")
+    ax.set_xlabel("Wave Number")
+    ax.set_ylabel("Average Enemies Defeated")
+    ax.set_ylim(0, max(chart_data["means"], default=0) + 20)
+
+def render_damage_per_magic(ax, chart_data):
+    import seaborn as sns
+    sns.barplot(x=chart_data["perk"], y=chart_data["mean"], ax=ax, color="tab:red")
+    ax.errorbar(x=chart_data["perk"], y=chart_data["mean"], yerr=chart_data["std"], fmt="none", c="black", capsize=5)
+    ax.set_title("Damage Output Per Magic")
+    ax.set_xlabel("Perk")
+    ax.set_ylabel("Mean Damage")
+    ax.set_ylim(0, max(chart_data["mean"]) + max(chart_data["std"]))
+
+def render_survival_per_session(ax, chart_data):
+    bucket_size = chart_data["bucket_size"]
+    marker = "o" if bucket_size == 1 else None
+    ax.plot(chart_data["sessions"], chart_data["survival_times"], marker=marker, color="tab:purple")
+    ax.set_title("Survival Time Per Session")
+    ax.set_xlabel("Session")
+    ax.set_ylabel("Survival Time (s)" if bucket_size == 1 else f"Mean Survival Time per {bucket_size} Sessions (s)")
+    ax.set_ylim(0, chart_data["y_max"])
+
+def render_chart(name, chart_data, path):
+    import matplotlib.pyplot as plt
+    plt.style.use("ggplot")
+    fig, ax = plt.subplots(figsize=FIGURE_SIZE)
+    if name in SCATTER_CHARTS:
+        render_scatter(ax, name, chart_data)
+    elif name == "enemies_per_wave":
+        render_enemies_per_wave(ax, chart_data)
+    elif name == "damage_per_magic":
+        render_damage_per_magic(ax, chart_data)
+    elif name == "survival_per_session":
+        render_survival_per_session(ax, chart_data)
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+    return path
+
+def load_figure_cache(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_figure_cache(cache, path):
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump(cache, f)
+    os.replace(temp_path, path)
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    charts = list(dict.fromkeys(args.charts))
+    os.makedirs(args.output_dir, exist_ok=True)
+    cache_path = os.path.join(args.output_dir, FIGURE_CACHE)
+    cache = load_figure_cache(cache_path)
+    paths = {name: os.path.join(args.output_dir, f"{name}.png") for name in charts}
+
+    aggregates, total, source_key, read_chunks = load_source(args)
+    if not total:
+        print("No sessions logged yet")
+        return 0
+    # Charts last drawn from this exact source are skipped before any session is read.
+    if not args.force:
+        charts = [name for name in charts
+                  if not (os.path.exists(paths[name]) and cache.get(name, {}).get("source") == source_key)]
+    data = prepare(charts, aggregates, total, read_chunks)
+    hashes = {name: content_hash(name, data[name]) for name in charts}
+    pending = [name for name in charts
+               if args.force or not os.path.exists(paths[name]) or cache.get(name, {}).get("content") != hashes[name]]
+
+    if args.jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(pending)), initializer=init_worker) as pool:
+            futures = {name: pool.submit(render_chart, name, data[name], paths[name]) for name in pending}
+            for name, future in futures.items():
+                print(f"Rendered {future.result()}")
+    else:
+        init_worker()
+        for name in pending:
+            print(f"Rendered {render_chart(name, data[name], paths[name])}")
+
+    for name in charts:
+        cache[name] = {"source": source_key, "content": hashes[name]}
+    save_figure_cache(cache, cache_path)
+    skipped = len(paths) - len(pending)
+    if skipped:
+        print(f"{skipped} chart(s) unchanged")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import tcod
+
+CHUNK_SIZE = 64
+MAX_MAP_SIZE = 4096
+ACTIVE_RADIUS = 1  # Chunks around the player's chunk kept in the active window
+CACHE_CHUNKS = 64  # Generated chunks kept before the least recently used are evicted
+SPAWN_CLEARANCE = 6  # Tiles kept open around the map centre
+FLOW_RADIUS = 40  # Tiles around the player covered by the enemy flow field
+FLOW_SLACK = 2  # Tiles the target may move before the flow field is rebuilt
+
+class ChunkView:
+    def __init__(self, world_map, layer):
+        self.world_map = world_map
+        self.layer = layer
+
+    def __getitem__(self, index):
+        y, x = index
+        return bool(self.world_map.cell(x, y)[self.layer])
+
+class WorldMap:
+    # Terrain is generated per chunk from (seed, chunk) so evicted chunks can
+    # be regenerated identically; nothing but the active window stays resident.
+    def __init__(self, width, height, generator="open", seed=0):
+        self.width = max(1, min(MAX_MAP_SIZE, width))
+        self.height = max(1, min(MAX_MAP_SIZE, height))
+        self.generator = generator
+        self.seed = seed
+        self.chunks = OrderedDict()
+        self.lock = threading.Lock()
+        self.walkable = ChunkView(self, 0)
+        self.transparent = ChunkView(self, 1)
+        self.window_chunk = None
+        self.window_origin = (0, 0)
+        self.window_walkable = None
+        self.window_transparent = None
+        self.window_version = 0
+        self.flow_key = None
+        self.flow_distance = None
+        self.flow_origin = (0, 0)
+
+    def chunk(self, cx, cy):
+        key = (cx, cy)
+        with self.lock:
+            arrays = self.chunks.get(key)
+            if arrays is not None:
+                self.chunks.move_to_end(key)
+                return arrays
+        arrays = self.generate_chunk(cx, cy)
+        with self.lock:
+            self.chunks[key] = arrays
+            while len(self.chunks) > CACHE_CHUNKS:
+                self.chunks.popitem(last=False)
+        return arrays
+
+    def cell(self, x, y):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return (False, False)
+        walkable, transparent = self.chunk(x // CHUNK_SIZE, y // CHUNK_SIZE)
+        return walkable[y % CHUNK_SIZE, x % CHUNK_SIZE], transparent[y % CHUNK_SIZE, x % CHUNK_SIZE]
+
+    def generate_chunk(self, cx, cy):
+        walkable = np.ones((CHUNK_SIZE, CHUNK_SIZE), dtype=bool)
+        if self.generator == "procedural":
+            rng = np.random.default_rng((self.seed, cx, cy))
+            roll = rng.random()
+            if roll < 0.25:
+                carve_arena(walkable, rng)
+            elif roll < 0.6:
+                carve_rooms(walkable, rng)
+            else:
+                carve_obstacles(walkable, rng)
+            # Open chunk borders keep every chunk reachable from its neighbours.
+            walkable[:2, :] = walkable[-2:, :] = True
+            walkable[:, :2] = walkable[:, -2:] = True
+            self.clear_spawn(walkable, cx, cy)
+        # Cells past the map edge are solid.
+        walkable[max(0, self.height - cy * CHUNK_SIZE):, :] = False
+        walkable[:, max(0, self.width - cx * CHUNK_SIZE):] = False
+        return walkable, walkable.copy()
+
+    def clear_spawn(self, walkable, cx, cy):
+        ys, xs = np.mgrid[0:CHUNK_SIZE, 0:CHUNK_SIZE]
+        near = ((xs + cx * CHUNK_SIZE - self.width // 2) ** 2 +
+                (ys + cy * CHUNK_SIZE - self.height // 2) ** 2) <= SPAWN_CLEARANCE ** 2
+        walkable[near] = True
+
+    def __getstate__(self):
+        # Terrain is regenerated from the seed; the window position, its
+        # version and the cached flow field are kept so a restored session
+        # steers exactly as the original would have.
+        state = dict(self.__dict__)
+        for name in ("chunks", "lock", "walkable", "transparent", "window_walkable", "window_transparent"):
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.chunks = OrderedDict()
+        self.lock = threading.Lock()
+        self.walkable = ChunkView(self, 0)
+        self.transparent = ChunkView(self, 1)
+        self.window_walkable = None
+        self.window_transparent = None
+        if self.window_chunk is not None:
+            self.build_window(self.window_chunk)
+
+    def focus(self, x, y):
+        # Rebuilds the active window only when the player changes chunk.
+        chunk = (int(x) // CHUNK_SIZE, int(y) // CHUNK_SIZE)
+        if chunk == self.window_chunk:
+            return False
+        self.build_window(chunk)
+        self.window_version += 1
+        return True
+
+    def build_window(self, chunk):
+        columns = range(max(0, chunk[0] - ACTIVE_RADIUS),
+                        min(-(-self.width // CHUNK_SIZE), chunk[0] + ACTIVE_RADIUS + 1))
+        rows = range(max(0, chunk[1] - ACTIVE_RADIUS),
+                     min(-(-self.height // CHUNK_SIZE), chunk[1] + ACTIVE_RADIUS + 1))
+        blocks = [[self.chunk(cx, cy) for cx in columns] for cy in rows]
+        origin_x, origin_y = columns[0] * CHUNK_SIZE, rows[0] * CHUNK_SIZE
+        width = min(self.width, columns[-1] * CHUNK_SIZE + CHUNK_SIZE) - origin_x
+        height = min(self.height, rows[-1] * CHUNK_SIZE + CHUNK_SIZE) - origin_y
+        self.window_walkable = np.block([[block[0] for block in row] for row in blocks])[:height, :width]
+        self.window_transparent = np.block([[block[1] for block in row] for row in blocks])[:height, :width]
+        self.window_origin = (origin_x, origin_y)
+        self.window_chunk = chunk
+
+    def in_window(self, x, y):
+        local_x, local_y = int(x) - self.window_origin[0], int(y) - self.window_origin[1]
+        height, width = self.window_walkable.shape
+        return 0 <= local_x < width and 0 <= local_y < height
+
+    def walkable_at(self, xs, ys):
+        # Vectorized walkable lookup; tiles outside the active window fall
+        # back to the chunk cache one by one.
+        xs, ys = np.asarray(xs, dtype=np.int64), np.asarray(ys, dtype=np.int64)
+        result = np.zeros(len(xs), dtype=bool)
+        origin_x, origin_y = self.window_origin
+        if self.window_walkable is not None:
+            height, width = self.window_walkable.shape
+            inside = (xs >= origin_x) & (xs < origin_x + width) & (ys >= origin_y) & (ys < origin_y + height)
+            result[inside] = self.window_walkable[ys[inside] - origin_y, xs[inside] - origin_x]
+        else:
+            inside = result.copy()
+        for i in np.flatnonzero(~inside):
+            result[i] = self.cell(int(xs[i]), int(ys[i]))[0]
+        return result
+
+    def flow_field(self, target):
+        # Dijkstra distances to the target over the part of the active window
+        # within FLOW_RADIUS, shared by every enemy and recomputed only when
+        # the target strays more than FLOW_SLACK tiles or the window moves.
+        key = (int(target[0]), int(target[1]), self.window_version)
+        if (self.flow_key is None or key[2] != self.flow_key[2] or
+                max(abs(key[0] - self.flow_key[0]), abs(key[1] - self.flow_key[1])) > FLOW_SLACK):
+            self.flow_key = key
+            self.flow_distance = None
+            if self.window_walkable is not None and self.in_window(*target):
+                height, width = self.window_walkable.shape
+                target_x, target_y = key[0] - self.window_origin[0], key[1] - self.window_origin[1]
+                left, top = max(0, target_x - FLOW_RADIUS), max(0, target_y - FLOW_RADIUS)
+                right, bottom = min(width, target_x + FLOW_RADIUS + 1), min(height, target_y + FLOW_RADIUS + 1)
+                cost = self.window_walkable[top:bottom, left:right].astype(np.int32)
+                distance = tcod.path.maxarray(cost.shape, dtype=np.int32)
+                distance[target_y - top, target_x - left] = 0
+                tcod.path.dijkstra2d(distance, cost, 2, 3, out=distance)
+                # A solid border lets neighbour lookups skip bounds checks.
+                self.flow_distance = np.pad(distance, 1, constant_values=np.iinfo(np.int32).max)
+                self.flow_origin = (self.window_origin[0] + left - 1, self.window_origin[1] + top - 1)
+        return self.flow_distance
+
+    def flow_steps(self, target, xs, ys, steps=2):
+        # Follows the flow field downhill from each tile for up to `steps`
+        # tiles. Returns the tiles reached after each step, shaped
+        # (steps, len(xs)), and which starts the field covers.
+        tiles_x = np.tile(xs.astype(np.int64), (steps, 1))
+        tiles_y = np.tile(ys.astype(np.int64), (steps, 1))
+        distance = self.flow_field(target)
+        if distance is None:
+            return tiles_x, tiles_y, np.zeros(len(xs), dtype=bool)
+        origin_x, origin_y = self.flow_origin
+        height, width = distance.shape
+        local_x, local_y = tiles_x[0] - origin_x, tiles_y[0] - origin_y
+        inside = (local_x >= 1) & (local_x < width - 1) & (local_y >= 1) & (local_y < height - 1)
+        local_x, local_y = local_x[inside], local_y[inside]
+        for step in range(steps):
+            candidates = distance[local_y[:, None] + NEIGHBOUR_DY, local_x[:, None] + NEIGHBOUR_DX]
+            best = candidates.argmin(axis=1)
+            downhill = candidates[np.arange(len(best)), best] < distance[local_y, local_x]
+            local_x = local_x + NEIGHBOUR_DX[best] * downhill
+            local_y = local_y + NEIGHBOUR_DY[best] * downhill
+            tiles_x[step, inside] = local_x + origin_x
+            tiles_y[step, inside] = local_y + origin_y
+        return tiles_x, tiles_y, inside
+
+NEIGHBOUR_DX = np.array([-1, 0, 1, -1, 1, -1, 0, 1])
+NEIGHBOUR_DY = np.array([-1, -1, -1, 0, 0, 1, 1, 1])
+
+def carve_arena(walkable, rng):
+    ys, xs = np.mgrid[0:CHUNK_SIZE, 0:CHUNK_SIZE]
+    centre = CHUNK_SIZE / 2
+    radius = rng.uniform(CHUNK_SIZE * 0.3, CHUNK_SIZE * 0.42)
+    distance = np.hypot(xs + 0.5 - centre, ys + 0.5 - centre)
+    ring = (distance >= radius) & (distance < radius + 1.5)
+    angles = np.arctan2(ys + 0.5 - centre, xs + 0.5 - centre)
+    for gate in rng.uniform(-np.pi, np.pi, 4):
+        ring &= np.abs(np.angle(np.exp(1j * (angles - gate)))) > 0.2
+    walkable[ring] = False
+    for angle in np.linspace(0, 2 * np.pi, int(rng.integers(4, 9)), endpoint=False):
+        px = int(centre + np.cos(angle) * radius * 0.5)
+        py = int(centre + np.sin(angle) * radius * 0.5)
+        walkable[py - 1:py + 1, px - 1:px + 1] = False
+
+def carve_rooms(walkable, rng):
+    for _ in range(int(rng.integers(2, 5))):
+        width, height = (int(size) for size in rng.integers(10, 24, 2))
+        left = int(rng.integers(2, CHUNK_SIZE - width - 2))
+        top = int(rng.integers(2, CHUNK_SIZE - height - 2))
+        right, bottom = left + width - 1, top + height - 1
+        walkable[top, left:right + 1] = walkable[bottom, left:right + 1] = False
+        walkable[top:bottom + 1, left] = walkable[top:bottom + 1, right] = False
+        for side in range(4):
+            if side < 2:
+                door = int(rng.integers(left + 2, right - 2))
+                walkable[top if side == 0 else bottom, door:door + 3] = True
+            else:
+                door = int(rng.integers(top + 2, bottom - 2))
+                walkable[door:door + 3, left if side == 2 else right] = True
+
+def carve_obstacles(walkable, rng):
+    for _ in range(int(rng.integers(4, 12))):
+        width, height = (int(size) for size in rng.integers(1, 6, 2))
+        left = int(rng.integers(2, CHUNK_SIZE - width - 2))
+        top = int(rng.integers(2, CHUNK_SIZE - height - 2))
+        walkable[top:top + height, left:left + width] = False